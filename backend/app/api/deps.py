@@ -1,10 +1,64 @@
 # app/api/deps.py
 
-from ..db.database import SessionLocal
+from dataclasses import dataclass
+from typing import List
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy.orm import Session
+
+from ..db.database import AsyncSessionLocal, SessionLocal
+from ..db import models, schemas
+from ..crud import crud
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@dataclass
+class JudgementPage:
+    """
+    Query parameters of the judgement listing endpoints. The next page's cursor is
+    returned in the `X-Next-Cursor` header and, if requested, the total in `X-Total-Count`.
+    """
+    sort: schemas.JudgementSort = Query(schemas.JudgementSort.CREATED_AT)
+    order: str = Query("desc", pattern="^(asc|desc)$")
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header")
+    limit: int = Query(20, ge=1, le=500)
+    fields: schemas.JudgementFields = Query(schemas.JudgementFields.FULL, description="'summary' omits judgement_details")
+    include_total: bool = Query(False)
+
+    def fetch(self, db: Session, response: Response, competition_id: int | None = None) -> List[models.Judgement]:
+        try:
+            rows, next_cursor = crud.list_judgements(
+                db,
+                competition_id=competition_id,
+                sort=self.sort,
+                descending=self.order == "desc",
+                cursor=self.cursor,
+                limit=self.limit,
+                summary=self.fields == schemas.JudgementFields.SUMMARY
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if self.include_total:
+            response.headers["X-Total-Count"] = str(crud.count_judgements(db, competition_id))
+        if self.fields == schemas.JudgementFields.SUMMARY:
+            return [schemas.JudgementSummary.model_validate(row) for row in rows]
+        return rows
+
+
+@dataclass
+class CompetitionJudgementPage(JudgementPage):
+    """JudgementPage of a single competition's listing, which returns 100 judgements by default."""
+    limit: int = Query(100, ge=1, le=500)
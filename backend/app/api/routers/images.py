@@ -1,17 +1,62 @@
 # app/api/routers/images.py
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import  FileResponse
 
 from ...core.config import settings
+from ...services.rendition_service import (
+    IMMUTABLE_CACHE_CONTROL, MEDIA_TYPES, normalize_width, rendition_cache, rendition_etag
+)
+from ...storage.image_store import image_store
 
 router = APIRouter()
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @router.get("/images/{filename}", tags=["Retrieval"])
-async def get_image(filename: str):
-    """Serve a stored image file."""
-    path = settings.IMAGE_DIR / filename
-    if not path.is_file():
+async def get_image(
+    filename: str,
+    request: Request,
+    w: int | None = Query(None, ge=1, le=8192, description="Width of a resized rendition (rounded up to a supported size)"),
+    fmt: str | None = Query(None, pattern="^(webp|jpeg)$", description="Format of a resized rendition")
+):
+    """
+    Serve a stored image file, or a resized rendition of it with `w` and/or `fmt`.
+    Responses carry a strong content-based ETag, are cacheable forever, answer
+    `If-None-Match` with 304 and support Range requests.
+    """
+    # May fetch the blob into the local cache when an object store backend is used
+    path = await asyncio.to_thread(image_store.local_path, filename)
+    if path is None:
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(path)
\ No newline at end of file
+
+    sha256 = await rendition_cache.source_sha256(filename)
+    resized = w is not None or fmt is not None
+    if resized:
+        fmt = fmt or settings.THUMBNAIL_FORMAT
+        width = normalize_width(w or max(settings.RENDITION_WIDTHS))
+        etag = rendition_etag(sha256, width, fmt)
+    else:
+        etag = f'"{sha256}"'
+
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    # Answered before rendering, so revalidating an evicted rendition does not render it again
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if not resized:
+        return FileResponse(path, headers=headers)
+    try:
+        path, _ = await rendition_cache.get(filename, width, fmt)
+    except OSError:
+        raise HTTPException(status_code=415, detail="Image cannot be resized")
+    return FileResponse(path, media_type=MEDIA_TYPES[fmt], headers=headers)
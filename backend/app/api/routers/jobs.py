@@ -0,0 +1,72 @@
+# app/api/routers/jobs.py
+
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ...db import models, schemas
+from ...api import deps
+from ...services import job_service
+from ...crud import async_crud, crud
+
+router = APIRouter()
+
+
+def _job_progress(job: models.JudgingJob, item_counts: Dict[str, int]) -> schemas.JudgingJob:
+    return schemas.JudgingJob(
+        id=job.id,
+        competition_id=job.competition_id,
+        status=job.status,
+        total_items=job.total_items,
+        item_counts=item_counts,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.post("/jobs/", response_model=schemas.JudgingJob, status_code=202, tags=["Jobs"])
+async def create_judging_job(
+    files: List[UploadFile] = File(...),
+    competition_id: int = Form(...),
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """Queue a batch of photos for background judging and return the job immediately."""
+    job = await job_service.create_job(files, competition_id, db)
+    return _job_progress(job, await async_crud.get_job_item_counts(db, job.id))
+
+
+@router.get("/jobs/", response_model=List[schemas.JudgingJob], tags=["Jobs"])
+def read_judging_jobs(skip: int = 0, limit: int = 20, db: Session = Depends(deps.get_db)):
+    """List judging jobs, newest first."""
+    return [
+        _job_progress(job, crud.get_job_item_counts(db, job.id))
+        for job in crud.get_judging_jobs(db, skip=skip, limit=limit)
+    ]
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JudgingJob, tags=["Jobs"])
+def read_judging_job(job_id: int, db: Session = Depends(deps.get_db)):
+    """Get the progress of a judging job."""
+    job = crud.get_judging_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_progress(job, crud.get_job_item_counts(db, job.id))
+
+
+@router.get("/jobs/{job_id}/items", response_model=List[schemas.JobItem], tags=["Jobs"])
+def read_judging_job_items(job_id: int, db: Session = Depends(deps.get_db)):
+    """Get the per-photo status of a judging job, including the resulting judgement IDs."""
+    if not crud.get_judging_job(db, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return crud.get_job_items(db, job_id)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=schemas.JudgingJob, tags=["Jobs"])
+def cancel_judging_job(job_id: int, db: Session = Depends(deps.get_db)):
+    """Cancel the job's pending items. Photos already being judged are still stored."""
+    job = crud.cancel_judging_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_progress(job, crud.get_job_item_counts(db, job.id))
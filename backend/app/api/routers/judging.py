@@ -1,15 +1,21 @@
 # app/api/routers/judging.py
 
 import asyncio
-from typing import List
+import json
+import uuid
+from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, Depends, File, UploadFile, Form, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ...db import schemas
+from ...db.database import AsyncSessionLocal
 from ...api import deps
-from ...services import judging_service
+from ...services import cost_service, judging_service, upload_service
+from ...services.config_cache import JudgingConfig, config_cache
+from ...services.llm_scheduler import llm_scheduler
 from ...crud import crud
 
 router = APIRouter()
@@ -19,27 +25,126 @@ router = APIRouter()
 async def judge_single_photo(
     file: UploadFile = File(...),
     competition_id: int = Form(...),
-    db: Session = Depends(deps.get_db)
+    bypass_cache: bool = Form(False),
+    db: AsyncSession = Depends(deps.get_async_db)
 ):
-    """Judge and store a single photo."""
-    return await judging_service.process_and_store_image(file, competition_id, db)
+    """Judge and store a single photo. Set `bypass_cache` to force fresh LLM calls."""
+    with llm_scheduler.lane("interactive"):
+        return await judging_service.process_and_store_image(file, competition_id, db, use_cache=not bypass_cache)
 
 
 @router.post("/judge-batch/", response_model=List[schemas.Judgement], tags=["Judging"])
 async def judge_multiple_photos(
     files: List[UploadFile] = File(...),
     competition_id: int = Form(...),
-    db: Session = Depends(deps.get_db)
+    bypass_cache: bool = Form(False)
 ):
-    """Judge and store multiple photos concurrently."""
-    tasks = [judging_service.process_and_store_image(f, competition_id, db) for f in files]
-    return await asyncio.gather(*tasks)
+    """Judge and store multiple photos concurrently. Set `bypass_cache` to force fresh LLM calls."""
+    # Spool everything first so the size limits reject an oversized batch before any LLM call
+    uploads = await upload_service.spool_uploads(files)
+    config = await _batch_config(uploads, competition_id)
+
+    async def judge(upload: upload_service.SpooledUpload) -> schemas.Judgement:
+        # A session is not safe to share between concurrent tasks, so each photo gets its own
+        async with AsyncSessionLocal() as db:
+            return await judging_service.judge_and_store_image(
+                upload, competition_id, db, use_cache=not bypass_cache, config=config
+            )
+
+    # Each batch gets its own scheduler lane so it shares LLM capacity fairly with other requests
+    with llm_scheduler.lane(f"batch-{uuid.uuid4().hex[:8]}"):
+        return await asyncio.gather(*(judge(u) for u in uploads))
+
 
+async def _batch_config(uploads: List[upload_service.SpooledUpload], competition_id: int) -> JudgingConfig:
+    """
+    The configuration snapshot a whole batch is judged with, so mid-batch edits do not mix
+    configurations. A batch whose estimated cost exceeds the competition's remaining budget is rejected.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            config = await config_cache.get(db)
+            await cost_service.check_batch_budget(db, config, competition_id, len(uploads))
+            return config
+    except BaseException:
+        for upload in uploads:
+            upload.discard()
+        raise
 
-@router.get("/judgements/", response_model=List[schemas.Judgement], tags=["Retrieval"])
-def get_all_judgements(skip: int = 0, limit: int = 20, db: Session = Depends(deps.get_db)):
-    """Retrieve all judgements (paginated)."""
-    return crud.get_judgements(db, skip=skip, limit=limit)
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/judge-batch/stream", tags=["Judging"])
+async def judge_multiple_photos_stream(
+    files: List[UploadFile] = File(...),
+    competition_id: int = Form(...),
+    bypass_cache: bool = Form(False)
+):
+    """
+    Judge and store multiple photos concurrently, streaming progress as Server-Sent Events:
+    `photo_screened` (cascade competitions), `criterion_scored`, `photo_scored`, `judgement_stored`
+    and `photo_error` per photo (each tagged with the photo's `index` and `filename`), then a final `done` event.
+    """
+    # Uploads are closed once this handler returns, before the stream is consumed, so spool them first
+    uploads = await upload_service.spool_uploads(files)
+    config = await _batch_config(uploads, competition_id)
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def judge(index: int, upload: upload_service.SpooledUpload) -> None:
+        def emit(event: str, data: Dict[str, Any]) -> None:
+            events.put_nowait((event, {"index": index, "filename": upload.original_filename, **data}))
+
+        with judging_service.progress_listener(emit):
+            try:
+                # The request-scoped session is closed before streaming starts; each photo uses its own
+                async with AsyncSessionLocal() as db:
+                    await judging_service.judge_and_store_image(
+                        upload, competition_id, db, use_cache=not bypass_cache, config=config
+                    )
+            except HTTPException as e:
+                emit("photo_error", {"detail": e.detail})
+            except Exception as e:
+                emit("photo_error", {"detail": str(e)})
+            finally:
+                events.put_nowait(None)
+
+    async def event_stream():
+        with llm_scheduler.lane(f"batch-{uuid.uuid4().hex[:8]}"):
+            tasks = [asyncio.create_task(judge(i, upload)) for i, upload in enumerate(uploads)]
+        succeeded, failed, finished = 0, 0, 0
+        try:
+            while finished < len(tasks):
+                item = await events.get()
+                if item is None:
+                    finished += 1
+                    continue
+                event, data = item
+                succeeded += event == "judgement_stored"
+                failed += event == "photo_error"
+                yield _sse(event, data)
+            yield _sse("done", {"total": len(tasks), "succeeded": succeeded, "failed": failed})
+        finally:
+            # Client went away: stop judging the photos that are still in progress
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Photos never started (the client left early) still have their spooled file
+            for upload in uploads:
+                upload.discard()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/judgements/", response_model=List[schemas.Judgement | schemas.JudgementSummary], tags=["Retrieval"])
+def get_all_judgements(
+    response: Response,
+    page: deps.JudgementPage = Depends(),
+    db: Session = Depends(deps.get_db)
+):
+    """Retrieve all judgements, newest first by default (cursor-paginated)."""
+    return page.fetch(db, response)
 
 
 @router.get("/judgements/{judgement_id}", response_model=schemas.Judgement, tags=["Retrieval"])
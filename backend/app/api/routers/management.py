@@ -1,23 +1,35 @@
 # app/api/routers/management.py
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.responses import JSONResponse
 
 from ...db import schemas
 from ...api import deps
-from ...services import guideline_service
-from ...crud import crud
+from ...services import cascade_service, cost_service, guideline_service, judging_service, scoring_service
+from ...crud import async_crud, crud
+from ...services.config_cache import config_cache
+from ...services.job_service import job_worker_pool
+from ...storage.gc import image_gc
 
 router = APIRouter()
 
 
+def _config_changed(db: Session) -> None:
+    """Invalidate the cached judging configuration and prompt chains after a committed edit."""
+    config_cache.invalidate(db)
+    judging_service.photo_judge_app.invalidate_prompt_cache()
+
+
 # --- Competition Management ---
 @router.post("/competitions/", response_model=schemas.Competition, tags=["Management"])
 def create_competition(competition: schemas.CompetitionCreate, db: Session = Depends(deps.get_db)):
-    return crud.create_competition(db, competition)
+    created = crud.create_competition(db, competition)
+    config_cache.invalidate(db)
+    return created
 
 
 @router.get("/competitions/", response_model=List[schemas.Competition], tags=["Management"])
@@ -25,10 +37,118 @@ def read_competitions(skip: int = 0, limit: int = 10, db: Session = Depends(deps
     return crud.get_competitions(db, skip=skip, limit=limit)
 
 
-@router.get("/competitions/{competition_id}/judgements", response_model=List[schemas.Judgement], tags=["Retrieval"])
-def get_judgements_for_competition(competition_id: int, db: Session = Depends(deps.get_db)):
-    """Get all judgements for a competition."""
-    return crud.get_judgements_by_competition(db, competition_id)
+@router.get("/competitions/{competition_id}/judgements", response_model=List[schemas.Judgement | schemas.JudgementSummary], tags=["Retrieval"])
+def get_judgements_for_competition(
+    competition_id: int,
+    response: Response,
+    page: deps.CompetitionJudgementPage = Depends(),
+    db: Session = Depends(deps.get_db)
+):
+    """
+    Get a competition's judgements, newest first by default. Follow the X-Next-Cursor
+    header to page through all of them; sort by `overall_score` for a leaderboard.
+    """
+    return page.fetch(db, response, competition_id)
+
+
+@router.post("/competitions/{competition_id}/rescore", response_model=schemas.RescoreResult, tags=["Management"])
+def rescore_competition(
+    competition_id: int,
+    dry_run: bool = False,
+    limit: int = 100,
+    db: Session = Depends(deps.get_db)
+):
+    """
+    Recompute every judgement's overall score from the stored per-criterion scores and
+    the current criterion weights, without re-judging. Returns the top `limit` of the new
+    ranking; with `dry_run` nothing is written.
+    """
+    return scoring_service.rescore_competition(db, competition_id, dry_run=dry_run, limit=limit)
+
+
+@router.get("/competitions/{competition_id}/ranking", response_model=List[schemas.RankedJudgement], tags=["Retrieval"])
+def get_competition_ranking(
+    competition_id: int,
+    criterion: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(deps.get_db)
+):
+    """
+    Rank a competition's judgements by overall score, or by a single criterion's score
+    (e.g. `?criterion=Composition&limit=50`), optionally filtered to a score range.
+    """
+    return crud.get_competition_ranking(
+        db, competition_id, criterion=criterion, min_score=min_score, max_score=max_score, skip=skip, limit=limit
+    )
+
+
+@router.get("/competitions/{competition_id}/criteria-stats", response_model=List[schemas.CriterionScoreStats], tags=["Retrieval"])
+def get_competition_criterion_stats(competition_id: int, db: Session = Depends(deps.get_db)):
+    """Per-criterion count, average, minimum and maximum score for a competition."""
+    return crud.get_competition_criterion_stats(db, competition_id)
+
+
+# --- Usage and Budgets ---
+@router.get("/competitions/{competition_id}/usage", response_model=schemas.CompetitionUsage, tags=["Retrieval"])
+def get_competition_usage(competition_id: int, db: Session = Depends(deps.get_db)):
+    """Judgements, LLM calls, tokens and cost so far, with the competition's budget and what is left of it."""
+    if not crud.get_competition(db, competition_id):
+        raise HTTPException(status_code=404, detail="Competition not found")
+    return cost_service.usage_summary(competition_id, crud.get_competition_usage(db, competition_id))
+
+
+@router.put("/competitions/{competition_id}/budget", response_model=schemas.CompetitionUsage, tags=["Management"])
+def set_competition_budget(competition_id: int, budget: schemas.BudgetUpdate, db: Session = Depends(deps.get_db)):
+    """
+    Set the competition's spending limit in USD (null removes it). Once it is spent, judging
+    requests are rejected with 402 and background job items wait; raising it resumes them.
+    """
+    if not crud.get_competition(db, competition_id):
+        raise HTTPException(status_code=404, detail="Competition not found")
+    usage = crud.set_competition_budget(db, competition_id, budget.budget_usd)
+    job_worker_pool.resume_deferred(db, competition_id)
+    return cost_service.usage_summary(competition_id, usage)
+
+
+@router.get("/competitions/{competition_id}/cost-estimate", response_model=schemas.CostEstimate, tags=["Retrieval"])
+async def estimate_competition_cost(
+    competition_id: int,
+    images: int = Query(..., ge=1, description="Number of photos to judge"),
+    source_long_edge: int = Query(4000, ge=1, description="Long edge of the uploaded photos in pixels"),
+    aspect_ratio: float = Query(4 / 3, gt=0, description="Width / height of the uploaded photos"),
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """
+    Predict the tokens and cost of judging `images` new photos with the current criteria, prompts,
+    evaluation mode and image preprocessing settings, and how many fit in the remaining budget.
+    """
+    config = await config_cache.get(db)
+    usage = await async_crud.get_competition_usage(db, competition_id)
+    return cost_service.estimate_cost(config, competition_id, images, usage, source_long_edge, aspect_ratio)
+
+
+@router.post("/judgements/scores/backfill", tags=["Management"])
+def backfill_judgement_scores(db: Session = Depends(deps.get_db)):
+    """Populate the per-criterion score table for judgements stored before it existed."""
+    backfilled = crud.backfill_judgement_scores(db)
+    return JSONResponse(content={"message": f"Backfilled scores for {backfilled} judgement(s)."})
+
+
+@router.post("/maintenance/image-gc", tags=["Management"])
+def start_image_gc(dry_run: bool = Query(False, description="Only count orphans, delete nothing")):
+    """Start removing orphaned images in the background (rate-limited); poll GET for progress."""
+    if not image_gc.start(dry_run=dry_run):
+        raise HTTPException(status_code=409, detail="Image garbage collection is already running")
+    return JSONResponse(status_code=202, content=image_gc.snapshot())
+
+
+@router.get("/maintenance/image-gc", tags=["Management"])
+def get_image_gc_status():
+    """Progress and counts of the current or last image garbage collection."""
+    return image_gc.snapshot()
 
 
 @router.put("/competitions/{competition_id}", response_model=schemas.Competition, tags=["Management"])
@@ -40,14 +160,24 @@ def update_competition(
     updated = crud.update_competition(db, competition_id, competition)
     if not updated:
         raise HTTPException(status_code=404, detail="Competition not found")
+    config_cache.invalidate(db)
     return updated
 
 
 @router.delete("/competitions/{competition_id}", tags=["Management"])
 def delete_competition(competition_id: int, db: Session = Depends(deps.get_db)):
+    # Its jobs are cancelled first; photos already being judged would write into deleted rows
+    running = crud.cancel_competition_jobs(db, competition_id)
+    if running:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{running} photo(s) of this competition are still being judged; its jobs were cancelled, retry once they finish"
+        )
     deleted = crud.delete_competition(db, competition_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Competition not found")
+    config_cache.invalidate(db)
+    cascade_service.screening_tracker.forget(competition_id)
     return JSONResponse(
         content={"message": f"Competition '{deleted.name}' and all its data deleted successfully."}
     )
@@ -81,7 +211,9 @@ def read_prompts(db: Session = Depends(deps.get_db)):
 @router.post("/prompts/", response_model=schemas.Prompt, tags=["Management"])
 def create_prompt(prompt: schemas.PromptCreate, db: Session = Depends(deps.get_db)):
     """Create a new prompt. If 'enabled' is true, any other prompts of the same type will be disabled."""
-    return crud.create_prompt(db=db, prompt=prompt)
+    created = crud.create_prompt(db=db, prompt=prompt)
+    _config_changed(db)
+    return created
 
 
 @router.put("/prompts/{prompt_id}", response_model=schemas.Prompt, tags=["Management"])
@@ -90,6 +222,7 @@ def update_prompt(prompt_id: int, prompt: schemas.PromptUpdate, db: Session = De
     updated = crud.update_prompt(db, prompt_id, prompt)
     if not updated:
         raise HTTPException(status_code=404, detail="Prompt not found")
+    _config_changed(db)
     return updated
 
 
@@ -99,6 +232,7 @@ def delete_prompt(prompt_id: int, db: Session = Depends(deps.get_db)):
     deleted_prompt = crud.delete_prompt(db, prompt_id)
     if not deleted_prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
+    _config_changed(db)
     return JSONResponse(content={"message": f"Prompt {prompt_id} deleted successfully."})
 
 
@@ -110,7 +244,9 @@ def read_criteria(db: Session = Depends(deps.get_db)):
 
 @router.post("/criteria/", response_model=schemas.Criterion, tags=["Criteria Management"])
 def create_criterion(criterion: schemas.CriterionCreate, db: Session = Depends(deps.get_db)):
-    return crud.create_criterion(db=db, criterion=criterion)
+    created = crud.create_criterion(db=db, criterion=criterion)
+    _config_changed(db)
+    return created
 
 
 @router.put("/criteria/{criterion_id}", response_model=schemas.Criterion, tags=["Criteria Management"])
@@ -118,6 +254,7 @@ def update_criterion(criterion_id: int, criterion: schemas.CriterionUpdate, db:
     updated = crud.update_criterion(db, criterion_id, criterion)
     if not updated:
         raise HTTPException(status_code=404, detail="Criterion not found")
+    _config_changed(db)
     return updated
 
 
@@ -126,4 +263,5 @@ def delete_criterion(criterion_id: int, db: Session = Depends(deps.get_db)):
     deleted = crud.delete_criterion(db, criterion_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Criterion not found")
+    _config_changed(db)
     return deleted
\ No newline at end of file
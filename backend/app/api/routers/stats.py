@@ -0,0 +1,107 @@
+# app/api/routers/stats.py
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ...core import metrics
+from ...services import cascade_service, guideline_service, image_service, result_cache
+from ...services.config_cache import config_cache
+from ...services.judgement_writer import judgement_writer
+from ...services.rendition_service import rendition_cache
+from ...services.llm_scheduler import llm_scheduler
+from ...storage.image_store import image_store
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Monitoring"])
+def get_metrics():
+    """
+    Request latency by route, time per judging stage and graph node, LLM calls, tokens,
+    errors and 5.0 score fallbacks, and SQL statement times, in the Prometheus text format.
+    """
+    if not metrics.registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (METRICS_ENABLED=false)")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/stats/preprocessing", tags=["Monitoring"])
+def get_preprocessing_stats():
+    """Byte savings and per-stage timings of the image preprocessing pipeline."""
+    return image_service.preprocessing_stats.snapshot()
+
+
+@router.delete("/stats/preprocessing", tags=["Monitoring"])
+def reset_preprocessing_stats():
+    """Reset the preprocessing counters, e.g. before trying new settings."""
+    image_service.preprocessing_stats.reset()
+    return image_service.preprocessing_stats.snapshot()
+
+
+@router.get("/stats/llm", tags=["Monitoring"])
+def get_llm_scheduler_stats():
+    """In-flight requests, queue depth per lane, wait times and retry counts of the LLM scheduler."""
+    return llm_scheduler.snapshot()
+
+
+@router.get("/stats/result-cache", tags=["Monitoring"])
+def get_result_cache_stats():
+    """Size, hit/miss counters and evictions of the judging result cache."""
+    return result_cache.result_cache.snapshot()
+
+
+@router.delete("/stats/result-cache", tags=["Monitoring"])
+def clear_result_cache():
+    """Drop all cached judging results."""
+    result_cache.result_cache.clear()
+    return result_cache.result_cache.snapshot()
+
+
+@router.get("/stats/config-cache", tags=["Monitoring"])
+def get_config_cache_stats():
+    """Version, size and hit/load counters of the cached judging configuration."""
+    return config_cache.snapshot()
+
+
+@router.get("/stats/guideline-search", tags=["Monitoring"])
+def get_guideline_search_stats():
+    """Hit/miss counters of the guideline web search cache, and searches shared by concurrent requests."""
+    return guideline_service.search_cache.snapshot()
+
+
+@router.delete("/stats/guideline-search", tags=["Monitoring"])
+def clear_guideline_search_cache():
+    """Drop all cached guideline search results, in memory and on disk."""
+    guideline_service.search_cache.clear()
+    return guideline_service.search_cache.snapshot()
+
+
+@router.get("/stats/judgement-writer", tags=["Monitoring"])
+def get_judgement_writer_stats():
+    """Flush count, rows per flush and flush latency of the batched judgement writer."""
+    return judgement_writer.snapshot()
+
+
+@router.delete("/stats/judgement-writer", tags=["Monitoring"])
+def reset_judgement_writer_stats():
+    """Reset the judgement writer counters."""
+    judgement_writer.reset_metrics()
+    return judgement_writer.snapshot()
+
+
+@router.get("/stats/cascade", tags=["Monitoring"])
+def get_cascade_stats():
+    """Photos screened by cascade judging in this process, and how many went on to the full panel and why."""
+    return cascade_service.screening_tracker.snapshot()
+
+
+@router.get("/stats/renditions", tags=["Monitoring"])
+def get_rendition_cache_stats():
+    """Size, hit/miss counters and evictions of the on-disk thumbnail cache."""
+    return rendition_cache.snapshot()
+
+
+@router.get("/stats/image-store", tags=["Monitoring"])
+def get_image_store_stats():
+    """Blob and reference counts of the image store and the bytes saved by deduplication."""
+    return image_store.stats()
@@ -0,0 +1,285 @@
+# app/core/metrics.py
+"""
+Process-wide counters and latency histograms, served in the Prometheus text
+format at /metrics, and per-request stage timings, returned in the
+Server-Timing header. With METRICS_ENABLED=false every helper returns
+immediately and nothing is wrapped or hooked.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from .config import settings
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args: Any):
+        super().__init__(*args)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (the last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """A value read from its owner when scraped, e.g. the LLM scheduler's queue depth."""
+    kind = "gauge"
+
+    def __init__(self, *args: Any, read: Callable[[], float]):
+        super().__init__(*args)
+        self.read = read
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_number(self.read())}"
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name!r} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labelnames, buckets=buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], float]) -> Gauge:
+        return self._register(Gauge(self, name, help, (), read=read))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+http_request_seconds = registry.histogram(
+    "photo_judge_http_request_seconds", "HTTP request latency by route template.", ("method", "route", "status")
+)
+stage_seconds = registry.histogram(
+    "photo_judge_stage_seconds", "Time spent per judging stage and LangGraph node.", ("stage",)
+)
+db_query_seconds = registry.histogram(
+    "photo_judge_db_query_seconds", "SQL statement execution time.",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+
+
+# --- Per-request stage timings ---
+
+# Stage -> [seconds, occurrences] of the current request; shared by the tasks and threads it spawns
+_request_timings: contextvars.ContextVar[Dict[str, List[float]] | None] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+_request_timings_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def request_timings() -> Iterator[Dict[str, List[float]]]:
+    """Collect the stage timings recorded by the enclosed request handling."""
+    timings: Dict[str, List[float]] = {}
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def _add_to_request(stage: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is None:
+        return
+    with _request_timings_lock:
+        entry = timings.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+def record(stage: str, seconds: float) -> None:
+    """Record `seconds` spent in `stage`, process-wide and for the current request."""
+    if not registry.enabled:
+        return
+    stage_seconds.observe(seconds, stage=stage)
+    _add_to_request(stage, seconds)
+
+
+@contextlib.contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time the enclosed block as `stage`."""
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def timed_node(name: str, node: Callable) -> Callable:
+    """A LangGraph node (sync or async) that records its run time as stage `name`."""
+    if not registry.enabled:
+        return node
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state):
+            with timed(name):
+                return await node(state)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state):
+        with timed(name):
+            return node(state)
+    return wrapper
+
+
+def server_timing_header(timings: Dict[str, List[float]], total_seconds: float) -> str:
+    """
+    A Server-Timing value with the request's total and each stage. Stages of a
+    batch run concurrently, so their durations are summed and can exceed the total.
+    """
+    entries = [f"total;dur={total_seconds * 1000:.1f}"]
+    with _request_timings_lock:
+        items = list(timings.items())
+    for stage, (seconds, count) in items:
+        entries.append(f'{stage};dur={seconds * 1000:.1f};desc="{int(count)}x"')
+    return ", ".join(entries)
+
+
+# --- Database ---
+
+_QUERY_STARTS = "metrics_query_starts"
+
+
+def instrument_engine(engine) -> None:
+    """Time every SQL statement of a (sync) engine; pass `async_engine.sync_engine` for an async one."""
+    if not registry.enabled:
+        return
+    from sqlalchemy import event
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_STARTS, []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_STARTS)
+        if not starts:
+            return
+        seconds = time.perf_counter() - starts.pop()
+        db_query_seconds.observe(seconds)
+        _add_to_request("db", seconds)
+
+    def handle_error(exception_context):
+        # A failed statement has no after_cursor_execute
+        conn = exception_context.connection
+        starts = conn.info.get(_QUERY_STARTS) if conn is not None else None
+        if starts:
+            starts.pop()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
@@ -1,15 +1,76 @@
 # app/core/startup.py
 
+from typing import List, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import Session
-from ..db import schemas
 from ..crud import crud
+from ..db import models, schemas
+
+# Columns added to tables that already existed in earlier releases, as (table, column).
+# create_all only creates missing tables, so upgrade_schema adds these where they are missing.
+ADDED_COLUMNS = [
+    ("competitions", "evaluation_mode"),
+    ("competitions", "cascade_enabled"),
+    ("competition_usage", "screened"),
+    ("competition_usage", "screened_out"),
+    ("job_items", "claimed_by"),
+    ("job_items", "claimed_at"),
+    ("job_items", "heartbeat_at"),
+]
+
+
+def create_schema(engine: Engine) -> None:
+    """
+    Creates any missing tables and indexes, then adds the ADDED_COLUMNS that
+    existing tables lack. Safe to run on every startup.
+    """
+    models.Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
+
+
+def _column_names(engine: Engine, table_name: str) -> Set[str]:
+    return {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+
+def upgrade_schema(engine: Engine) -> List[str]:
+    """
+    Add each missing column of ADDED_COLUMNS with ALTER TABLE ... ADD COLUMN; NOT NULL
+    columns get their model default as the column default. Returns the columns added.
+    """
+    added = []
+    for table_name, column_name in ADDED_COLUMNS:
+        if column_name in _column_names(engine, table_name):
+            continue
+        column = models.Base.metadata.tables[table_name].c[column_name]
+        ddl = f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column.type.compile(dialect=engine.dialect)}"
+        if not column.nullable:
+            ddl += f" NOT NULL DEFAULT {column.default.arg!r}"
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(ddl))
+        except DBAPIError:
+            # Another worker process starting at the same time may have added it first
+            if column_name not in _column_names(engine, table_name):
+                raise
+            continue
+        added.append(f"{table_name}.{column_name}")
+        print(f"Schema upgrade: added column {table_name}.{column_name}")
+    return added
+
 
 def seed_initial_data(db: Session) -> None:
     """
     Populates the database with initial default data if it doesn't exist.
+    Checks what exists with two queries and inserts everything missing in one commit.
     """
+    has_criteria = db.query(models.Criterion.id).first() is not None
+    seeded_prompt_types = {prompt_type for (prompt_type,) in db.query(models.Prompt.type).distinct()}
+
     # Seed default criteria
-    if not crud.get_criteria(db):
+    if not has_criteria:
         default_criteria = [
             schemas.CriterionCreate(
                 name="Composition",
@@ -36,12 +97,11 @@ def seed_initial_data(db: Session) -> None:
                 enabled=True
             ),
         ]
-        for c in default_criteria:
-            crud.create_criterion(db, c)
+        db.add_all(models.Criterion(**c.model_dump()) for c in default_criteria)
 
     # Default EVALUATION_PROMPT seeding
-    if not crud.get_prompts_by_type(db, "EVALUATION_PROMPT"):
-        crud.create_prompt(
+    if "EVALUATION_PROMPT" not in seeded_prompt_types:
+        _add_default_prompt(
             db,
             schemas.PromptCreate(
                 type="EVALUATION_PROMPT",
@@ -61,9 +121,30 @@ def seed_initial_data(db: Session) -> None:
             )
         )
 
+    # Default COMBINED_EVALUATION_PROMPT seeding
+    if "COMBINED_EVALUATION_PROMPT" not in seeded_prompt_types:
+        _add_default_prompt(
+            db,
+            schemas.PromptCreate(
+                type="COMBINED_EVALUATION_PROMPT",
+                enabled=True,
+                template="""You are an expert photography judge. Evaluate this photograph against each of the following criteria:
+
+                            {criteria_list}
+
+                            For every criterion provide:
+                            1. A score from 0.0 to 10.0
+                            2. A brief rationale (2-3 sentences)
+
+                            Respond with a single JSON object and no other text, using the criterion names exactly as given:
+                            {{"<criterion name>": {{"score": [number], "rationale": "[explanation]"}}, ...}}""",
+                description="The default prompt used for scoring all criteria in a single call (combined evaluation mode)."
+            )
+        )
+
     # Default REASONING_PROMPT seeding
-    if not crud.get_prompts_by_type(db, "REASONING_PROMPT"):
-        crud.create_prompt(
+    if "REASONING_PROMPT" not in seeded_prompt_types:
+        _add_default_prompt(
             db,
             schemas.PromptCreate(
                 type="REASONING_PROMPT",
@@ -84,9 +165,32 @@ def seed_initial_data(db: Session) -> None:
                                                 description="The default prompt for generating the final overall reasoning and a potentially revised final score."
                                             )
                                         )
+    # Default SCREENING_PROMPT seeding
+    if "SCREENING_PROMPT" not in seeded_prompt_types:
+        _add_default_prompt(
+            db,
+            schemas.PromptCreate(
+                type="SCREENING_PROMPT",
+                enabled=True,
+                template="""You are pre-screening the entries of a large photography competition. Only the most promising photographs will be passed on to the full judging panel.
+
+                            The panel will judge these criteria:
+                            {criteria_list}
+
+                            The competition rules emphasize: {rules}
+
+                            Give one quick overall score for how strong this photograph is against the criteria and the rules.
+
+                            Format your response as:
+                            SCORE: [number from 0.0 to 10.0]
+                            RATIONALE: [one sentence]""",
+                description="The default prompt for the single low-resolution screening call of cascade judging."
+            )
+        )
+
     # Default RULES_SYNTHESIS_PROMPT seeding
-    if not crud.get_prompts_by_type(db, "RULES_SYNTHESIS_PROMPT"):
-        crud.create_prompt(
+    if "RULES_SYNTHESIS_PROMPT" not in seeded_prompt_types:
+        _add_default_prompt(
             db,
             schemas.PromptCreate(
                 type="RULES_SYNTHESIS_PROMPT",
@@ -102,4 +206,14 @@ def seed_initial_data(db: Session) -> None:
                             **Generated Competition Rules:**""",
                                                 description="The default prompt for synthesizing competition guidelines from web search results."
                                             )
-                                        )
\ No newline at end of file
+                                        )
+
+    if db.new:
+        db.commit()
+        # Workers that started before the seed reload their judging configuration
+        crud.bump_config_version(db)
+
+
+def _add_default_prompt(db: Session, prompt: schemas.PromptCreate) -> None:
+    # No prompt of this type exists yet, so there are no others to disable (unlike crud.create_prompt)
+    db.add(models.Prompt(**prompt.model_dump()))
@@ -0,0 +1,205 @@
+# app/crud/async_crud.py
+#
+# AsyncSession variants of the CRUD functions used on the judging path
+# (single/batch judging and the job workers). Relationships are never
+# lazy-loaded here: async sessions cannot emit implicit I/O.
+
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..db import models, schemas
+from .crud import CONFIG_VERSION_ROW_ID, _judgement_scores, add_usage_statement, judgement_usage
+
+
+# --- Judgement CRUD ---
+
+async def create_judgement(db: AsyncSession, judgement_data: dict, stored_filename: str, competition_id: int) -> models.Judgement:
+    """Create a new judgement record together with its per-criterion score rows."""
+    db_judgement = models.Judgement(
+        original_filename=judgement_data['filename'],
+        stored_filename=stored_filename,
+        overall_score=judgement_data['overall_score'],
+        judgement_details=judgement_data,
+        competition_id=competition_id,
+        scores=_judgement_scores(judgement_data, competition_id)
+    )
+    db.add(db_judgement)
+    await db.execute(add_usage_statement(db.bind.dialect.name, competition_id, judgement_usage(judgement_data)))
+    await db.commit()
+    await db.refresh(db_judgement)
+    return db_judgement
+
+
+async def get_screening_scores(db: AsyncSession, competition_id: int) -> List[float]:
+    """The cascade screening scores of a competition's stored judgements, read from their details."""
+    score = models.Judgement.judgement_details[("screening", "score")].as_float()
+    rows = await db.scalars(select(score).where(models.Judgement.competition_id == competition_id, score.is_not(None)))
+    return list(rows)
+
+
+# --- Competition CRUD ---
+
+async def get_competition(db: AsyncSession, competition_id: int) -> models.Competition | None:
+    """Retrieve a single competition by ID."""
+    return await db.get(models.Competition, competition_id)
+
+
+# --- Usage ---
+
+async def get_competition_usage(db: AsyncSession, competition_id: int) -> models.CompetitionUsage | None:
+    """A competition's usage totals and budget; None before its first judgement or budget."""
+    return await db.get(models.CompetitionUsage, competition_id, populate_existing=True)
+
+
+# --- Configuration Version ---
+
+async def get_config_version(db: AsyncSession) -> int:
+    """The current configuration version (0 before the first change is recorded)."""
+    version = await db.scalar(
+        select(models.ConfigVersion.version).where(models.ConfigVersion.id == CONFIG_VERSION_ROW_ID)
+    )
+    return version or 0
+
+
+# --- Judging Job CRUD ---
+
+async def create_judging_job(db: AsyncSession, competition_id: int, files: List[tuple[str, str]]) -> models.JudgingJob:
+    """Create a job with one pending item per spooled upload, given as (original_filename, stored_filename)."""
+    db_job = models.JudgingJob(
+        competition_id=competition_id,
+        status=schemas.JobStatus.QUEUED.value,
+        total_items=len(files)
+    )
+    db_job.items = [
+        models.JobItem(original_filename=original, stored_filename=stored, status=schemas.JobItemStatus.PENDING.value)
+        for original, stored in files
+    ]
+    db.add(db_job)
+    await db.commit()
+    # The timestamps are set by the database; the items keep the IDs assigned by the insert
+    await db.refresh(db_job, ["created_at", "updated_at"])
+    return db_job
+
+
+async def get_job_item_counts(db: AsyncSession, job_id: int) -> Dict[str, int]:
+    """Count a job's items per status."""
+    rows = await db.execute(
+        select(models.JobItem.status, func.count(models.JobItem.id))
+        .where(models.JobItem.job_id == job_id)
+        .group_by(models.JobItem.status)
+    )
+    counts = {status.value: 0 for status in schemas.JobItemStatus}
+    counts.update({status: count for status, count in rows})
+    return counts
+
+
+async def claim_job_item(db: AsyncSession, item_id: int, worker_id: str) -> models.JobItem | None:
+    """
+    Atomically move a pending item to 'running' under a lease held by `worker_id`.
+    Returns None if it was already taken or cancelled.
+    """
+    now = datetime.now(timezone.utc)
+    claimed = await db.execute(
+        update(models.JobItem)
+        .where(models.JobItem.id == item_id, models.JobItem.status == schemas.JobItemStatus.PENDING.value)
+        .values(
+            status=schemas.JobItemStatus.RUNNING.value, attempts=models.JobItem.attempts + 1,
+            claimed_by=worker_id, claimed_at=now, heartbeat_at=now
+        )
+    )
+    if not claimed.rowcount:
+        await db.rollback()
+        return None
+    db_item = await db.scalar(
+        select(models.JobItem).options(selectinload(models.JobItem.job)).where(models.JobItem.id == item_id)
+    )
+    if db_item.job.status == schemas.JobStatus.QUEUED.value:
+        db_item.job.status = schemas.JobStatus.RUNNING.value
+    await db.commit()
+    return db_item
+
+
+async def complete_job_item(db: AsyncSession, item: models.JobItem, judgement_data: dict, competition_id: int) -> models.Judgement:
+    """Store the item's judgement and mark the item done in a single transaction (the checkpoint)."""
+    db_judgement = models.Judgement(
+        original_filename=judgement_data['filename'],
+        stored_filename=item.stored_filename,
+        overall_score=judgement_data['overall_score'],
+        judgement_details=judgement_data,
+        competition_id=competition_id,
+        scores=_judgement_scores(judgement_data, competition_id)
+    )
+    db.add(db_judgement)
+    await db.flush()
+    await db.execute(add_usage_statement(db.bind.dialect.name, competition_id, judgement_usage(judgement_data)))
+    item.judgement_id = db_judgement.id
+    item.status = schemas.JobItemStatus.DONE.value
+    item.error = None
+    await db.commit()
+    await _refresh_job_status(db, item.job_id)
+    return db_judgement
+
+
+async def renew_job_item_lease(db: AsyncSession, item_id: int, worker_id: str) -> bool:
+    """Renew `worker_id`'s lease on a running item. False if the item is no longer running under it."""
+    renewed = await db.execute(
+        update(models.JobItem)
+        .where(
+            models.JobItem.id == item_id,
+            models.JobItem.status == schemas.JobItemStatus.RUNNING.value,
+            models.JobItem.claimed_by == worker_id
+        )
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    await db.commit()
+    return bool(renewed.rowcount)
+
+
+async def expire_job_item_leases(db: AsyncSession, worker_id: str) -> int:
+    """
+    Give up `worker_id`'s leases on its running items, e.g. on shutdown, so the next
+    crud.reset_expired_job_items resumes them without waiting for the leases to run out.
+    """
+    expired = await db.execute(
+        update(models.JobItem)
+        .where(models.JobItem.status == schemas.JobItemStatus.RUNNING.value, models.JobItem.claimed_by == worker_id)
+        .values(heartbeat_at=None)
+    )
+    await db.commit()
+    return expired.rowcount
+
+
+async def defer_job_item(db: AsyncSession, item: models.JobItem, reason: str) -> models.JobItem:
+    """Put a claimed item back to 'pending' without counting the attempt, e.g. while its competition is over budget."""
+    item.status = schemas.JobItemStatus.PENDING.value
+    item.attempts -= 1
+    item.error = reason
+    await db.commit()
+    return item
+
+
+async def fail_job_item(db: AsyncSession, item: models.JobItem, error: str) -> models.JobItem:
+    """Mark an item as failed, keeping its spooled upload for inspection or retry."""
+    item.status = schemas.JobItemStatus.FAILED.value
+    item.error = error
+    await db.commit()
+    await _refresh_job_status(db, item.job_id)
+    return item
+
+
+async def _refresh_job_status(db: AsyncSession, job_id: int) -> None:
+    """Mark a job completed once none of its items are pending or running."""
+    db_job = await db.get(models.JudgingJob, job_id, populate_existing=True)
+    if not db_job or db_job.status == schemas.JobStatus.CANCELLED.value:
+        return
+    unfinished = await db.scalar(select(func.count(models.JobItem.id)).where(
+        models.JobItem.job_id == job_id,
+        models.JobItem.status.in_([schemas.JobItemStatus.PENDING.value, schemas.JobItemStatus.RUNNING.value])
+    ))
+    if not unfinished:
+        db_job.status = schemas.JobStatus.COMPLETED.value
+        await db.commit()
@@ -1,12 +1,16 @@
 # app/crud/crud.py
 
-import os
-from typing import List
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Insert, func, or_, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, defer
 
 from ..db import models, schemas
-from ..core.config import settings
+from ..storage.image_store import image_store
 
 
 # --- Judgement CRUD ---
@@ -16,45 +20,233 @@ def get_judgement(db: Session, judgement_id: int) -> models.Judgement:
     return db.query(models.Judgement).filter(models.Judgement.id == judgement_id).first()
 
 
-def get_judgements(db: Session, skip: int = 0, limit: int = 20) -> List[models.Judgement]:
-    """Retrieve a list of judgements with pagination."""
-    return db.query(models.Judgement).offset(skip).limit(limit).all()
+def _judgement_scores(judgement_data: dict, competition_id: int, fallback_weights: Dict[str, float] | None = None) -> List[models.JudgementScore]:
+    """Build the normalized per-criterion score rows for a judgement's details."""
+    weights = judgement_data.get('criterion_weights') or fallback_weights or {}
+    return [
+        models.JudgementScore(
+            competition_id=competition_id,
+            criterion_name=name,
+            score=score,
+            weight=weights.get(name, 1.0)
+        )
+        for name, score in (judgement_data.get('scores') or {}).items()
+    ]
+
+
+def judgement_usage(judgement_data: dict) -> Dict[str, float]:
+    """The LLM usage a judgement adds to its competition's rollup, from its evaluation stats."""
+    stats = judgement_data.get('evaluation_stats') or {}
+    return {
+        "judgements": 1,
+        "llm_calls": stats.get('llm_calls', 0),
+        "input_tokens": stats.get('input_tokens', 0),
+        "output_tokens": stats.get('output_tokens', 0),
+        "cost_usd": stats.get('cost_usd', 0.0),
+        "screened": int('screening' in judgement_data),
+        "screened_out": int(bool(judgement_data.get('screening_only'))),
+    }
+
+
+def add_usage_statement(dialect_name: str, competition_id: int, usage: Dict[str, float]) -> Insert:
+    """An INSERT ... ON CONFLICT DO UPDATE adding `usage` to a competition's rollup row (SQLite or PostgreSQL)."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    statement = upsert(models.CompetitionUsage).values(competition_id=competition_id, **usage)
+    totals = {name: getattr(models.CompetitionUsage, name) + statement.excluded[name] for name in usage}
+    return statement.on_conflict_do_update(
+        index_elements=[models.CompetitionUsage.competition_id],
+        set_={**totals, "updated_at": func.now()}
+    )
+
+
+def _encode_cursor(*position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
 
 
-def get_judgements_by_competition(db: Session, competition_id: int, skip: int = 0, limit: int = 100) -> List[models.Judgement]:
-    """Retrieve judgements associated with a specific competition."""
-    return db.query(models.Judgement).filter(
-        models.Judgement.competition_id == competition_id
-    ).offset(skip).limit(limit).all()
+def _decode_cursor(cursor: str, size: int) -> tuple:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(position, list) or len(position) != size:
+        raise ValueError("Invalid cursor")
+    return tuple(position)
+
+
+def list_judgements(
+    db: Session,
+    competition_id: int | None = None,
+    sort: schemas.JudgementSort = schemas.JudgementSort.CREATED_AT,
+    descending: bool = True,
+    cursor: str | None = None,
+    limit: int = 20,
+    summary: bool = False
+) -> tuple[List[models.Judgement], str | None]:
+    """
+    Keyset-paginated judgements ordered by (overall_score, id) or by creation time.
+    created_at is assigned at insert, so creation order is id order and the primary key
+    serves as its keyset. Every page costs the same as the first one because it seeks
+    from the cursor instead of skipping rows. With `summary`, the judgement_details
+    column is not loaded. Returns the page and the next page's cursor (None on the last page).
+    """
+    if sort == schemas.JudgementSort.OVERALL_SCORE:
+        key_columns = [models.Judgement.overall_score, models.Judgement.id]
+    else:
+        key_columns = [models.Judgement.id]
+    query = db.query(models.Judgement)
+    if competition_id is not None:
+        query = query.filter(models.Judgement.competition_id == competition_id)
+    if summary:
+        query = query.options(defer(models.Judgement.judgement_details))
+    if cursor:
+        key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+        position = _decode_cursor(cursor, len(key_columns))
+        position = position if len(key_columns) > 1 else position[0]
+        query = query.filter(key < position if descending else key > position)
+
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in key_columns])
+
+    # Fetch one extra row to know whether there is a next page
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(*[getattr(last, c.key) for c in key_columns])
+    return rows, next_cursor
+
+
+def count_judgements(db: Session, competition_id: int | None = None) -> int:
+    """Count judgements, using the competition index when filtered by competition."""
+    query = db.query(func.count(models.Judgement.id))
+    if competition_id is not None:
+        query = query.filter(models.Judgement.competition_id == competition_id)
+    return query.scalar()
 
 
 def create_judgement(db: Session, judgement_data: dict, stored_filename: str, competition_id: int) -> models.Judgement:
-    """Create a new judgement record."""
+    """Create a new judgement record together with its per-criterion score rows."""
     db_judgement = models.Judgement(
         original_filename=judgement_data['filename'],
         stored_filename=stored_filename,
         overall_score=judgement_data['overall_score'],
         judgement_details=judgement_data,
-        competition_id=competition_id
+        competition_id=competition_id,
+        scores=_judgement_scores(judgement_data, competition_id)
     )
     db.add(db_judgement)
+    db.execute(add_usage_statement(db.bind.dialect.name, competition_id, judgement_usage(judgement_data)))
     db.commit()
     db.refresh(db_judgement)
     return db_judgement
 
 
 def delete_judgement(db: Session, judgement_id: int) -> models.Judgement:
-    """Delete a judgement and its associated image file."""
+    """Delete a judgement and release its image."""
     db_judgement = get_judgement(db, judgement_id=judgement_id)
     if db_judgement:
-        image_path = settings.IMAGE_DIR / db_judgement.stored_filename
-        if os.path.exists(image_path):
-            os.remove(image_path)
         db.delete(db_judgement)
         db.commit()
+        # After the commit: the image store writes in its own transaction
+        _release_images([db_judgement.stored_filename])
     return db_judgement
 
 
+def backfill_judgement_scores(db: Session, batch_size: int = 1000) -> int:
+    """
+    Create judgement_scores rows for judgements stored before the table existed.
+    Uses the judge-time weights from the details when recorded, else the current criterion weights.
+    Returns the number of judgements backfilled.
+    """
+    current_weights = {c.name: c.weight for c in get_criteria(db)}
+    backfilled = 0
+    last_id = 0
+    while True:
+        batch = db.query(models.Judgement).filter(
+            models.Judgement.id > last_id,
+            ~models.Judgement.scores.any()
+        ).order_by(models.Judgement.id).limit(batch_size).all()
+        if not batch:
+            return backfilled
+        last_id = batch[-1].id
+        for judgement in batch:
+            if (judgement.judgement_details or {}).get('scores'):
+                judgement.scores = _judgement_scores(judgement.judgement_details, judgement.competition_id, current_weights)
+                backfilled += 1
+        db.commit()
+
+
+def get_competition_ranking(
+    db: Session,
+    competition_id: int,
+    criterion: str | None = None,
+    min_score: float | None = None,
+    max_score: float | None = None,
+    skip: int = 0,
+    limit: int = 50
+) -> List[schemas.RankedJudgement]:
+    """
+    Rank a competition's judgements by overall score, or by one criterion's score.
+    Sorting and filtering run in SQL against the composite score indexes.
+    """
+    if criterion:
+        score_column = models.JudgementScore.score
+        query = db.query(
+            models.Judgement.id, models.Judgement.original_filename, models.Judgement.stored_filename,
+            models.Judgement.overall_score, score_column.label("score")
+        ).join(models.JudgementScore, models.JudgementScore.judgement_id == models.Judgement.id).filter(
+            models.JudgementScore.competition_id == competition_id,
+            models.JudgementScore.criterion_name == criterion
+        )
+    else:
+        score_column = models.Judgement.overall_score
+        query = db.query(
+            models.Judgement.id, models.Judgement.original_filename, models.Judgement.stored_filename,
+            models.Judgement.overall_score, score_column.label("score")
+        ).filter(models.Judgement.competition_id == competition_id)
+
+    if min_score is not None:
+        query = query.filter(score_column >= min_score)
+    if max_score is not None:
+        query = query.filter(score_column <= max_score)
+
+    rows = query.order_by(score_column.desc(), models.Judgement.id).offset(skip).limit(limit).all()
+    return [
+        schemas.RankedJudgement(
+            rank=skip + i,
+            judgement_id=row.id,
+            original_filename=row.original_filename,
+            stored_filename=row.stored_filename,
+            overall_score=row.overall_score,
+            criterion=criterion,
+            score=row.score
+        )
+        for i, row in enumerate(rows, start=1)
+    ]
+
+
+def get_competition_criterion_stats(db: Session, competition_id: int) -> List[schemas.CriterionScoreStats]:
+    """Aggregate per-criterion score statistics for a competition in a single GROUP BY."""
+    rows = db.query(
+        models.JudgementScore.criterion_name,
+        func.count(models.JudgementScore.id),
+        func.avg(models.JudgementScore.score),
+        func.min(models.JudgementScore.score),
+        func.max(models.JudgementScore.score)
+    ).filter(models.JudgementScore.competition_id == competition_id).group_by(
+        models.JudgementScore.criterion_name
+    ).order_by(models.JudgementScore.criterion_name).all()
+    return [
+        schemas.CriterionScoreStats(
+            criterion=name, count=count, average=round(avg, 2), minimum=minimum, maximum=maximum
+        )
+        for name, count, avg, minimum, maximum in rows
+    ]
+
+
 # --- Competition CRUD ---
 
 def get_competition(db: Session, competition_id: int) -> models.Competition:
@@ -77,27 +269,43 @@ def create_competition(db: Session, competition: schemas.CompetitionCreate) -> m
 
 
 def delete_competition(db: Session, competition_id: int) -> models.Competition:
-    """Delete a competition and all associated judgements and image files."""
+    """
+    Delete a competition with all its judgements, scores and judging jobs using bulk
+    statements. Its images are released on a background thread after the commit.
+    Callers first stop its jobs with `cancel_competition_jobs` and wait for running items.
+    """
     db_competition = get_competition(db, competition_id=competition_id)
     if db_competition:
-        judgements_to_delete = db.query(models.Judgement).filter(
+        # Only the filenames are loaded, never the judgements themselves
+        released = [name for (name,) in db.query(models.Judgement.stored_filename).filter(
             models.Judgement.competition_id == competition_id
-        ).all()
-
-        for judgement in judgements_to_delete:
-            if judgement.stored_filename:
-                image_path = settings.IMAGE_DIR / judgement.stored_filename
-                if os.path.exists(image_path):
-                    try:
-                        os.remove(image_path)
-                    except OSError as e:
-                        print(f"Error deleting file {image_path}: {e}")
-
-        for judgement in judgements_to_delete:
-            db.delete(judgement)
-
+        )]
+        job_ids = db.query(models.JudgingJob.id).filter(
+            models.JudgingJob.competition_id == competition_id
+        ).scalar_subquery()
+        # Uploads of the competition's jobs never judged; cancelled items' uploads were released on
+        # cancellation, and a running item's upload is still in use
+        released += [name for (name,) in db.query(models.JobItem.stored_filename).filter(
+            models.JobItem.job_id.in_(job_ids), models.JobItem.judgement_id.is_(None),
+            models.JobItem.status.notin_([schemas.JobItemStatus.RUNNING.value, schemas.JobItemStatus.CANCELLED.value])
+        )]
+
+        db.query(models.JudgementScore).filter(
+            models.JudgementScore.competition_id == competition_id
+        ).delete(synchronize_session=False)
+        db.query(models.JobItem).filter(models.JobItem.job_id.in_(job_ids)).delete(synchronize_session=False)
+        db.query(models.JudgingJob).filter(
+            models.JudgingJob.competition_id == competition_id
+        ).delete(synchronize_session=False)
+        db.query(models.Judgement).filter(
+            models.Judgement.competition_id == competition_id
+        ).delete(synchronize_session=False)
+        db.query(models.CompetitionUsage).filter(
+            models.CompetitionUsage.competition_id == competition_id
+        ).delete(synchronize_session=False)
         db.delete(db_competition)
         db.commit()
+        _release_images(released)
     return db_competition
 
 
@@ -113,6 +321,30 @@ def update_competition(db: Session, competition_id: int, competition_update: sch
     return db_competition
 
 
+# --- Usage and Budget CRUD ---
+
+def get_competition_usage(db: Session, competition_id: int) -> models.CompetitionUsage | None:
+    """A competition's usage totals and budget; None before its first judgement or budget."""
+    return db.get(models.CompetitionUsage, competition_id)
+
+
+def set_competition_budget(db: Session, competition_id: int, budget_usd: float | None) -> models.CompetitionUsage:
+    """Set or (with None) remove a competition's budget."""
+    usage = get_competition_usage(db, competition_id)
+    if usage is None:
+        usage = models.CompetitionUsage(competition_id=competition_id)
+        db.add(usage)
+    usage.budget_usd = budget_usd
+    try:
+        db.commit()
+    except IntegrityError:
+        # A judgement created the row first
+        db.rollback()
+        return set_competition_budget(db, competition_id, budget_usd)
+    db.refresh(usage)
+    return usage
+
+
 # --- Criterion CRUD ---
 
 def get_criterion(db: Session, criterion_id: int) -> models.Criterion:
@@ -229,4 +461,146 @@ def delete_prompt(db: Session, prompt_id: int) -> models.Prompt | None:
     if db_prompt:
         db.delete(db_prompt)
         db.commit()
-    return db_prompt
\ No newline at end of file
+    return db_prompt
+
+
+# --- Configuration Version ---
+
+CONFIG_VERSION_ROW_ID = 1
+
+
+def bump_config_version(db: Session) -> None:
+    """
+    Record a change to competitions, criteria or prompts, so every worker process
+    reloads its cached judging configuration. Call it after the change is committed.
+    """
+    bumped = db.query(models.ConfigVersion).filter(
+        models.ConfigVersion.id == CONFIG_VERSION_ROW_ID
+    ).update({"version": models.ConfigVersion.version + 1}, synchronize_session=False)
+    if not bumped:
+        db.add(models.ConfigVersion(id=CONFIG_VERSION_ROW_ID, version=1))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process created the row first
+        db.rollback()
+        bump_config_version(db)
+
+
+# --- Judging Job CRUD ---
+
+def _release_images(stored_filenames: List[str]) -> None:
+    """Release images from the image store in the background; call only after committing."""
+    image_store.release_in_background(stored_filenames)
+
+
+def get_judging_job(db: Session, job_id: int) -> models.JudgingJob:
+    """Retrieve a single judging job by ID."""
+    return db.query(models.JudgingJob).filter(models.JudgingJob.id == job_id).first()
+
+
+def get_judging_jobs(db: Session, skip: int = 0, limit: int = 20) -> List[models.JudgingJob]:
+    """Retrieve judging jobs, newest first."""
+    return db.query(models.JudgingJob).order_by(models.JudgingJob.id.desc()).offset(skip).limit(limit).all()
+
+
+def get_job_item_counts(db: Session, job_id: int) -> Dict[str, int]:
+    """Count a job's items per status."""
+    rows = db.query(models.JobItem.status, func.count(models.JobItem.id)).filter(
+        models.JobItem.job_id == job_id
+    ).group_by(models.JobItem.status).all()
+    counts = {status.value: 0 for status in schemas.JobItemStatus}
+    counts.update({status: count for status, count in rows})
+    return counts
+
+
+def get_job_items(db: Session, job_id: int) -> List[models.JobItem]:
+    """Retrieve all items of a judging job."""
+    return db.query(models.JobItem).filter(models.JobItem.job_id == job_id).order_by(models.JobItem.id).all()
+
+
+def reset_expired_job_items(db: Session, lease_seconds: float) -> List[int]:
+    """
+    Running items whose lease was not renewed for `lease_seconds` were left behind by
+    a worker that died or shut down. Reset them to 'pending' and return their IDs, or
+    cancel them if their job was cancelled in the meantime. Items that live workers
+    are judging are left alone.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+    interrupted = db.query(models.JobItem).filter(
+        models.JobItem.status == schemas.JobItemStatus.RUNNING.value,
+        or_(models.JobItem.heartbeat_at.is_(None), models.JobItem.heartbeat_at < cutoff)
+    ).all()
+    released = []
+    reset = []
+    for item in interrupted:
+        if item.job.status == schemas.JobStatus.CANCELLED.value:
+            released.append(item.stored_filename)
+            item.status = schemas.JobItemStatus.CANCELLED.value
+        else:
+            reset.append(item.id)
+            item.status = schemas.JobItemStatus.PENDING.value
+        item.claimed_by = None
+    db.commit()
+    _release_images(released)
+    return sorted(reset)
+
+
+def get_resumable_job_item_ids(db: Session, lease_seconds: float) -> List[int]:
+    """
+    Return the IDs of all items that still need judging, oldest first, after
+    resetting the running items whose lease expired (see reset_expired_job_items).
+    """
+    reset_expired_job_items(db, lease_seconds)
+    rows = db.query(models.JobItem.id).join(models.JudgingJob).filter(
+        models.JobItem.status == schemas.JobItemStatus.PENDING.value,
+        models.JudgingJob.status != schemas.JobStatus.CANCELLED.value
+    ).order_by(models.JobItem.id).all()
+    return [item_id for (item_id,) in rows]
+
+
+def get_pending_job_item_ids(db: Session, competition_id: int) -> List[int]:
+    """The IDs of a competition's items waiting to be judged (e.g. deferred by its budget), oldest first."""
+    rows = db.query(models.JobItem.id).join(models.JudgingJob).filter(
+        models.JudgingJob.competition_id == competition_id,
+        models.JudgingJob.status != schemas.JobStatus.CANCELLED.value,
+        models.JobItem.status == schemas.JobItemStatus.PENDING.value
+    ).order_by(models.JobItem.id).all()
+    return [item_id for (item_id,) in rows]
+
+
+def cancel_competition_jobs(db: Session, competition_id: int) -> int:
+    """
+    Cancel every unfinished job of a competition like `cancel_judging_job`, so none of
+    their items is claimed any more. Returns how many items are still being judged.
+    """
+    job_ids = [job_id for (job_id,) in db.query(models.JudgingJob.id).filter(
+        models.JudgingJob.competition_id == competition_id,
+        models.JudgingJob.status.notin_([schemas.JobStatus.COMPLETED.value, schemas.JobStatus.CANCELLED.value])
+    )]
+    for job_id in job_ids:
+        cancel_judging_job(db, job_id)
+    return db.query(func.count(models.JobItem.id)).join(models.JudgingJob).filter(
+        models.JudgingJob.competition_id == competition_id,
+        models.JobItem.status == schemas.JobItemStatus.RUNNING.value
+    ).scalar()
+
+
+def cancel_judging_job(db: Session, job_id: int) -> models.JudgingJob:
+    """
+    Cancel a job: pending items are cancelled and their uploads removed.
+    Items already running finish and keep their judgements.
+    """
+    db_job = get_judging_job(db, job_id)
+    if db_job and db_job.status != schemas.JobStatus.COMPLETED.value:
+        pending_items = db.query(models.JobItem).filter(
+            models.JobItem.job_id == job_id,
+            models.JobItem.status == schemas.JobItemStatus.PENDING.value
+        ).all()
+        for item in pending_items:
+            item.status = schemas.JobItemStatus.CANCELLED.value
+        db_job.status = schemas.JobStatus.CANCELLED.value
+        db.commit()
+        _release_images([item.stored_filename for item in pending_items])
+        db.refresh(db_job)
+    return db_job
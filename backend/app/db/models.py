@@ -2,7 +2,7 @@
 
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, JSON, Boolean,
-    ForeignKey, Text
+    ForeignKey, Text, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,8 @@ class Competition(Base):
     name = Column(String, nullable=False, unique=True, index=True)
     description = Column(String)
     rules = Column(String)  # Used for reasoning prompt
+    evaluation_mode = Column(String, nullable=True)  # Falls back to settings.EVALUATION_MODE
+    cascade_enabled = Column(Boolean, nullable=True)  # Falls back to settings.CASCADE_ENABLED
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     judgements = relationship("Judgement", back_populates="competition")
@@ -34,6 +36,51 @@ class Judgement(Base):
 
     competition_id = Column(Integer, ForeignKey("competitions.id"))
     competition = relationship("Competition", back_populates="judgements")
+    scores = relationship("JudgementScore", back_populates="judgement", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_judgements_competition_overall_score", "competition_id", "overall_score"),
+        # Entries are ordered by rowid, so this also serves created_at (= id) ordering per competition
+        Index("ix_judgements_competition_id", "competition_id"),
+    )
+
+
+class JudgementScore(Base):
+    """One row per criterion score of a judgement, mirroring judgement_details["scores"] for SQL queries."""
+    __tablename__ = "judgement_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    judgement_id = Column(Integer, ForeignKey("judgements.id"), nullable=False, index=True)
+    competition_id = Column(Integer, ForeignKey("competitions.id"), nullable=False)  # Denormalized for ranking queries
+    criterion_name = Column(String, nullable=False)
+    score = Column(Float, nullable=False)
+    weight = Column(Float, nullable=False)  # Criterion weight at judge time
+
+    judgement = relationship("Judgement", back_populates="scores")
+
+    __table_args__ = (
+        Index("ix_judgement_scores_criterion_score", "criterion_name", "score"),
+        Index("ix_judgement_scores_competition_criterion_score", "competition_id", "criterion_name", "score"),
+    )
+
+
+class CompetitionUsage(Base):
+    """
+    Running totals of a competition's LLM usage, updated in the transaction that stores
+    each judgement, and its optional budget. Deleting judgements does not refund their cost.
+    """
+    __tablename__ = "competition_usage"
+
+    competition_id = Column(Integer, ForeignKey("competitions.id"), primary_key=True)
+    judgements = Column(Integer, nullable=False, default=0)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    input_tokens = Column(Integer, nullable=False, default=0)
+    output_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    screened = Column(Integer, nullable=False, default=0)  # Photos given a cascade screening call
+    screened_out = Column(Integer, nullable=False, default=0)  # Of which stored as screening-only judgements
+    budget_usd = Column(Float, nullable=True)  # No limit when unset
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 class Prompt(Base):
@@ -53,4 +100,68 @@ class Criterion(Base):
     name = Column(String, nullable=False, unique=True, index=True)
     description = Column(String, nullable=False)  # Explains the judging criterion
     weight = Column(Float, default=1.0)
-    enabled = Column(Boolean, default=True)
\ No newline at end of file
+    enabled = Column(Boolean, default=True)
+
+
+class ConfigVersion(Base):
+    """
+    Single-row counter bumped on every change to competitions, criteria or prompts,
+    so each worker process can tell when its cached judging configuration is stale.
+    """
+    __tablename__ = "config_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class JudgingJob(Base):
+    __tablename__ = "judging_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    competition_id = Column(Integer, ForeignKey("competitions.id"), index=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # see schemas.JobStatus
+    total_items = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    items = relationship("JobItem", back_populates="job", order_by="JobItem.id")
+
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("judging_jobs.id"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending", index=True)  # see schemas.JobItemStatus
+    original_filename = Column(String, nullable=False)
+    stored_filename = Column(String, nullable=False, index=True)  # Image store name of the upload (see ImageRef)
+    judgement_id = Column(Integer, ForeignKey("judgements.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Lease of the worker judging a running item, renewed by its heartbeat; see crud.get_resumable_job_item_ids
+    claimed_by = Column(String, nullable=True)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    job = relationship("JudgingJob", back_populates="items")
+
+
+class ImageBlob(Base):
+    """A stored image file, content-addressed by SHA-256 and shared by every upload with the same bytes."""
+    __tablename__ = "image_blobs"
+
+    key = Column(String, primary_key=True)  # "<sha256><suffix>"
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ImageRef(Base):
+    """
+    Maps a stored filename (the per-upload name used by judgements, job items and
+    /images URLs) to its blob. A blob is deleted when its last reference goes.
+    """
+    __tablename__ = "image_refs"
+
+    name = Column(String, primary_key=True)
+    blob_key = Column(String, ForeignKey("image_blobs.key"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -4,13 +4,15 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from enum import Enum
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # --- Prompt Schemas ---
 class PromptType(str, Enum):
     EVALUATION_PROMPT = "EVALUATION_PROMPT"
+    COMBINED_EVALUATION_PROMPT = "COMBINED_EVALUATION_PROMPT"
     REASONING_PROMPT = "REASONING_PROMPT"
+    SCREENING_PROMPT = "SCREENING_PROMPT"
     RULES_SYNTHESIS_PROMPT = "RULES_SYNTHESIS_PROMPT"
 
 
@@ -66,10 +68,17 @@ class Criterion(CriterionBase):
 
 
 # --- Competition Schemas ---
+class EvaluationMode(str, Enum):
+    PER_CRITERION = "per_criterion"
+    COMBINED = "combined"
+
+
 class CompetitionBase(BaseModel):
     name: str
     description: Optional[str] = None
     rules: Optional[str] = None
+    evaluation_mode: Optional[EvaluationMode] = None
+    cascade_enabled: Optional[bool] = None
 
 
 class CompetitionCreate(CompetitionBase):
@@ -80,6 +89,8 @@ class CompetitionUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     rules: Optional[str] = None
+    evaluation_mode: Optional[EvaluationMode] = None
+    cascade_enabled: Optional[bool] = None
 
 
 class Competition(CompetitionBase):
@@ -101,6 +112,29 @@ class JudgementBase(BaseModel):
     judgement_details: Dict[str, Any]
 
 
+class JudgementSort(str, Enum):
+    CREATED_AT = "created_at"
+    OVERALL_SCORE = "overall_score"
+
+
+class JudgementFields(str, Enum):
+    FULL = "full"
+    SUMMARY = "summary"
+
+
+class JudgementSummary(BaseModel):
+    """A judgement without the heavy judgement_details JSON."""
+    id: int
+    original_filename: str
+    stored_filename: str
+    overall_score: float
+    created_at: datetime
+    competition_id: int
+
+    class Config:
+        from_attributes = True
+
+
 class JudgementCreate(JudgementBase):
     stored_filename: str
     competition_id: int
@@ -113,4 +147,125 @@ class Judgement(JudgementBase):
     competition_id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RankedJudgement(BaseModel):
+    rank: int
+    judgement_id: int
+    original_filename: str
+    stored_filename: str
+    overall_score: float
+    criterion: Optional[str] = None
+    score: float
+
+
+class CriterionScoreStats(BaseModel):
+    criterion: str
+    count: int
+    average: float
+    minimum: float
+    maximum: float
+
+
+class RescoredJudgement(BaseModel):
+    id: int
+    original_filename: str
+    previous_score: float
+    overall_score: float
+    rank: int
+
+
+class RescoreResult(BaseModel):
+    competition_id: int
+    dry_run: bool
+    weights: Dict[str, float]
+    judgements: int
+    changed: int
+    skipped: int = 0  # Judgements scored on none of the enabled criteria; their score is kept
+    compute_ms: float
+    ranking: List[RescoredJudgement]
+
+
+# --- Usage and Cost Schemas ---
+class CompetitionUsage(BaseModel):
+    competition_id: int
+    judgements: int = 0
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    screened: int = 0  # Photos given a cascade screening call
+    screened_out: int = 0  # Of which stored as screening-only judgements
+    budget_usd: Optional[float] = None
+    remaining_usd: Optional[float] = None
+
+
+class BudgetUpdate(BaseModel):
+    budget_usd: Optional[float] = Field(None, ge=0, description="Spending limit in USD; null removes it")
+
+
+class CostEstimate(BaseModel):
+    competition_id: int
+    images: int
+    evaluation_mode: EvaluationMode
+    # The full panel (criteria and head-judge reasoning) of one photo
+    llm_calls_per_image: int
+    image_tokens_per_call: int
+    input_tokens_per_image: int
+    output_tokens_per_image: int
+    output_tokens_basis: str  # "observed" (this competition's average so far) or "default"
+    full_panel_cost_per_image_usd: float
+    # Cascade judging: a screening call per photo, the full panel only for the share that passes
+    cascade_enabled: bool = False
+    screening_cost_per_image_usd: Optional[float] = None
+    cascade_pass_rate: Optional[float] = None
+    cascade_pass_rate_basis: Optional[str] = None  # "observed" or "default" (everything passes)
+    screened: int = 0
+    screened_out: int = 0
+    cascade_savings_usd: Optional[float] = None  # Full panels skipped so far, less the screening calls
+    cost_per_image_usd: float
+    total_cost_usd: float
+    observed_cost_per_image_usd: Optional[float] = None  # Includes result cache hits
+    budget_usd: Optional[float] = None
+    spent_usd: float = 0.0
+    remaining_usd: Optional[float] = None
+    images_within_budget: Optional[int] = None
+
+
+# --- Judging Job Schemas ---
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class JobItemStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobItem(BaseModel):
+    id: int
+    status: JobItemStatus
+    original_filename: str
+    judgement_id: Optional[int] = None
+    error: Optional[str] = None
+    attempts: int
+
+    class Config:
+        from_attributes = True
+
+
+class JudgingJob(BaseModel):
+    id: int
+    competition_id: int
+    status: JobStatus
+    total_items: int
+    item_counts: Dict[JobItemStatus, int]
+    created_at: datetime
+    updated_at: Optional[datetime] = None
@@ -1,15 +1,19 @@
 # app/main.py
-from fastapi import FastAPI
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from .core import metrics
 from .core.config import settings
-from .core.startup import seed_initial_data
-from .db.database import SessionLocal, engine
-from .db import models
-from .api.routers import judging, management, images
-
-# --- Initialize Database ---
-models.Base.metadata.create_all(bind=engine)
+from .core.startup import create_schema, seed_initial_data
+from .db.database import SessionLocal, async_engine, engine
+from .api.routers import judging, management, images, stats, jobs
+from .services.job_service import job_worker_pool
+from .services.judgement_writer import judgement_writer
+from .storage.image_store import image_store
 
 # --- App Setup ---
 app = FastAPI(
@@ -25,21 +29,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "Server-Timing"],
 )
 
+# --- Upload Size Limit ---
+# Multipart framing on top of the batch limit
+_REQUEST_SIZE_MARGIN = 1024 * 1024
+
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    """Reject requests whose declared body exceeds the batch upload limit before it is read."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_BATCH_UPLOAD_BYTES + _REQUEST_SIZE_MARGIN:
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds the maximum total upload size of {settings.MAX_BATCH_UPLOAD_BYTES} bytes"}
+        )
+    return await call_next(request)
+
+# --- Metrics ---
+if settings.METRICS_ENABLED:
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(async_engine.sync_engine)
+
+    @app.middleware("http")
+    async def server_timing(request: Request, call_next):
+        """Time each request by route and report its stages (judging nodes, LLM calls, DB queries) in Server-Timing."""
+        with metrics.request_timings() as timings:
+            start = time.perf_counter()
+            response = await call_next(request)
+            elapsed = time.perf_counter() - start
+        # The route template rather than the path, so /images/{filename} is one series
+        route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+        metrics.http_request_seconds.observe(
+            elapsed, method=request.method, route=route, status=str(response.status_code)
+        )
+        response.headers["Server-Timing"] = metrics.server_timing_header(timings, elapsed)
+        return response
+
 # --- Startup Event ---
 @app.on_event("startup")
 def startup_event():
+    # Schema creation runs here rather than at import, so importing the app has no side effects
+    create_schema(engine)
     db = SessionLocal()
     try:
         seed_initial_data(db)
     finally:
         db.close()
 
+
+@app.on_event("startup")
+async def start_job_workers():
+    await job_worker_pool.start()
+
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_worker_pool.stop()
+    await judgement_writer.close()
+    # Finish releasing images of deleted judgements; the garbage collector catches anything cut short
+    await asyncio.to_thread(image_store.wait_for_releases)
+    await async_engine.dispose()
+
 # --- Include Routers ---
 app.include_router(judging.router)
 app.include_router(management.router)
 app.include_router(images.router)
+app.include_router(stats.router)
+app.include_router(jobs.router)
 
 # --- Root Endpoint ---
 @app.get("/", tags=["General"])
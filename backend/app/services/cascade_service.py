@@ -0,0 +1,134 @@
+# app/services/cascade_service.py
+
+import asyncio
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core import metrics
+from ..core.config import settings
+from ..crud import async_crud
+from ..db.database import end_read
+from .config_cache import CompetitionConfig
+
+cascade_photos = metrics.registry.counter(
+    "photo_judge_cascade_photos_total", "Photos screened by cascade judging, by decision reason.", ("reason",)
+)
+
+# Why a screened photo went on to the full panel, or "below_cutoff" if it did not
+PASS_REASONS = ("threshold", "top_percent", "warmup", "screening_failed")
+
+
+def cascade_enabled(competition: CompetitionConfig) -> bool:
+    """Whether a competition is judged in cascade mode (its own setting, else CASCADE_ENABLED)."""
+    if competition.cascade_enabled is None:
+        return settings.CASCADE_ENABLED
+    return competition.cascade_enabled
+
+
+@dataclass(frozen=True)
+class ScreeningDecision:
+    passed: bool
+    reason: str  # One of PASS_REASONS, or "below_cutoff"
+    rank: int  # Photos of the competition that screened higher before this one
+    screened_before: int
+
+
+class ScreeningTracker:
+    """
+    Decides which screened photos go on to the full panel: those scoring at least
+    `threshold`, and those within the top `top_percent` of their competition's screening
+    scores so far (once `min_screened` photos were screened; before that, all of them).
+    Photos whose screening call failed always go on.
+
+    Each competition's sorted scores are loaded from its stored judgements on first use
+    and then kept up to date by this process. They are reloaded every `reload_seconds`,
+    which picks up the photos screened by other worker processes.
+    """
+
+    def __init__(self, threshold: float, top_percent: float, min_screened: int, reload_seconds: float = 300.0):
+        self.threshold = threshold
+        self.top_percent = top_percent
+        self.min_screened = min_screened
+        self.reload_seconds = reload_seconds
+        self._competitions: Dict[int, tuple[float, List[float]]] = {}
+        self._load_lock: asyncio.Lock | None = None
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.decisions = {reason: 0 for reason in (*PASS_REASONS, "below_cutoff")}
+
+    def _fresh(self, entry: tuple[float, List[float]] | None) -> bool:
+        return entry is not None and time.monotonic() - entry[0] < self.reload_seconds
+
+    async def _scores(self, db: AsyncSession, competition_id: int) -> List[float]:
+        entry = self._competitions.get(competition_id)
+        if self._fresh(entry):
+            return entry[1]
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        # Concurrent photos of a competition that is not loaded yet share one load
+        async with self._load_lock:
+            entry = self._competitions.get(competition_id)
+            if not self._fresh(entry):
+                scores = sorted(await async_crud.get_screening_scores(db, competition_id))
+                await end_read(db)
+                entry = (time.monotonic(), scores)
+                with self._lock:
+                    self._competitions[competition_id] = entry
+                    self.loads += 1
+        return entry[1]
+
+    async def decide(self, db: AsyncSession, competition_id: int, score: float | None) -> ScreeningDecision:
+        """Decide on a photo's screening score (None if the call failed) and add it to the competition's scores."""
+        scores = await self._scores(db, competition_id)
+        with self._lock:
+            screened_before = len(scores)
+            rank = screened_before - bisect.bisect_right(scores, score) if score is not None else 0
+            if score is None:
+                reason = "screening_failed"
+            elif score >= self.threshold:
+                reason = "threshold"
+            elif screened_before < self.min_screened:
+                reason = "warmup"
+            elif rank < self.top_percent / 100 * (screened_before + 1):
+                reason = "top_percent"
+            else:
+                reason = "below_cutoff"
+            if score is not None:
+                bisect.insort(scores, score)
+            self.decisions[reason] += 1
+        cascade_photos.inc(reason=reason)
+        return ScreeningDecision(
+            passed=reason != "below_cutoff", reason=reason, rank=rank, screened_before=screened_before
+        )
+
+    def forget(self, competition_id: int) -> None:
+        """Drop a competition's scores, e.g. after it was deleted."""
+        with self._lock:
+            self._competitions.pop(competition_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            screened = sum(self.decisions.values())
+            screened_out = self.decisions["below_cutoff"]
+            return {
+                "threshold": self.threshold,
+                "top_percent": self.top_percent,
+                "min_screened": self.min_screened,
+                "competitions_loaded": len(self._competitions),
+                "loads": self.loads,
+                "screened": screened,
+                "passed": screened - screened_out,
+                "screened_out": screened_out,
+                "screened_out_ratio": round(screened_out / screened, 4) if screened else 0.0,
+                "decisions": dict(self.decisions),
+            }
+
+
+screening_tracker = ScreeningTracker(
+    settings.CASCADE_SCREENING_THRESHOLD, settings.CASCADE_TOP_PERCENT, settings.CASCADE_MIN_SCREENED
+)
@@ -0,0 +1,147 @@
+# app/services/config_cache.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud import async_crud, crud
+from ..db import models
+from ..db.database import end_read
+
+
+@dataclass(frozen=True)
+class CompetitionConfig:
+    id: int
+    name: str
+    rules: str | None
+    evaluation_mode: str | None
+    cascade_enabled: bool | None
+
+
+@dataclass(frozen=True)
+class CriterionConfig:
+    name: str
+    description: str
+    weight: float
+
+
+@dataclass(frozen=True)
+class JudgingConfig:
+    """
+    Immutable snapshot of everything judging reads from the database: competitions,
+    enabled criteria and the enabled prompt template of each type. A batch judges
+    every photo with one snapshot, so edits made mid-batch do not mix configurations.
+    """
+    version: int
+    competitions: Mapping[int, CompetitionConfig]
+    criteria: Tuple[CriterionConfig, ...]
+    prompts: Mapping[str, str]  # Prompt type -> template of its enabled prompt
+
+    def competition(self, competition_id: int) -> CompetitionConfig | None:
+        return self.competitions.get(competition_id)
+
+    def prompt(self, prompt_type: str) -> str | None:
+        return self.prompts.get(prompt_type)
+
+
+class ConfigCache:
+    """
+    In-process cache of the current JudgingConfig. It is reloaded when the
+    configuration version in the database changes, which is checked at most
+    every `check_interval` seconds (0 = on every `get`); changes made through
+    this process are seen immediately.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._config: JudgingConfig | None = None
+        self._checked_at = 0.0
+        self._generation = 0  # Bumped by local invalidations
+        self._load_lock: asyncio.Lock | None = None
+        self.hits = 0
+        self.loads = 0
+        self.version_checks = 0
+
+    def invalidate(self, db: Session) -> None:
+        """Write-through invalidation after committing a change to competitions, criteria or prompts."""
+        crud.bump_config_version(db)
+        self._generation += 1
+        self._config = None
+
+    async def get(self, db: AsyncSession) -> JudgingConfig:
+        """The current snapshot; one version query when the check interval has passed, a full load when stale."""
+        config = self._config
+        if config is not None and time.monotonic() - self._checked_at < self.check_interval:
+            self.hits += 1
+            return config
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        # Concurrent photos of a batch share a single check and load
+        async with self._load_lock:
+            config = self._config
+            if config is not None and time.monotonic() - self._checked_at < self.check_interval:
+                self.hits += 1
+                return config
+            generation = self._generation
+            # The version is read before the rows: a change committed in between only causes an extra reload
+            version = await async_crud.get_config_version(db)
+            self.version_checks += 1
+            if config is None or config.version != version:
+                config = await self._load(db, version)
+                self.loads += 1
+            else:
+                self.hits += 1
+            # Not kept if this process changed the configuration while it was loading
+            if generation == self._generation:
+                self._config = config
+                self._checked_at = time.monotonic()
+            await end_read(db)
+            return config
+
+    @staticmethod
+    async def _load(db: AsyncSession, version: int) -> JudgingConfig:
+        competitions = {
+            c.id: CompetitionConfig(
+                id=c.id, name=c.name, rules=c.rules, evaluation_mode=c.evaluation_mode, cascade_enabled=c.cascade_enabled
+            )
+            for c in await db.scalars(select(models.Competition))
+        }
+        criteria = tuple(
+            CriterionConfig(name=c.name, description=c.description, weight=c.weight)
+            for c in await db.scalars(
+                select(models.Criterion).where(models.Criterion.enabled.is_(True)).order_by(models.Criterion.id)
+            )
+        )
+        prompts: Dict[str, str] = {}
+        for p in await db.scalars(
+            select(models.Prompt).where(models.Prompt.enabled.is_(True)).order_by(models.Prompt.id)
+        ):
+            # Same choice as get_enabled_prompt_by_type should several be enabled: the first one
+            prompts.setdefault(p.type, p.template)
+        return JudgingConfig(
+            version=version,
+            competitions=MappingProxyType(competitions),
+            criteria=criteria,
+            prompts=MappingProxyType(prompts)
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        config = self._config
+        return {
+            "version": config.version if config else None,
+            "competitions": len(config.competitions) if config else 0,
+            "criteria": len(config.criteria) if config else 0,
+            "hits": self.hits,
+            "loads": self.loads,
+            "version_checks": self.version_checks,
+        }
+
+
+config_cache = ConfigCache(check_interval=settings.CONFIG_CACHE_CHECK_INTERVAL)
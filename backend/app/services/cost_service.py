@@ -0,0 +1,203 @@
+# app/services/cost_service.py
+
+import math
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..crud import async_crud
+from ..db import models, schemas
+from ..db.database import end_read
+from . import cascade_service
+from .config_cache import JudgingConfig
+
+# Gemini bills an image of at most 384 px on both sides as one tile, and cuts larger ones into 768 px tiles
+IMAGE_TILE_TOKENS = 258
+_SMALL_IMAGE_EDGE = 384
+_TILE_EDGE = 768
+# Rough size of a text token, as in the fake LLM's usage metadata
+_CHARS_PER_TOKEN = 4
+# The user turn of the evaluation prompts (see PhotoJudgeApp._get_chain)
+_EVALUATION_REQUEST = "Please evaluate this photograph."
+
+
+def llm_cost(input_tokens: int, output_tokens: int) -> float:
+    """USD cost of the given token counts at the configured prices."""
+    return (
+        input_tokens * settings.LLM_INPUT_COST_PER_MILLION_TOKENS
+        + output_tokens * settings.LLM_OUTPUT_COST_PER_MILLION_TOKENS
+    ) / 1_000_000
+
+
+def image_tokens(width: int, height: int) -> int:
+    """Input tokens of one image of the given size."""
+    if width <= _SMALL_IMAGE_EDGE and height <= _SMALL_IMAGE_EDGE:
+        return IMAGE_TILE_TOKENS
+    return math.ceil(width / _TILE_EDGE) * math.ceil(height / _TILE_EDGE) * IMAGE_TILE_TOKENS
+
+
+def _text_tokens(text: str) -> int:
+    return max(1, len(text) // _CHARS_PER_TOKEN)
+
+
+# --- Usage and budgets ---
+
+def usage_summary(competition_id: int, usage: models.CompetitionUsage | None) -> schemas.CompetitionUsage:
+    if usage is None:
+        return schemas.CompetitionUsage(competition_id=competition_id)
+    remaining = None if usage.budget_usd is None else max(0.0, usage.budget_usd - usage.cost_usd)
+    return schemas.CompetitionUsage(
+        competition_id=competition_id,
+        judgements=usage.judgements,
+        llm_calls=usage.llm_calls,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cost_usd=round(usage.cost_usd, 6),
+        screened=usage.screened,
+        screened_out=usage.screened_out,
+        budget_usd=usage.budget_usd,
+        remaining_usd=None if remaining is None else round(remaining, 6)
+    )
+
+
+async def check_budget(db: AsyncSession, competition_id: int, additional_cost_usd: float = 0.0) -> None:
+    """
+    Raise 402 if the competition has spent its budget, or if `additional_cost_usd`
+    (e.g. a batch's estimate) would take it over. Competitions without a budget pass.
+    Photos already being judged are not counted, so concurrent work can overshoot a little.
+    """
+    usage = await async_crud.get_competition_usage(db, competition_id)
+    await end_read(db)
+    if usage is None or usage.budget_usd is None:
+        return
+    remaining = usage.budget_usd - usage.cost_usd
+    if remaining <= 0:
+        raise HTTPException(
+            status_code=402,
+            detail=f"Competition budget of ${usage.budget_usd:.2f} is exhausted (${usage.cost_usd:.2f} spent)"
+        )
+    if additional_cost_usd > remaining:
+        raise HTTPException(
+            status_code=402,
+            detail=f"Estimated cost ${additional_cost_usd:.2f} exceeds the ${remaining:.2f} left of the competition budget"
+        )
+
+
+async def check_batch_budget(db: AsyncSession, config: JudgingConfig, competition_id: int, images: int) -> None:
+    """Reject a whole batch up front (402) if its estimated cost does not fit in the competition's remaining budget."""
+    usage = await async_crud.get_competition_usage(db, competition_id)
+    if usage is None or usage.budget_usd is None:
+        await end_read(db)
+        return
+    estimate = estimate_cost(config, competition_id, images, usage)
+    await check_budget(db, competition_id, estimate.total_cost_usd)
+
+
+# --- Estimates ---
+
+def estimate_cost(
+    config: JudgingConfig,
+    competition_id: int,
+    images: int,
+    usage: models.CompetitionUsage | None = None,
+    source_long_edge: int = 4000,
+    aspect_ratio: float = 4 / 3
+) -> schemas.CostEstimate:
+    """
+    Predict the cost of judging `images` new photos with the current criteria, prompts,
+    evaluation mode and image preprocessing settings, assuming no result cache hits.
+    Output lengths are this competition's average so far, or LLM_ESTIMATED_OUTPUT_TOKENS_PER_CALL.
+    In cascade mode every photo adds a screening call, and the full panel is costed for the share
+    of photos that passed screening so far (all of them until CASCADE_MIN_SCREENED were screened).
+    """
+    competition = config.competition(competition_id)
+    if competition is None:
+        raise HTTPException(status_code=404, detail="Competition not found")
+    mode = schemas.EvaluationMode(competition.evaluation_mode or settings.EVALUATION_MODE)
+
+    # The LLM sees the downsized rendition when preprocessing is on, else the original
+    long_edge = source_long_edge
+    if settings.IMAGE_PREPROCESSING_ENABLED:
+        long_edge = min(long_edge, settings.IMAGE_MAX_LONG_EDGE)
+    per_image = image_tokens(long_edge, max(1, round(long_edge / aspect_ratio)))
+
+    if usage is not None and usage.llm_calls:
+        output_per_call, basis = usage.output_tokens / usage.llm_calls, "observed"
+    else:
+        output_per_call, basis = float(settings.LLM_ESTIMATED_OUTPUT_TOKENS_PER_CALL), "default"
+
+    inputs = []
+    criteria = config.criteria
+    criteria_list = "\n".join(f"- {c.name}: {c.description}" for c in criteria)
+    if mode == schemas.EvaluationMode.COMBINED:
+        template = config.prompt("COMBINED_EVALUATION_PROMPT") or ""
+        inputs.append(_text_tokens(template.replace("{criteria_list}", criteria_list) + _EVALUATION_REQUEST))
+    else:
+        template = config.prompt("EVALUATION_PROMPT") or ""
+        for c in criteria:
+            prompt = template.replace("{criterion_name}", c.name).replace("{criterion_description}", c.description)
+            inputs.append(_text_tokens(prompt + _EVALUATION_REQUEST))
+    # The reasoning prompt quotes every criterion's rationale
+    feedback_chars = sum(len(c.name) + 20 for c in criteria) + len(criteria) * output_per_call * _CHARS_PER_TOKEN
+    reasoning_chars = len(config.prompt("REASONING_PROMPT") or "") + len(competition.rules or "") + feedback_chars
+    inputs.append(int(reasoning_chars // _CHARS_PER_TOKEN))
+
+    calls = len(inputs)
+    input_tokens = sum(inputs) + calls * per_image
+    output_tokens = round(calls * output_per_call)
+    full_cost = llm_cost(input_tokens, output_tokens)
+
+    # One screening call on the low-resolution rendition
+    screening_edge = source_long_edge
+    if settings.IMAGE_PREPROCESSING_ENABLED:
+        screening_edge = min(screening_edge, settings.CASCADE_SCREENING_LONG_EDGE)
+    screening_prompt = (config.prompt("SCREENING_PROMPT") or "").replace("{criteria_list}", criteria_list)
+    screening_input = _text_tokens(screening_prompt.replace("{rules}", competition.rules or "")) + image_tokens(
+        screening_edge, max(1, round(screening_edge / aspect_ratio))
+    )
+    screening_cost = llm_cost(screening_input, round(output_per_call))
+
+    estimate: Dict[str, Any] = {
+        "competition_id": competition_id,
+        "images": images,
+        "evaluation_mode": mode,
+        "llm_calls_per_image": calls,
+        "image_tokens_per_call": per_image,
+        "input_tokens_per_image": input_tokens,
+        "output_tokens_per_image": output_tokens,
+        "output_tokens_basis": basis,
+        "full_panel_cost_per_image_usd": round(full_cost, 8),
+    }
+    cost_per_image = full_cost
+    if cascade_service.cascade_enabled(competition):
+        if usage is not None and usage.screened >= settings.CASCADE_MIN_SCREENED:
+            pass_rate, pass_basis = 1 - usage.screened_out / usage.screened, "observed"
+        else:
+            pass_rate, pass_basis = 1.0, "default"
+        cost_per_image = screening_cost + pass_rate * full_cost
+        estimate.update(
+            cascade_enabled=True,
+            screening_cost_per_image_usd=round(screening_cost, 8),
+            cascade_pass_rate=round(pass_rate, 4),
+            cascade_pass_rate_basis=pass_basis
+        )
+    estimate["cost_per_image_usd"] = round(cost_per_image, 8)
+    estimate["total_cost_usd"] = round(cost_per_image * images, 6)
+
+    if usage is not None and usage.screened:
+        # What cascade judging saved so far: the skipped full panels, less every screening call
+        estimate["screened"] = usage.screened
+        estimate["screened_out"] = usage.screened_out
+        estimate["cascade_savings_usd"] = round(usage.screened_out * full_cost - usage.screened * screening_cost, 6)
+    if usage is not None:
+        if usage.judgements:
+            estimate["observed_cost_per_image_usd"] = round(usage.cost_usd / usage.judgements, 8)
+        estimate["spent_usd"] = round(usage.cost_usd, 6)
+        if usage.budget_usd is not None:
+            remaining = max(0.0, usage.budget_usd - usage.cost_usd)
+            estimate["budget_usd"] = usage.budget_usd
+            estimate["remaining_usd"] = round(remaining, 6)
+            estimate["images_within_budget"] = int(remaining // cost_per_image) if cost_per_image else None
+    return schemas.CostEstimate(**estimate)
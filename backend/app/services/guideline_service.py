@@ -1,37 +1,232 @@
 # app/services/guideline_service.py
 
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.prompts import PromptTemplate
 
 from ..crud import crud
 from ..core.config import settings
+from .judging_service import photo_judge_app
+
+
+def normalize_competition_name(name: str) -> str:
+    """Case- and whitespace-insensitive form of a competition name, used as the search cache key."""
+    return " ".join(name.split()).casefold()
+
+
+def search_query(competition_name: str) -> str:
+    return f'analysis of winning photos for "{competition_name}" competition.'
+
+
+# --- Search providers ---
+
+class SearchProvider(ABC):
+    """Web search used to gather material on a competition's past winners."""
+
+    @abstractmethod
+    async def search(self, query: str) -> List[str]:
+        """The text content of the top results."""
+
+
+class TavilySearchProvider(SearchProvider):
+    def __init__(self, max_results: int = 5):
+        self.max_results = max_results
+        self._tool = None
+
+    def _search_tool(self):
+        if self._tool is None:
+            # The search SDK is slow to import, so it is loaded and its client built on first use
+            from langchain_community.tools.tavily_search import TavilySearchResults
+            self._tool = TavilySearchResults(max_results=self.max_results)
+        return self._tool
+
+    async def search(self, query: str) -> List[str]:
+        if not settings.TAVILY_API_KEY:
+            raise HTTPException(status_code=500, detail="TAVILY_API_KEY not found.")
+        # The tool's sync client blocks, so it runs on a worker thread rather than the event loop
+        results = await asyncio.to_thread(self._search_tool().invoke, {"query": query})
+        return [res["content"] for res in results]
+
+
+class FakeSearchProvider(SearchProvider):
+    """Deterministic offline results for local development, tests and benchmarks; no API key needed."""
+
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+
+    async def search(self, query: str) -> List[str]:
+        self.calls += 1
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        return [
+            f"Winning entries for {query} favoured strong, simple compositions with a clear subject.",
+            f"Judges of {query} rewarded natural light, technical precision and authentic moments.",
+        ]
+
+
+# Selected with GUIDELINE_SEARCH_PROVIDER; register further providers here
+SEARCH_PROVIDERS: Dict[str, Callable[[], SearchProvider]] = {
+    "tavily": TavilySearchProvider,
+    "fake": FakeSearchProvider,
+}
+
+
+def create_search_provider(name: str) -> SearchProvider:
+    if name not in SEARCH_PROVIDERS:
+        raise ValueError(f"Unknown GUIDELINE_SEARCH_PROVIDER {name!r}; expected one of {sorted(SEARCH_PROVIDERS)}")
+    return SEARCH_PROVIDERS[name]()
+
+
+# --- Search result cache ---
+
+class SearchResultCache:
+    """
+    Search results per normalized competition name, kept in memory and as JSON files
+    under `directory` so they survive restarts. Entries expire after `ttl_seconds`
+    (0 = never). Concurrent lookups of the same missing name share one search.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float):
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, tuple[float, List[str]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    def _fresh(self, created_at: float) -> bool:
+        return not self.ttl_seconds or time.time() - created_at <= self.ttl_seconds
+
+    def _read(self, key: str) -> tuple[float, List[str]] | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as in_file:
+                data = json.load(in_file)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key:
+            return None
+        return data["created_at"], data["results"]
+
+    def _write(self, key: str, created_at: float, results: List[str]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as out_file:
+            json.dump({"key": key, "created_at": created_at, "results": results}, out_file)
+        os.replace(tmp_path, path)
+
+    async def get_or_search(self, key: str, search: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read, key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is not None and self._fresh(entry[0]):
+            self.hits += 1
+            return entry[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+        else:
+            self.misses += 1
+            # The search is owned by the cache, so a cancelled caller does not cancel it for the others
+            task = asyncio.get_running_loop().create_task(self._search(key, search))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._search_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _search(self, key: str, search: Callable[[], Awaitable[List[str]]]) -> List[str]:
+        results = await search()
+        # Empty results are not cached, so a later request searches again
+        if results:
+            created_at = time.time()
+            with self._lock:
+                self._entries[key] = (created_at, results)
+            try:
+                await asyncio.to_thread(self._write, key, created_at, results)
+            except OSError as e:
+                print(f"Error persisting search results for {key!r}: {e}")
+        return results
+
+    def _search_done(self, key: str, task: asyncio.Task) -> None:
+        # Waiters see a failure through the task; the next request searches again
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved when every caller was cancelled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        for path in self.directory.glob("*.json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        return {
+            "entries_in_memory": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+search_provider = create_search_provider(settings.GUIDELINE_SEARCH_PROVIDER)
+search_cache = SearchResultCache(settings.GUIDELINE_CACHE_DIR, settings.GUIDELINE_CACHE_TTL_SECONDS)
+
+
+async def _search(competition_name: str) -> str:
+    try:
+        results = await search_cache.get_or_search(
+            normalize_competition_name(competition_name),
+            lambda: search_provider.search(search_query(competition_name))
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Web search failed: {e}")
+    aggregated_results = "\n\n".join(results)
+    if not aggregated_results:
+        raise HTTPException(status_code=404, detail="No search results found.")
+    return aggregated_results
 
 
 async def generate_guidelines_from_search(competition_name: str, db: Session) -> dict:
-    if not settings.TAVILY_API_KEY:
-        raise HTTPException(status_code=500, detail="TAVILY_API_KEY not found.")
-    
     synthesis_prompt = crud.get_enabled_prompt_by_type(db, "RULES_SYNTHESIS_PROMPT")
     if not synthesis_prompt:
         raise HTTPException(status_code=500, detail="No enabled RULES_SYNTHESIS_PROMPT found.")
 
-    try:
-        search_tool = TavilySearchResults(max_results=5)
-        search_query = f'analysis of winning photos for "{competition_name}" competition.'
-        results = search_tool.invoke({"query": search_query})
-        aggregated_results = "\n\n".join([res["content"] for res in results])
-        if not aggregated_results:
-             raise HTTPException(status_code=404, detail="No search results found.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Web search failed: {e}")
+    aggregated_results = await _search(competition_name)
 
     try:
-        llm = ChatGoogleGenerativeAI(model=settings.GEMINI_MODEL_NAME, temperature=settings.MODEL_TEMPERATURE)
+        from langchain_core.prompts import PromptTemplate
+
+        # The judging model client is shared, so synthesis also goes through the LLM scheduler
         prompt = PromptTemplate.from_template(synthesis_prompt.template)
-        chain = prompt | llm
+        chain = prompt | photo_judge_app.llm
         response = await chain.ainvoke({
             "competition_name": competition_name,
             "aggregated_search_results": aggregated_results
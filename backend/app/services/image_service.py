@@ -0,0 +1,218 @@
+# app/services/image_service.py
+
+import asyncio
+import base64
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..core.config import settings
+
+
+_MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+@dataclass
+class PreprocessedImage:
+    """The compact rendition of an upload that is sent to the LLM."""
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    width: int | None = None
+    height: int | None = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def processed_bytes(self) -> int:
+        return len(self.data)
+
+    def to_base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+    def summary(self) -> Dict[str, object]:
+        """Per-image preprocessing details, stored alongside the judgement."""
+        return {
+            "original_bytes": self.original_bytes,
+            "processed_bytes": self.processed_bytes,
+            "mime_type": self.mime_type,
+            "width": self.width,
+            "height": self.height,
+            "timings_ms": {stage: round(t * 1000, 2) for stage, t in self.timings.items()},
+        }
+
+
+class PreprocessingStats:
+    """Process-wide counters used to tune the size/quality trade-off."""
+
+    STAGES = ("decode", "orient", "resize", "encode")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.images = 0
+            self.passthrough = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.stage_seconds = {stage: 0.0 for stage in self.STAGES}
+
+    def record(self, image: PreprocessedImage, passthrough: bool = False) -> None:
+        with self._lock:
+            self.images += 1
+            self.passthrough += int(passthrough)
+            self.bytes_in += image.original_bytes
+            self.bytes_out += image.processed_bytes
+            for stage, seconds in image.timings.items():
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return {
+                "images": self.images,
+                "passthrough": self.passthrough,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": saved,
+                "savings_ratio": round(saved / self.bytes_in, 4) if self.bytes_in else 0.0,
+                "stage_ms_total": {s: round(t * 1000, 2) for s, t in self.stage_seconds.items()},
+                "stage_ms_avg": {
+                    s: round(t * 1000 / self.images, 2) if self.images else 0.0
+                    for s, t in self.stage_seconds.items()
+                },
+            }
+
+
+preprocessing_stats = PreprocessingStats()
+
+
+# Decoding a large photo takes tens of MB; a dedicated pool bounds how many are decoded at once
+_preprocessing_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_PREPROCESSING_CONCURRENCY or os.cpu_count() or 1,
+    thread_name_prefix="preprocess"
+)
+
+
+def _passthrough(source: bytes | Path) -> PreprocessedImage:
+    contents = source if isinstance(source, bytes) else Path(source).read_bytes()
+    return PreprocessedImage(data=contents, mime_type="image/jpeg", original_bytes=len(contents))
+
+
+def preprocess_image(
+    source: bytes | Path,
+    max_long_edge: int | None = None,
+    output_format: str | None = None,
+    quality: int | None = None,
+) -> PreprocessedImage:
+    """
+    Decode an upload (raw bytes or a path to the spooled file) once, apply its EXIF
+    orientation, downsize it to the configured long edge and re-encode it for the LLM.
+
+    Files that Pillow cannot decode are passed through unchanged.
+    This is CPU-bound; use `preprocess_image_async` in async code.
+    """
+    max_long_edge = max_long_edge or settings.IMAGE_MAX_LONG_EDGE
+    output_format = (output_format or settings.IMAGE_OUTPUT_FORMAT).upper()
+    quality = quality or settings.IMAGE_OUTPUT_QUALITY
+    if output_format not in _MIME_TYPES:
+        raise ValueError(f"Unsupported image output format: {output_format}")
+
+    if not settings.IMAGE_PREPROCESSING_ENABLED:
+        result = _passthrough(source)
+        preprocessing_stats.record(result, passthrough=True)
+        return result
+
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    original_bytes = len(source) if isinstance(source, bytes) else os.path.getsize(source)
+    try:
+        img = Image.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+        if img.format == "JPEG" and max(img.size) > max_long_edge:
+            # Let the JPEG decoder downscale by a power of two while staying above the target size
+            scale = max_long_edge / max(img.size)
+            img.draft("RGB", (round(img.width * scale), round(img.height * scale)))
+        img.load()
+    except (UnidentifiedImageError, OSError) as e:
+        print(f"Could not decode image for preprocessing, sending original: {e}")
+        result = _passthrough(source)
+        preprocessing_stats.record(result, passthrough=True)
+        return result
+    timings["decode"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    img = ImageOps.exif_transpose(img)
+    timings["orient"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if max(img.size) > max_long_edge:
+        img.thumbnail((max_long_edge, max_long_edge), Image.Resampling.LANCZOS)
+    timings["resize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if output_format == "JPEG" and img.mode != "RGB":
+        img = img.convert("RGB")
+    elif output_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format=output_format, quality=quality, optimize=output_format == "JPEG")
+    img.close()
+    timings["encode"] = time.perf_counter() - start
+
+    result = PreprocessedImage(
+        data=buffer.getvalue(),
+        mime_type=_MIME_TYPES[output_format],
+        original_bytes=original_bytes,
+        width=img.width,
+        height=img.height,
+        timings=timings,
+    )
+    preprocessing_stats.record(result)
+    return result
+
+
+async def preprocess_image_async(source: bytes | Path, max_long_edge: int | None = None) -> PreprocessedImage:
+    """Run `preprocess_image` on the bounded preprocessing pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _preprocessing_executor, preprocess_image, source, max_long_edge
+    )
+
+
+_RENDITION_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+
+
+def create_rendition(source: Path, width: int, output_format: str, quality: int) -> bytes:
+    """
+    Render a display copy of a stored image: EXIF-oriented, at most `width` pixels
+    wide (never upscaled) and re-encoded as "jpeg" or "webp". CPU-bound.
+    """
+    pil_format = _RENDITION_FORMATS[output_format]
+    with Image.open(source) as img:
+        if img.format == "JPEG" and img.width > width:
+            img.draft("RGB", (width, round(img.height * width / img.width)))
+        img = ImageOps.exif_transpose(img)
+        if img.width > width:
+            img.thumbnail((width, round(img.height * width / img.width) or 1), Image.Resampling.LANCZOS)
+        if pil_format == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+        elif pil_format == "WEBP" and img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format=pil_format, quality=quality)
+    return buffer.getvalue()
+
+
+async def create_rendition_async(source: Path, width: int, output_format: str, quality: int) -> bytes:
+    """Run `create_rendition` on the bounded preprocessing pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _preprocessing_executor, create_rendition, source, width, output_format, quality
+    )
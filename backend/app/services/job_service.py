@@ -0,0 +1,203 @@
+# app/services/job_service.py
+
+import asyncio
+import os
+import socket
+import uuid
+from collections import OrderedDict
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..crud import async_crud, crud
+from ..db import models
+from ..db.database import AsyncSessionLocal, SessionLocal
+from ..core.config import settings
+from . import cost_service, judging_service, upload_service
+from .config_cache import JudgingConfig, config_cache
+from .llm_scheduler import llm_scheduler
+from .rendition_service import rendition_cache
+from ..storage.image_store import image_store
+
+
+async def create_job(files: List[UploadFile], competition_id: int, db: AsyncSession) -> models.JudgingJob:
+    """Spool the uploads to disk, record a job for them and queue its items."""
+    if not await async_crud.get_competition(db, competition_id):
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    uploads = await upload_service.spool_uploads(files)
+    # The job items own the stored images from here on
+    try:
+        for upload in uploads:
+            await upload.commit()
+            rendition_cache.pregenerate(upload.stored_filename, upload.sha256)
+    except BaseException:
+        for upload in uploads:
+            upload.discard()
+        raise
+    job = await async_crud.create_judging_job(
+        db, competition_id, [(u.original_filename, u.stored_filename) for u in uploads]
+    )
+    job_worker_pool.enqueue([item.id for item in job.items])
+    return job
+
+
+# At most this many jobs' configuration snapshots are kept (least recently started dropped first)
+_JOB_CONFIGS_MAX = 256
+
+
+class JobWorkerPool:
+    """In-process workers that drain judging job items, one checkpointed judgement at a time."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._queue: asyncio.Queue[int] | None = None
+        self._workers: List[asyncio.Task] = []
+        self._job_configs: "OrderedDict[int, JudgingConfig]" = OrderedDict()
+        # Holder of this process's leases on running items; new on every start
+        self.worker_id: str | None = None
+
+    def enqueue(self, item_ids: List[int]) -> None:
+        if self._queue is None:
+            raise RuntimeError("Job worker pool is not running")
+        for item_id in item_ids:
+            self._queue.put_nowait(item_id)
+
+    def resume_deferred(self, db: Session, competition_id: int) -> int:
+        """Re-queue a competition's pending items, e.g. those deferred by its budget once it was raised."""
+        item_ids = crud.get_pending_job_item_ids(db, competition_id)
+        if self._queue is not None:
+            # Items already queued are claimed only once
+            self.enqueue(item_ids)
+        return len(item_ids)
+
+    async def start(self) -> None:
+        """
+        Start the workers and re-queue every unfinished item from previous runs, except
+        those other live processes hold a lease on.
+        """
+        self._queue = asyncio.Queue()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        db = SessionLocal()
+        try:
+            resumable = crud.get_resumable_job_item_ids(db, settings.JOB_LEASE_SECONDS)
+        finally:
+            db.close()
+        if resumable:
+            print(f"Resuming {len(resumable)} unfinished judging job item(s)")
+        self.enqueue(resumable)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._workers.append(asyncio.create_task(self._reap_expired_leases()))
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Interrupted items stay 'running' with their leases given up,
+        so the next start (of this or another process) resumes them.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self.worker_id is not None:
+            async with AsyncSessionLocal() as db:
+                await async_crud.expire_job_item_leases(db, self.worker_id)
+
+    async def _worker(self) -> None:
+        while True:
+            item_id = await self._queue.get()
+            try:
+                await self._process_item(item_id)
+            except Exception as e:
+                print(f"Unexpected error processing job item {item_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _reap_expired_leases(self) -> None:
+        """Re-queue the items of workers that stopped renewing their leases, e.g. a crashed process."""
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS)
+            try:
+                item_ids = await asyncio.to_thread(self._reset_expired_items)
+            except Exception as e:
+                print(f"Could not reset job items with expired leases: {e}")
+                continue
+            if item_ids:
+                print(f"Resuming {len(item_ids)} judging job item(s) whose worker stopped renewing its lease")
+                self.enqueue(item_ids)
+
+    @staticmethod
+    def _reset_expired_items() -> List[int]:
+        db = SessionLocal()
+        try:
+            return crud.reset_expired_job_items(db, settings.JOB_LEASE_SECONDS)
+        finally:
+            db.close()
+
+    async def _heartbeat(self, item_id: int) -> None:
+        """Renew this worker's lease on an item until cancelled or the item stops running."""
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if not await async_crud.renew_job_item_lease(db, item_id, self.worker_id):
+                        return
+            except Exception as e:
+                print(f"Could not renew the lease on job item {item_id}: {e}")
+
+    async def _process_item(self, item_id: int) -> None:
+        async with AsyncSessionLocal() as db:
+            item = await async_crud.claim_job_item(db, item_id, self.worker_id)
+            if item is None:
+                return
+            # Judging uses `db`, so the lease is renewed from its own session
+            heartbeat = asyncio.create_task(self._heartbeat(item_id))
+            try:
+                await self._judge_item(db, item)
+            finally:
+                heartbeat.cancel()
+
+    async def _judge_item(self, db: AsyncSession, item: models.JobItem) -> None:
+        competition_id = item.job.competition_id
+        try:
+            await cost_service.check_budget(db, competition_id)
+        except HTTPException as e:
+            # Left pending until the budget is raised (which re-queues it) or the next restart
+            await async_crud.defer_job_item(db, item, f"Deferred: {e.detail}")
+            return
+        try:
+            image_path = await asyncio.to_thread(image_store.local_path, item.stored_filename)
+            if image_path is None:
+                raise FileNotFoundError(f"Image {item.stored_filename} is not in the image store")
+            config = await self._job_config(item.job_id, db)
+            # All of a job's LLM calls share one scheduler lane
+            with llm_scheduler.lane(f"job-{item.job_id}"):
+                result = await judging_service.judge_image(
+                    image_path, item.original_filename, competition_id, db,
+                    image_sha256=image_store.sha256(item.stored_filename), config=config
+                )
+        except HTTPException as e:
+            await async_crud.fail_job_item(db, item, str(e.detail))
+            return
+        except Exception as e:
+            await async_crud.fail_job_item(db, item, str(e))
+            return
+        await async_crud.complete_job_item(db, item, result, competition_id)
+
+    async def _job_config(self, job_id: int, db: AsyncSession) -> JudgingConfig:
+        """
+        The configuration snapshot a job is judged with, taken when this process judges its
+        first item, so edits made while the job runs do not mix configurations. Items resumed
+        after a restart are judged with the configuration current at that point.
+        """
+        config = self._job_configs.get(job_id)
+        if config is None:
+            config = await config_cache.get(db)
+            self._job_configs[job_id] = config
+            while len(self._job_configs) > _JOB_CONFIGS_MAX:
+                self._job_configs.popitem(last=False)
+        return config
+
+
+job_worker_pool = JobWorkerPool(settings.JOB_WORKER_CONCURRENCY)
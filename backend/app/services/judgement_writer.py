@@ -0,0 +1,216 @@
+# app/services/judgement_writer.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+
+from ..core.config import settings
+from ..crud import async_crud
+from ..crud.crud import _judgement_scores, add_usage_statement, judgement_usage
+from ..db import models
+from ..db.database import AsyncSessionLocal
+
+
+@dataclass
+class _PendingWrite:
+    judgement_data: dict
+    stored_filename: str
+    competition_id: int
+    future: asyncio.Future
+
+
+class JudgementWriter:
+    """
+    Write-behind buffer for finished judgements (group commit). Judgements submitted
+    concurrently, e.g. by a batch, are inserted together with one multi-row INSERT ...
+    RETURNING and a single commit. A batch is flushed once `max_batch` judgements are
+    waiting or `max_delay` seconds after its first one arrived.
+
+    `write` only returns after the commit, so a judgement reported to the client is durable.
+    """
+
+    def __init__(self, max_batch: int, max_delay: float):
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue[_PendingWrite | None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._flusher: asyncio.Task | None = None
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self.flushes = 0
+        self.rows = 0
+        self.max_rows_per_flush = 0
+        self.fallback_flushes = 0
+        self.failed_rows = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_max = 0.0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._flusher is not None and not self._flusher.done():
+            return
+        old_queue, same_loop = self._queue, self._loop is loop
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._flusher = loop.create_task(self._run())
+        # Writes still queued for a stopped flusher are carried over, unless they belong to another loop
+        while old_queue is not None and not old_queue.empty():
+            pending = old_queue.get_nowait()
+            if pending is None:
+                continue
+            if same_loop:
+                self._queue.put_nowait(pending)
+            else:
+                self._fail([pending], RuntimeError("Judgement writer restarted on another event loop"))
+
+    async def write(self, judgement_data: dict, stored_filename: str, competition_id: int) -> models.Judgement:
+        """Queue a judgement for the next flush and wait until it is committed."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingWrite(judgement_data, stored_filename, competition_id, future))
+        return await future
+
+    async def close(self) -> None:
+        """Flush everything queued so far and stop the flusher."""
+        if self._flusher is None or self._flusher.done():
+            return
+        self._queue.put_nowait(None)
+        await self._flusher
+        self._flusher = None
+
+    async def _run(self) -> None:
+        closing = False
+        while not closing:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if self._queue.empty() and remaining > 0:
+                        pending = await asyncio.wait_for(self._queue.get(), remaining)
+                    else:
+                        pending = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if pending is None:
+                    closing = True
+                    break
+                batch.append(pending)
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # The flusher keeps running for later batches; this one's writers get the error
+                print(f"Flush of {len(batch)} judgement(s) failed: {e}")
+                self._fail(batch, e)
+
+    def _fail(self, batch: List[_PendingWrite], error: BaseException) -> None:
+        for pending in batch:
+            if pending.future.done():
+                continue
+            self.failed_rows += 1
+            try:
+                pending.future.set_exception(error)
+            except RuntimeError:
+                # The writer's event loop is closed; nobody is waiting any more
+                pass
+
+    async def _flush(self, batch: List[_PendingWrite]) -> None:
+        if not batch:
+            return
+        start = time.perf_counter()
+        try:
+            judgements = await self._insert_batch(batch)
+        except Exception as e:
+            # Don't fail the whole batch for one bad row: retry each judgement in its own transaction
+            print(f"Bulk judgement insert of {len(batch)} row(s) failed, retrying individually: {e}")
+            self.fallback_flushes += 1
+            await self._insert_individually(batch)
+        else:
+            for pending, judgement in zip(batch, judgements):
+                if not pending.future.done():
+                    pending.future.set_result(judgement)
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.rows += len(batch)
+        self.max_rows_per_flush = max(self.max_rows_per_flush, len(batch))
+        self.flush_seconds_total += elapsed
+        self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+
+    async def _insert_batch(self, batch: List[_PendingWrite]) -> List[models.Judgement]:
+        async with AsyncSessionLocal() as db:
+            judgements = list(await db.scalars(
+                insert(models.Judgement).returning(models.Judgement, sort_by_parameter_order=True),
+                [
+                    {
+                        "original_filename": p.judgement_data['filename'],
+                        "stored_filename": p.stored_filename,
+                        "overall_score": p.judgement_data['overall_score'],
+                        "judgement_details": p.judgement_data,
+                        "competition_id": p.competition_id,
+                    }
+                    for p in batch
+                ]
+            ))
+            score_rows: List[Dict[str, Any]] = [
+                {
+                    "judgement_id": judgement.id,
+                    "competition_id": score.competition_id,
+                    "criterion_name": score.criterion_name,
+                    "score": score.score,
+                    "weight": score.weight,
+                }
+                for p, judgement in zip(batch, judgements)
+                for score in _judgement_scores(p.judgement_data, p.competition_id)
+            ]
+            if score_rows:
+                await db.execute(insert(models.JudgementScore), score_rows)
+            # One rollup update per competition in the batch, committed with the judgements
+            usage: Dict[int, Dict[str, float]] = {}
+            for p in batch:
+                totals = usage.setdefault(p.competition_id, {})
+                for name, amount in judgement_usage(p.judgement_data).items():
+                    totals[name] = totals.get(name, 0) + amount
+            for competition_id, totals in usage.items():
+                await db.execute(add_usage_statement(db.bind.dialect.name, competition_id, totals))
+            await db.commit()
+            return judgements
+
+    async def _insert_individually(self, batch: List[_PendingWrite]) -> None:
+        for pending in batch:
+            try:
+                async with AsyncSessionLocal() as db:
+                    judgement = await async_crud.create_judgement(
+                        db, pending.judgement_data, pending.stored_filename, pending.competition_id
+                    )
+            except Exception as e:
+                self.failed_rows += 1
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            else:
+                if not pending.future.done():
+                    pending.future.set_result(judgement)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": round(self.max_delay * 1000, 2),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "flushes": self.flushes,
+            "rows": self.rows,
+            "rows_per_flush_avg": round(self.rows / self.flushes, 2) if self.flushes else 0.0,
+            "rows_per_flush_max": self.max_rows_per_flush,
+            "flush_ms_avg": round(self.flush_seconds_total * 1000 / self.flushes, 2) if self.flushes else 0.0,
+            "flush_ms_max": round(self.flush_seconds_max * 1000, 2),
+            "fallback_flushes": self.fallback_flushes,
+            "failed_rows": self.failed_rows,
+        }
+
+
+judgement_writer = JudgementWriter(settings.JUDGEMENT_WRITE_BATCH_SIZE, settings.JUDGEMENT_WRITE_MAX_DELAY)
@@ -1,37 +1,79 @@
 # app/services/judging_service.py
 
 import asyncio
-from typing import Dict, List, Any, TypedDict
+import contextlib
+import contextvars
+import hashlib
+import json
+import time
+from typing import Callable, Dict, Iterator, List, Any, TypedDict
 from dataclasses import dataclass
-import base64
-import uuid
 from pathlib import Path
 
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
-import aiofiles
 from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..crud import crud
 from ..db import schemas
+from ..core import metrics
 from ..core.config import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
+from . import cascade_service, cost_service, image_service, result_cache, upload_service
+from .config_cache import JudgingConfig, config_cache
+from .judgement_writer import judgement_writer
+from .rendition_service import rendition_cache
+from .llm_backends import create_chat_model
+from .llm_scheduler import llm_scheduler, schedule
 
 load_dotenv()
 
+llm_calls = metrics.registry.counter(
+    "photo_judge_llm_calls_total", "LLM calls made by the judging pipeline, by prompt kind and outcome.", ("kind", "outcome")
+)
+llm_tokens = metrics.registry.counter(
+    "photo_judge_llm_tokens_total", "Tokens reported by the LLM, by prompt kind and direction.", ("kind", "direction")
+)
+score_fallbacks = metrics.registry.counter(
+    "photo_judge_score_fallbacks_total",
+    "Criterion scores defaulted to 5.0 because the LLM call failed or its answer had no SCORE line.", ("reason",)
+)
+
+
+# Receives (event, data) progress events for the photo being judged in the current context
+ProgressListener = Callable[[str, Dict[str, Any]], None]
+_progress_listener: contextvars.ContextVar[ProgressListener | None] = contextvars.ContextVar(
+    "judging_progress_listener", default=None
+)
+
+
+@contextlib.contextmanager
+def progress_listener(listener: ProgressListener) -> Iterator[None]:
+    """Report judging progress of the enclosed work (including spawned tasks) to `listener`."""
+    token = _progress_listener.set(listener)
+    try:
+        yield
+    finally:
+        _progress_listener.reset(token)
+
+
+def emit_progress(event: str, data: Dict[str, Any]) -> None:
+    listener = _progress_listener.get()
+    if listener is not None:
+        listener(event, data)
+
 
 class PhotoState(TypedDict):
     """TypedDict to represent the state of a photo during evaluation."""
     image_data: str
+    image_mime_type: str
+    image_sha256: str | None
     filename: str
     scores: Dict[str, float]
     rationales: Dict[str, str]
     overall_score: float
     overall_reasoning: str
     overall_reasoning_score: float | None
+    evaluation_mode: str
+    evaluation_stats: Dict[str, Any]
     stage: str
 
 
@@ -41,7 +83,9 @@ class AppState(TypedDict):
     criteria: List["JudgingCriterion"]
     competition_rules: str
     evaluation_prompt_template: str
+    combined_evaluation_prompt_template: str | None
     reasoning_prompt_template: str
+    use_cache: bool
 
 
 @dataclass
@@ -55,18 +99,102 @@ class JudgingCriterion:
 class PhotoJudgeApp:
     """Photo judging application using LLM-based evaluation pipeline."""
 
+    # Image content shared by every multimodal prompt; filled in per photo at invoke time
+    _IMAGE_MESSAGE_PART = {"type": "image_url", "image_url": {"url": "data:{image_mime_type};base64,{image_data}"}}
+
     def __init__(self):
-        """Initialize the photo judge app with a configured language model."""
-        self.llm = ChatGoogleGenerativeAI(
-            model=settings.GEMINI_MODEL_NAME, temperature=settings.MODEL_TEMPERATURE
+        """Set up the photo judge app; the language model is created on first use."""
+        self._chain_cache: Dict[tuple, Any] = {}
+        self._workflow = None
+        self._llm = None
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            # Built with the first judging call: the Gemini SDK is slow to import
+            self.llm = create_chat_model()
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm) -> None:
+        # Every async call goes through the process-wide scheduler
+        self._llm = schedule(llm, llm_scheduler)
+        # Cached chains are bound to the previous model
+        self.invalidate_prompt_cache()
+
+    @property
+    def workflow(self):
+        """The compiled judging graph, built once and reused for every photo."""
+        if self._workflow is None:
+            self._workflow = self._build_workflow()
+        return self._workflow
+
+    def invalidate_prompt_cache(self) -> None:
+        """Drop memoized prompt chains, e.g. after prompts or criteria were edited."""
+        self._chain_cache.clear()
+
+    @staticmethod
+    def _escape_braces(text: str) -> str:
+        """Make already-formatted text safe to embed in a ChatPromptTemplate."""
+        return text.replace("{", "{{").replace("}", "}}")
+
+    def _get_chain(self, kind: str, template: str, criterion: JudgingCriterion | None = None, criteria_list: str | None = None):
+        """
+        Return the memoized `prompt | llm` chain for a prompt template.
+        Keyed by prompt kind, template hash and the criterion text baked into the prompt.
+        """
+        key = (
+            kind,
+            hashlib.sha256(template.encode("utf-8")).hexdigest(),
+            (criterion.name, criterion.description) if criterion else None,
+            criteria_list,
         )
+        chain = self._chain_cache.get(key)
+        if chain is not None:
+            return chain
+
+        from langchain_core.prompts import ChatPromptTemplate
+
+        if kind == "evaluation":
+            prompt_text = template.format(
+                criterion_name=criterion.name,
+                criterion_description=criterion.description
+            )
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", self._escape_braces(prompt_text)),
+                ("user", [{"type": "text", "text": "Please evaluate this photograph."}, self._IMAGE_MESSAGE_PART])
+            ])
+        elif kind == "combined":
+            # The expected JSON shape contains literal braces, so escape the formatted text
+            prompt_text = template.format(criteria_list=criteria_list)
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", self._escape_braces(prompt_text)),
+                ("user", [{"type": "text", "text": "Please evaluate this photograph."}, self._IMAGE_MESSAGE_PART])
+            ])
+        elif kind in ("reasoning", "screening"):
+            # Their variables (rules, feedback, criteria list) are filled in at invoke time
+            prompt = ChatPromptTemplate.from_messages([
+                ("user", [{"type": "text", "text": template}, self._IMAGE_MESSAGE_PART])
+            ])
+        else:
+            raise ValueError(f"Unknown prompt kind: {kind}")
+
+        chain = prompt | self.llm
+        self._chain_cache[key] = chain
+        return chain
 
-    def _build_workflow(self) -> StateGraph:
+    def _build_workflow(self):
         """Build the processing workflow graph."""
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(AppState)
-        workflow.add_node("evaluate_photo", self.evaluate_photo_node)
-        workflow.add_node("calculate_final_score", self.calculate_final_score_node)
-        workflow.add_node("generate_overall_reasoning", self.generate_overall_reasoning_node)
+        # Each node's run time is recorded as a stage of the same name (a no-op with metrics disabled)
+        workflow.add_node("evaluate_photo", metrics.timed_node("evaluate_photo", self.evaluate_photo_node))
+        workflow.add_node("calculate_final_score", metrics.timed_node("calculate_final_score", self.calculate_final_score_node))
+        workflow.add_node(
+            "generate_overall_reasoning",
+            metrics.timed_node("generate_overall_reasoning", self.generate_overall_reasoning_node)
+        )
 
         workflow.set_entry_point("evaluate_photo")
         workflow.add_edge("evaluate_photo", "calculate_final_score")
@@ -77,57 +205,142 @@ class PhotoJudgeApp:
     async def evaluate_photo_node(self, state: AppState) -> AppState:
         """Evaluate the photo against all provided criteria using LLM."""
         image_data = state["photo"]["image_data"]
+        mime_type = state["photo"]["image_mime_type"]
         criteria_to_evaluate = state["criteria"]
         prompt_template = state["evaluation_prompt_template"]
+        combined_template = state["combined_evaluation_prompt_template"]
+        is_combined = state["photo"]["evaluation_mode"] == schemas.EvaluationMode.COMBINED
+        stats = state["photo"]["evaluation_stats"]
+        start = time.perf_counter()
+
+        image_sha256 = state["photo"]["image_sha256"] if state["use_cache"] else None
+
+        def cache_key(criterion: JudgingCriterion, template: str) -> str | None:
+            if image_sha256 is None:
+                return None
+            return result_cache.criterion_key(image_sha256, criterion.name, criterion.description, template)
+
+        # Reuse cached scores; only criteria without a hit (e.g. newly edited ones) go to the LLM
+        results: Dict[str, tuple[float, str]] = {}
+        if image_sha256 is not None:
+            templates = [combined_template, prompt_template] if is_combined else [prompt_template]
+            for criterion in criteria_to_evaluate:
+                for template in templates:
+                    cached = result_cache.result_cache.get("criterion", cache_key(criterion, template))
+                    if cached is not None:
+                        results[criterion.name] = tuple(cached)
+                        emit_progress("criterion_scored", {"criterion": criterion.name, "score": cached[0], "rationale": cached[1]})
+                        break
+            stats["cache_hits"] = len(results)
+            criteria_to_evaluate = [c for c in criteria_to_evaluate if c.name not in results]
+
+        if is_combined and criteria_to_evaluate:
+            combined_results = await self._evaluate_combined(
+                image_data, mime_type, criteria_to_evaluate, combined_template, stats
+            )
+            for criterion in criteria_to_evaluate:
+                if criterion.name in combined_results:
+                    score, rationale = combined_results[criterion.name]
+                    key = cache_key(criterion, combined_template)
+                    if key is not None:
+                        result_cache.result_cache.set(key, (score, rationale))
+                    emit_progress("criterion_scored", {"criterion": criterion.name, "score": score, "rationale": rationale})
+            results.update(combined_results)
+            # Any criterion the combined response did not cover is scored individually
+            criteria_to_evaluate = [c for c in criteria_to_evaluate if c.name not in combined_results]
+            stats["fallback_criteria"] = [c.name for c in criteria_to_evaluate]
 
         async def evaluate(criterion: JudgingCriterion):
-            return criterion.name, await self._evaluate_criterion(image_data, criterion, prompt_template)
+            score, rationale = await self._evaluate_criterion(
+                image_data, mime_type, criterion, prompt_template, stats, cache_key(criterion, prompt_template)
+            )
+            emit_progress("criterion_scored", {"criterion": criterion.name, "score": score, "rationale": rationale})
+            return criterion.name, (score, rationale)
 
         tasks = [evaluate(criterion) for criterion in criteria_to_evaluate]
-        results = await asyncio.gather(*tasks)
+        results.update(await asyncio.gather(*tasks))
 
-        state["photo"]["scores"] = {name: score for name, (score, _) in results}
-        state["photo"]["rationales"] = {name: rationale for name, (_, rationale) in results}
+        # Preserve the configured criterion order regardless of which path produced each score
+        ordered = [(c.name, results[c.name]) for c in state["criteria"]]
+        state["photo"]["scores"] = {name: score for name, (score, _) in ordered}
+        state["photo"]["rationales"] = {name: rationale for name, (_, rationale) in ordered}
+        stats["evaluation_ms"] = round((time.perf_counter() - start) * 1000, 2)
         state["photo"]["stage"] = "evaluated"
         return state
 
+    @staticmethod
+    def _record_usage(stats: Dict[str, Any], response: Any) -> None:
+        """Accumulate call and token counts from an LLM response into the photo's stats."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        stats["llm_calls"] += 1
+        stats["input_tokens"] += usage.get("input_tokens", 0)
+        stats["output_tokens"] += usage.get("output_tokens", 0)
+
+    @staticmethod
+    async def _invoke(kind: str, chain: Any, variables: Dict[str, Any]) -> Any:
+        """Call a prompt chain, counting the call, its outcome and its tokens, and timing it as stage `llm`."""
+        try:
+            with metrics.timed("llm"):
+                response = await chain.ainvoke(variables)
+        except Exception:
+            llm_calls.inc(kind=kind, outcome="error")
+            raise
+        llm_calls.inc(kind=kind, outcome="ok")
+        usage = getattr(response, "usage_metadata", None) or {}
+        llm_tokens.inc(usage.get("input_tokens", 0), kind=kind, direction="input")
+        llm_tokens.inc(usage.get("output_tokens", 0), kind=kind, direction="output")
+        return response
+
+    async def _evaluate_combined(
+        self,
+        image_data: str,
+        mime_type: str,
+        criteria: List[JudgingCriterion],
+        template: str,
+        stats: Dict[str, Any]
+    ) -> Dict[str, tuple[float, str]]:
+        """Score all criteria in a single LLM call. Returns only the criteria it could parse."""
+        criteria_list = "\n".join(f"- {c.name}: {c.description}" for c in criteria)
+        chain = self._get_chain("combined", template, criteria_list=criteria_list)
+
+        try:
+            response = await self._invoke("combined", chain, {"image_data": image_data, "image_mime_type": mime_type})
+            self._record_usage(stats, response)
+            return parse_combined_response(response.content, criteria)
+        except Exception as e:
+            print(f"Error in combined evaluation: {e}")
+            return {}
+
     async def _evaluate_criterion(
         self,
         image_data: str,
+        mime_type: str,
         criterion: JudgingCriterion,
-        template: str
+        template: str,
+        stats: Dict[str, Any] | None = None,
+        cache_key: str | None = None
     ) -> tuple[float, str]:
-        """Use the LLM to evaluate a photo against a single judging criterion."""
-        prompt_text = template.format(
-            criterion_name=criterion.name,
-            criterion_description=criterion.description
-        )
-
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", prompt_text),
-            ("user", [
-                {"type": "text", "text": "Please evaluate this photograph."},
-                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}}
-            ])
-        ])
+        """
+        Use the LLM to evaluate a photo against a single judging criterion.
+        Parsed results are stored under `cache_key`; fallback scores never are.
+        """
+        chain = self._get_chain("evaluation", template, criterion=criterion)
 
         try:
-            chain = prompt | self.llm
-            response = await chain.ainvoke({})
-            content = response.content
-
-            lines = content.split('\n')
-            score_line = next((line for line in lines if line.startswith('SCORE:')), 'SCORE: 5.0')
-            rationale_line = next((line for line in lines if line.startswith('RATIONALE:')), 'RATIONALE: No detailed feedback available.')
-
-            score = float(score_line.split('SCORE:')[1].strip())
-            rationale = rationale_line.split('RATIONALE:')[1].strip()
-
-            score = max(0.0, min(10.0, score))
+            response = await self._invoke("evaluation", chain, {"image_data": image_data, "image_mime_type": mime_type})
+            if stats is not None:
+                self._record_usage(stats, response)
+            score, rationale = parse_score_response(response.content)
+            if score is None:
+                score_fallbacks.inc(reason="missing_score")
+                return 5.0, rationale
+            if cache_key is not None:
+                result_cache.result_cache.set(cache_key, (score, rationale))
             return score, rationale
 
         except Exception as e:
             print(f"Error evaluating {criterion.name}: {e}")
+            score_fallbacks.inc(reason="error")
             return 5.0, f"Error during evaluation: {str(e)}"
 
     def calculate_final_score_node(self, state: AppState) -> AppState:
@@ -144,6 +357,7 @@ class PhotoJudgeApp:
         final_score = total_weighted_score / total_weight if total_weight > 0 else 0.0
         state["photo"]["overall_score"] = round(final_score, 2)
         state["photo"]["stage"] = "scored"
+        emit_progress("photo_scored", {"overall_score": state["photo"]["overall_score"]})
         return state
 
     async def generate_overall_reasoning_node(self, state: AppState) -> AppState:
@@ -158,24 +372,29 @@ class PhotoJudgeApp:
             for name, rationale in photo_state['rationales'].items()
         )
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("user", [
-                # The text part now uses the reasoning_prompt_template
-                {"type": "text", "text": template},
-                # The image part, passed as a variable
-                {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,{image_data}"}}
-            ])
-        ])
-
         prompt_variables = {
             "overall_score": photo_state["overall_score"],
             "rules": rules,
             "feedback_summary": feedback_summary,
-            "image_data": image_data
+            "image_data": image_data,
+            "image_mime_type": photo_state["image_mime_type"]
         }
 
-        chain = prompt | self.llm
-        response = await chain.ainvoke(prompt_variables)
+        cache_key = None
+        if state["use_cache"] and photo_state["image_sha256"] is not None:
+            cache_key = result_cache.reasoning_key(
+                photo_state["image_sha256"], template, rules, photo_state["overall_score"], feedback_summary
+            )
+            cached = result_cache.result_cache.get("reasoning", cache_key)
+            if cached is not None:
+                photo_state["overall_reasoning_score"], photo_state["overall_reasoning"] = cached
+                photo_state["evaluation_stats"]["reasoning_cache_hit"] = True
+                photo_state["stage"] = "completed"
+                return state
+
+        chain = self._get_chain("reasoning", template)
+        response = await self._invoke("reasoning", chain, prompt_variables)
+        self._record_usage(photo_state["evaluation_stats"], response)
         content = response.content
 
         try:
@@ -197,6 +416,8 @@ class PhotoJudgeApp:
 
             photo_state["overall_reasoning_score"] = round(final_score, 2)
             photo_state["overall_reasoning"] = reasoning
+            if cache_key is not None:
+                result_cache.result_cache.set(cache_key, (photo_state["overall_reasoning_score"], reasoning))
 
         except (ValueError, IndexError) as e:
             print(f"Error parsing final reasoning and score: {e}. Using raw output.")
@@ -207,6 +428,56 @@ class PhotoJudgeApp:
         photo_state["stage"] = "completed"
         return state
 
+    async def screen_photo(
+        self,
+        image_data: str,
+        criteria: List[JudgingCriterion],
+        competition_rules: str | None,
+        screening_prompt_template: str,
+        image_mime_type: str = "image/jpeg",
+        image_sha256: str | None = None,
+        long_edge: int | None = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        The single cheap call of cascade judging: one preliminary score for the whole photo,
+        from a low-resolution rendition (`long_edge` px). The score is None if the call failed
+        or its answer had no SCORE line. Cached like the other steps.
+        """
+        stats: Dict[str, Any] = {"llm_calls": 0, "input_tokens": 0, "output_tokens": 0}
+        criteria_list = "\n".join(f"- {c.name}: {c.description}" for c in criteria)
+        rules = competition_rules or "general photography principles"
+        start = time.perf_counter()
+
+        cache_key = None
+        if use_cache and image_sha256 is not None:
+            cache_key = result_cache.screening_key(image_sha256, screening_prompt_template, criteria_list, rules, long_edge)
+            cached = result_cache.result_cache.get("screening", cache_key)
+            if cached is not None:
+                score, rationale = cached
+                stats["cache_hit"] = True
+                stats["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+                return {"score": score, "rationale": rationale, "evaluation_stats": stats}
+
+        chain = self._get_chain("screening", screening_prompt_template)
+        try:
+            with metrics.timed("screening"):
+                response = await self._invoke("screening", chain, {
+                    "criteria_list": criteria_list,
+                    "rules": rules,
+                    "image_data": image_data,
+                    "image_mime_type": image_mime_type
+                })
+            self._record_usage(stats, response)
+            score, rationale = parse_score_response(response.content)
+        except Exception as e:
+            print(f"Error in screening: {e}")
+            score, rationale = None, f"Error during screening: {str(e)}"
+        if score is not None and cache_key is not None:
+            result_cache.result_cache.set(cache_key, (score, rationale))
+        stats["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return {"score": score, "rationale": rationale, "evaluation_stats": stats}
+
     async def judge_photo(
         self,
         photo_filename: str,
@@ -214,74 +485,299 @@ class PhotoJudgeApp:
         criteria: List[JudgingCriterion],
         competition_rules: Dict[str, Any],
         evaluation_prompt_template: str,
-        reasoning_prompt_template: str
+        reasoning_prompt_template: str,
+        image_mime_type: str = "image/jpeg",
+        evaluation_mode: str = schemas.EvaluationMode.PER_CRITERION,
+        combined_evaluation_prompt_template: str | None = None,
+        image_sha256: str | None = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
-        """Run the full judging pipeline on a photo and return the results."""
-        workflow = self._build_workflow()
+        """
+        Run the full judging pipeline on a photo and return the results.
+        Results are cached by `image_sha256` (no caching without it) unless `use_cache` is False.
+        """
+        workflow = self.workflow
 
         initial_state = AppState(
             photo=PhotoState(
                 image_data=image_data,
+                image_mime_type=image_mime_type,
+                image_sha256=image_sha256,
                 filename=photo_filename,
                 scores={},
                 rationales={},
                 overall_score=0.0,
                 overall_reasoning="",
+                evaluation_mode=schemas.EvaluationMode(evaluation_mode).value,
+                evaluation_stats={"llm_calls": 0, "input_tokens": 0, "output_tokens": 0},
                 stage="input"
             ),
             criteria=criteria,
             competition_rules=competition_rules,
             evaluation_prompt_template=evaluation_prompt_template,
-            reasoning_prompt_template=reasoning_prompt_template
+            combined_evaluation_prompt_template=combined_evaluation_prompt_template,
+            reasoning_prompt_template=reasoning_prompt_template,
+            use_cache=use_cache
         )
 
+        start = time.perf_counter()
         final_state = await workflow.ainvoke(initial_state)
+        final_state["photo"]["evaluation_stats"]["total_ms"] = round((time.perf_counter() - start) * 1000, 2)
         photo_result = dict(final_state["photo"])
         photo_result.pop("image_data", None)
+        photo_result.pop("image_mime_type", None)
 
         return photo_result
 
+def parse_score_response(content: str) -> tuple[float | None, str]:
+    """
+    Parse a `SCORE: <number>` / `RATIONALE: <text>` response. The score is clamped to 0-10,
+    or None if there is no SCORE line; a malformed number raises ValueError.
+    """
+    lines = content.split('\n')
+    score_line = next((line for line in lines if line.startswith('SCORE:')), None)
+    rationale_line = next((line for line in lines if line.startswith('RATIONALE:')), 'RATIONALE: No detailed feedback available.')
+    rationale = rationale_line.split('RATIONALE:')[1].strip()
+    if score_line is None:
+        return None, rationale
+    score = float(score_line.split('SCORE:')[1].strip())
+    return max(0.0, min(10.0, score)), rationale
+
+
+def parse_combined_response(content: str, criteria: List[JudgingCriterion]) -> Dict[str, tuple[float, str]]:
+    """
+    Parse a combined evaluation response of the form
+    {"<criterion>": {"score": <number>, "rationale": "<text>"}, ...}.
+    Criteria that are missing or malformed are left out of the result.
+    """
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        data = json.loads(content[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+
+    entries = {str(key).strip().lower(): value for key, value in data.items()}
+    parsed: Dict[str, tuple[float, str]] = {}
+    for criterion in criteria:
+        entry = entries.get(criterion.name.lower())
+        if not isinstance(entry, dict):
+            continue
+        try:
+            score = max(0.0, min(10.0, float(entry["score"])))
+        except (KeyError, TypeError, ValueError):
+            continue
+        rationale = str(entry.get("rationale") or "No detailed feedback available.").strip()
+        parsed[criterion.name] = (score, rationale)
+    return parsed
+
+
 # Create the Photo Judge Instance
 photo_judge_app = PhotoJudgeApp()
 
-# The actual service that the API is calling
-async def process_and_store_image(file: UploadFile, competition_id: int, db: Session) -> schemas.Judgement:
-    competition = crud.get_competition(db, competition_id)
+async def judge_image(
+    image_path: Path,
+    original_filename: str,
+    competition_id: int,
+    db: AsyncSession,
+    use_cache: bool = True,
+    image_sha256: str | None = None,
+    config: JudgingConfig | None = None
+) -> Dict[str, Any]:
+    """
+    Judge an image file with the competition configuration in `config`, or the
+    current cached one. Nothing is persisted. With `use_cache=False` every LLM
+    call is made even if a cached result exists. In cascade mode only photos that
+    pass screening get the full panel; the others come back screening-only.
+    """
+    if config is None:
+        config = await config_cache.get(db)
+    competition = config.competition(competition_id)
     if not competition:
         raise HTTPException(status_code=404, detail="Competition not found")
 
-    criteria = crud.get_enabled_criteria(db)
-    if not criteria:
+    if not config.criteria:
         raise HTTPException(status_code=400, detail="No enabled judging criteria found")
 
-    # Fetch the currently *enabled* prompts by their type
-    eval_prompt = crud.get_enabled_prompt_by_type(db, "EVALUATION_PROMPT")
-    reasoning_prompt = crud.get_enabled_prompt_by_type(db, "REASONING_PROMPT")
+    # The currently *enabled* prompts by their type
+    eval_prompt = config.prompt("EVALUATION_PROMPT")
+    reasoning_prompt = config.prompt("REASONING_PROMPT")
 
     if not eval_prompt:
         raise HTTPException(status_code=500, detail="No enabled EVALUATION_PROMPT found. Please enable one in the settings.")
     if not reasoning_prompt:
         raise HTTPException(status_code=500, detail="No enabled REASONING_PROMPT found. Please enable one in the settings.")
 
+    evaluation_mode = competition.evaluation_mode or settings.EVALUATION_MODE
+    combined_prompt = None
+    if evaluation_mode == schemas.EvaluationMode.COMBINED:
+        combined_prompt = config.prompt("COMBINED_EVALUATION_PROMPT")
+        if not combined_prompt:
+            raise HTTPException(status_code=500, detail="No enabled COMBINED_EVALUATION_PROMPT found. Please enable one in the settings.")
+
+    screening_prompt = None
+    if cascade_service.cascade_enabled(competition):
+        screening_prompt = config.prompt("SCREENING_PROMPT")
+        if not screening_prompt:
+            raise HTTPException(status_code=500, detail="No enabled SCREENING_PROMPT found. Please enable one in the settings.")
+
     judging_criteria = [
         JudgingCriterion(name=c.name, description=c.description, weight=c.weight)
-        for c in criteria
+        for c in config.criteria
     ]
 
-    contents = await file.read()
-    image_data = base64.b64encode(contents).decode("utf-8")
+    # Hash and decode/resize/re-encode off the event loop; the original file is stored untouched.
+    # Only the downsized rendition is held in memory for the LLM calls.
+    if image_sha256 is None:
+        with metrics.timed("hash"):
+            image_sha256 = await asyncio.to_thread(upload_service.file_sha256, image_path)
 
-    result = await photo_judge_app.judge_photo(
-        photo_filename=file.filename,
-        image_data=image_data,
-        criteria=judging_criteria,
-        competition_rules=competition.rules,
-        evaluation_prompt_template=eval_prompt.template,
-        reasoning_prompt_template=reasoning_prompt.template
+    screening = None
+    if screening_prompt is not None:
+        screening, screening_rendition = await _screen_image(
+            image_path, competition_id, competition.rules, judging_criteria, screening_prompt, image_sha256, use_cache, db
+        )
+
+    if screening is not None and not screening["passed"]:
+        result = _screening_only_result(original_filename, image_sha256, evaluation_mode, judging_criteria, screening)
+        result["preprocessing"] = screening_rendition.summary()
+    else:
+        with metrics.timed("preprocess"):
+            processed = await image_service.preprocess_image_async(image_path)
+        with metrics.timed("encode_base64"):
+            image_data = processed.to_base64()
+
+        result = await photo_judge_app.judge_photo(
+            photo_filename=original_filename,
+            image_data=image_data,
+            image_mime_type=processed.mime_type,
+            criteria=judging_criteria,
+            competition_rules=competition.rules,
+            evaluation_prompt_template=eval_prompt,
+            reasoning_prompt_template=reasoning_prompt,
+            evaluation_mode=evaluation_mode,
+            combined_evaluation_prompt_template=combined_prompt,
+            image_sha256=image_sha256,
+            use_cache=use_cache
+        )
+        result["preprocessing"] = processed.summary()
+        if screening is not None:
+            # The screening call is part of the photo's usage and cost
+            for name in ("llm_calls", "input_tokens", "output_tokens"):
+                result["evaluation_stats"][name] += screening["evaluation_stats"][name]
+            result["screening"] = screening
+    result["criterion_weights"] = {c.name: c.weight for c in judging_criteria}
+    # Priced when judged, so later price changes do not rewrite past spend
+    stats = result["evaluation_stats"]
+    stats["cost_usd"] = round(cost_service.llm_cost(stats["input_tokens"], stats["output_tokens"]), 8)
+    return result
+
+
+async def _screen_image(
+    image_path: Path,
+    competition_id: int,
+    competition_rules: str | None,
+    criteria: List[JudgingCriterion],
+    screening_prompt: str,
+    image_sha256: str,
+    use_cache: bool,
+    db: AsyncSession
+) -> tuple[Dict[str, Any], image_service.PreprocessedImage]:
+    """Screen a photo on its low-resolution rendition and decide whether it goes on to the full panel."""
+    long_edge = settings.CASCADE_SCREENING_LONG_EDGE
+    with metrics.timed("screening_preprocess"):
+        rendition = await image_service.preprocess_image_async(image_path, long_edge)
+    screening = await photo_judge_app.screen_photo(
+        image_data=rendition.to_base64(),
+        image_mime_type=rendition.mime_type,
+        criteria=criteria,
+        competition_rules=competition_rules,
+        screening_prompt_template=screening_prompt,
+        image_sha256=image_sha256,
+        long_edge=long_edge,
+        use_cache=use_cache
     )
+    decision = await cascade_service.screening_tracker.decide(db, competition_id, screening["score"])
+    screening.update(
+        passed=decision.passed, reason=decision.reason, rank=decision.rank,
+        screened_before=decision.screened_before, long_edge=long_edge
+    )
+    emit_progress("photo_screened", {"score": screening["score"], "passed": decision.passed, "reason": decision.reason})
+    return screening, rendition
+
+
+def _screening_only_result(
+    original_filename: str,
+    image_sha256: str,
+    evaluation_mode: str,
+    criteria: List[JudgingCriterion],
+    screening: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    The stored result of a photo that did not pass screening: shaped like a full judgement,
+    with the screening score and rationale as its overall score and reasoning and no criterion scores.
+    """
+    stats = dict(screening["evaluation_stats"])
+    # The panel's criterion calls (one in combined mode) and the head-judge reasoning call
+    stats["llm_calls_saved"] = (1 if evaluation_mode == schemas.EvaluationMode.COMBINED else len(criteria)) + 1
+    return {
+        "filename": original_filename,
+        "image_sha256": image_sha256,
+        "scores": {},
+        "rationales": {},
+        "overall_score": screening["score"],
+        "overall_reasoning": screening["rationale"],
+        "overall_reasoning_score": None,
+        "evaluation_mode": schemas.EvaluationMode(evaluation_mode).value,
+        "evaluation_stats": stats,
+        "stage": "screened",
+        "screening_only": True,
+        "screening": screening,
+    }
 
-    filename = f"{uuid.uuid4()}{Path(file.filename).suffix}"
-    async with aiofiles.open(settings.IMAGE_DIR / filename, "wb") as out_file:
-        await out_file.write(contents)
 
-    return crud.create_judgement(db, result, filename, competition_id)
\ No newline at end of file
+# The actual service that the API is calling
+async def process_and_store_image(
+    file: UploadFile, competition_id: int, db: AsyncSession, use_cache: bool = True
+) -> schemas.Judgement:
+    upload = await upload_service.spool_upload(file)
+    return await judge_and_store_image(upload, competition_id, db, use_cache)
+
+
+async def judge_and_store_image(
+    upload: upload_service.SpooledUpload,
+    competition_id: int,
+    db: AsyncSession,
+    use_cache: bool = True,
+    config: JudgingConfig | None = None
+) -> schemas.Judgement:
+    """
+    Judge a spooled upload, then keep the file and store its judgement. The file is removed on failure,
+    and nothing is judged (402) once the competition's budget is spent.
+    Batches pass the `config` snapshot they took at their start.
+    """
+    try:
+        await cost_service.check_budget(db, competition_id)
+        result = await judge_image(
+            upload.path, upload.original_filename, competition_id, db, use_cache,
+            image_sha256=upload.sha256, config=config
+        )
+    except BaseException:
+        upload.discard()
+        raise
+    try:
+        await upload.commit()
+    except BaseException:
+        upload.discard()
+        raise
+    # Render the grid thumbnail while the judgement is written, so its first view is instant
+    rendition_cache.pregenerate(upload.stored_filename, upload.sha256)
+
+    # Batched with other judgements finishing at the same time; returns once committed
+    with metrics.timed("db_write"):
+        judgement = await judgement_writer.write(result, upload.stored_filename, competition_id)
+    emit_progress("judgement_stored", {"judgement": schemas.Judgement.model_validate(judgement).model_dump(mode="json")})
+    return judgement
\ No newline at end of file
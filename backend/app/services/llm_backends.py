@@ -0,0 +1,227 @@
+# app/services/llm_backends.py
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import Runnable
+
+_CRITERION_LINE = re.compile(r"^\s*-\s*([^:\n]+):", re.MULTILINE)
+_IMAGE_TOKENS = 258
+_FILLER_WORDS = (
+    "composition light subject balance exposure detail colour mood framing contrast "
+    "focus texture story depth timing perspective"
+).split()
+
+
+class FakeLLMError(Exception):
+    """A simulated provider failure; reported as a rate limit, so the scheduler retries it."""
+    status_code = 429
+
+
+def _prompt_parts(prompt: Any) -> tuple[str, List[str]]:
+    """The text and the image URLs of a prompt value, message list or string."""
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, str):
+        return prompt, []
+    texts: List[str] = []
+    images: List[str] = []
+    for message in prompt:
+        content = getattr(message, "content", message)
+        if isinstance(content, str):
+            texts.append(content)
+            continue
+        for part in content:
+            if not isinstance(part, dict):
+                continue
+            if part.get("type") == "text":
+                texts.append(part["text"])
+            elif part.get("type") == "image_url":
+                url = part["image_url"]
+                images.append(url["url"] if isinstance(url, dict) else url)
+    return "\n".join(texts), images
+
+
+class _FakeChatModel:
+    """
+    Offline stand-in for the chat model that answers every judging prompt in the
+    format its parser expects (SCORE/RATIONALE, the combined JSON object,
+    FINAL_SCORE/RATIONALE) and anything else with plain text, e.g. for guideline
+    synthesis. Scores are derived from the prompt, so the same prompt always gets
+    the same answer. Latency and failures are drawn from a seeded generator, so a
+    run with the same call order is reproducible.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        latency_distribution: str = "normal",
+        error_rate: float = 0.0,
+        response_words: int = 30,
+        seed: int = 0
+    ):
+        if latency_distribution not in ("constant", "normal", "lognormal", "uniform"):
+            raise ValueError(f"Unknown latency distribution {latency_distribution!r}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.response_words = response_words
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    @classmethod
+    def from_settings(cls) -> _FakeChatModel:
+        return cls(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_jitter_ms=settings.FAKE_LLM_LATENCY_JITTER_MS,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            response_words=settings.FAKE_LLM_RESPONSE_WORDS,
+            seed=settings.FAKE_LLM_SEED
+        )
+
+    # --- Simulated latency and failures ---
+
+    def _draw(self) -> tuple[float, bool]:
+        """Latency in seconds and whether this call fails."""
+        with self._lock:
+            self.calls += 1
+            mean, jitter = self.latency_ms, self.latency_jitter_ms
+            if self.latency_distribution == "constant" or not jitter:
+                latency = mean
+            elif self.latency_distribution == "normal":
+                latency = self._random.gauss(mean, jitter)
+            elif self.latency_distribution == "uniform":
+                latency = self._random.uniform(mean - jitter, mean + jitter)
+            elif mean > 0:
+                # Long-tailed like real provider latencies, with the configured mean and standard deviation
+                sigma2 = math.log(1 + (jitter / mean) ** 2)
+                latency = self._random.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+            else:
+                latency = 0.0
+            fails = self._random.random() < self.error_rate
+            if fails:
+                self.errors += 1
+        return max(0.0, latency) / 1000, fails
+
+    # --- Responses ---
+
+    @staticmethod
+    def _score(text: str, salt: str = "") -> float:
+        digest = hashlib.sha256(f"{salt}\0{text}".encode("utf-8")).digest()
+        return round(4.0 + (int.from_bytes(digest[:4], "big") % 56) / 10, 1)
+
+    def _words(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        words = [_FILLER_WORDS[digest[i % len(digest)] % len(_FILLER_WORDS)] for i in range(self.response_words)]
+        return (" ".join(words).capitalize() + ".") if words else "Fine."
+
+    def respond(self, prompt: Any) -> AIMessage:
+        """The answer to a prompt, without latency or failures."""
+        from langchain_core.messages import AIMessage
+
+        text, images = _prompt_parts(prompt)
+        # Scores depend on the image too, so different photos rank differently
+        seed = hashlib.sha256("".join(images).encode("utf-8")).hexdigest() + text
+        if "FINAL_SCORE" in text:
+            content = f"FINAL_SCORE: {self._score(seed)}\nRATIONALE: {self._words(seed)}"
+        elif '"score"' in text:
+            names = [name.strip() for name in _CRITERION_LINE.findall(text)]
+            content = json.dumps({
+                name: {"score": self._score(seed, name), "rationale": self._words(name + seed)} for name in names
+            })
+        elif "SCORE" in text:
+            content = f"SCORE: {self._score(seed)}\nRATIONALE: {self._words(seed)}"
+        else:
+            content = self._words(seed)
+        # Rough token counts: ~4 characters per text token, a fixed cost per image
+        input_tokens = max(1, len(text) // 4) + _IMAGE_TOKENS * len(images)
+        output_tokens = max(1, len(content) // 4)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens
+        })
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        latency, fails = self._draw()
+        time.sleep(latency)
+        if fails:
+            raise FakeLLMError("Simulated rate limit (429)")
+        return self.respond(input)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        latency, fails = self._draw()
+        await asyncio.sleep(latency)
+        if fails:
+            raise FakeLLMError("Simulated rate limit (429)")
+        return self.respond(input)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": self.calls, "errors": self.errors}
+
+
+_fake_chat_model_class: type | None = None
+
+
+def _fake_chat_model() -> type:
+    """
+    FakeChatModel, the Runnable form of _FakeChatModel that prompts can be piped into.
+    Defined on first use: langchain_core is slow to import and the API does not need it to start.
+    """
+    global _fake_chat_model_class
+    if _fake_chat_model_class is None:
+        from langchain_core.runnables import Runnable
+
+        class FakeChatModel(_FakeChatModel, Runnable):
+            __doc__ = _FakeChatModel.__doc__
+
+        _fake_chat_model_class = FakeChatModel
+    return _fake_chat_model_class
+
+
+def __getattr__(name: str) -> Any:
+    if name == "FakeChatModel":
+        return _fake_chat_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _fake() -> Runnable:
+    return _fake_chat_model().from_settings()
+
+
+def _gemini() -> Runnable:
+    # The provider SDK is slow to import, so it is loaded when the model is first needed
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(model=settings.GEMINI_MODEL_NAME, temperature=settings.MODEL_TEMPERATURE)
+
+
+# Selected with LLM_BACKEND; register further chat models here
+LLM_BACKENDS: Dict[str, Callable[[], Runnable]] = {
+    "gemini": _gemini,
+    "fake": _fake,
+}
+
+
+def create_chat_model(name: str | None = None) -> Runnable:
+    """The chat model of the configured backend (LLM_BACKEND unless `name` is given)."""
+    name = name or settings.LLM_BACKEND
+    if name not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND {name!r}; expected one of {sorted(LLM_BACKENDS)}")
+    return LLM_BACKENDS[name]()
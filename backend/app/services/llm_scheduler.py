@@ -0,0 +1,280 @@
+# app/services/llm_scheduler.py
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import random
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Iterator, TypeVar
+
+from ..core import metrics
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+
+T = TypeVar("T")
+
+DEFAULT_LANE = "interactive"
+
+# The lane (fair-queuing bucket) of the current request; copied into tasks created by asyncio.gather
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("llm_lane", default=DEFAULT_LANE)
+
+_RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRYABLE_ERROR_NAMES = {
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "RateLimitError", "APITimeoutError", "APIConnectionError",
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Heuristic for transient LLM provider errors (rate limits, overload, timeouts)."""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in _RETRYABLE_ERROR_NAMES:
+        return True
+    for attr in ("status_code", "code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int) and status in _RETRYABLE_STATUS_CODES:
+            return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "resource exhausted" in message
+
+
+class TokenBucket:
+    """Requests-per-minute limiter. A rate of 0 disables it."""
+
+    def __init__(self, requests_per_minute: int, capacity: int):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LLMScheduler:
+    """
+    Process-wide gate in front of the LLM: bounds in-flight requests, enforces a
+    requests-per-minute budget, retries transient errors with jittered exponential
+    backoff and serves waiting lanes round-robin so one large batch cannot starve
+    single-photo requests.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        requests_per_minute: int,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._bucket = TokenBucket(requests_per_minute, capacity=self.max_in_flight)
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._in_flight = 0
+        self._reset_metrics()
+
+    @classmethod
+    def from_settings(cls) -> "LLMScheduler":
+        return cls(
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_base_delay=settings.LLM_RETRY_BASE_DELAY,
+            retry_max_delay=settings.LLM_RETRY_MAX_DELAY,
+        )
+
+    def _reset_metrics(self) -> None:
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    # --- Lanes ---
+
+    @staticmethod
+    @contextlib.contextmanager
+    def lane(name: str) -> Iterator[None]:
+        """Run the enclosed LLM calls (including tasks spawned inside) in the given lane."""
+        token = _current_lane.set(name)
+        try:
+            yield
+        finally:
+            _current_lane.reset(token)
+
+    # --- Slot management ---
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def _acquire_slot(self, lane: str) -> None:
+        if self._in_flight < self.max_in_flight and not self._queues:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(lane, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before cancellation; hand it on
+                self._release_slot()
+            else:
+                queue = self._queues.get(lane)
+                if queue and waiter in queue:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[lane]
+            raise
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting lanes in round-robin order."""
+        while self._in_flight < self.max_in_flight and self._queues:
+            lane, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            # Rotate the lane to the back so the next grant goes to another lane
+            del self._queues[lane]
+            if queue:
+                self._queues[lane] = queue
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    # --- Execution ---
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt)))
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run an LLM coroutine factory under the scheduler's limits, retrying transient errors."""
+        lane = _current_lane.get()
+        attempt = 0
+        while True:
+            enqueued = time.perf_counter()
+            await self._acquire_slot(lane)
+            try:
+                await self._bucket.acquire()
+                waited = time.perf_counter() - enqueued
+                self.wait_count += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+                metrics.record("llm_wait", waited)
+                result = await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    self.failed += 1
+                    raise
+                error = e
+            else:
+                self.completed += 1
+                return result
+            finally:
+                self._release_slot()
+
+            # Back off without holding a slot so other requests can proceed
+            self.retries += 1
+            delay = self._backoff_delay(attempt)
+            print(f"Retryable LLM error ({type(error).__name__}), retry {attempt + 1} in {delay:.2f}s: {error}")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "queue_depth_by_lane": {lane: len(q) for lane, q in self._queues.items()},
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.wait_count, 2) if self.wait_count else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 2),
+        }
+
+
+class _ScheduledLLM:
+    """Routes async calls of a chat model through an LLMScheduler."""
+
+    def __init__(self, llm: Runnable, scheduler: LLMScheduler):
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        # Synchronous calls are not used on the judging path and bypass the scheduler
+        return self.llm.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        return await self.scheduler.run(lambda: self.llm.ainvoke(input, config, **kwargs))
+
+
+_scheduled_llm_class: type | None = None
+
+
+def _scheduled_llm() -> type:
+    """
+    ScheduledLLM, the Runnable form of _ScheduledLLM that prompts can be piped into.
+    Defined on first use: langchain_core is slow to import and the API does not need it to start.
+    """
+    global _scheduled_llm_class
+    if _scheduled_llm_class is None:
+        from langchain_core.runnables import Runnable
+
+        class ScheduledLLM(_ScheduledLLM, Runnable):
+            __doc__ = _ScheduledLLM.__doc__
+
+        _scheduled_llm_class = ScheduledLLM
+    return _scheduled_llm_class
+
+
+def __getattr__(name: str) -> Any:
+    if name == "ScheduledLLM":
+        return _scheduled_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def schedule(llm: Runnable, scheduler: LLMScheduler) -> Runnable:
+    """`llm` with its async calls routed through `scheduler`; a model that already is, as is."""
+    if isinstance(llm, _ScheduledLLM):
+        return llm
+    return _scheduled_llm()(llm, scheduler)
+
+
+llm_scheduler = LLMScheduler.from_settings()
+
+metrics.registry.gauge(
+    "photo_judge_llm_in_flight", "LLM requests currently running.", lambda: llm_scheduler._in_flight
+)
+metrics.registry.gauge(
+    "photo_judge_llm_queue_depth", "LLM requests waiting for a slot.", lambda: llm_scheduler.queue_depth
+)
@@ -0,0 +1,201 @@
+# app/services/rendition_service.py
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple
+
+from ..core.config import settings
+from ..storage.image_store import image_store
+from . import image_service
+from .upload_service import file_sha256
+
+RENDITION_FORMATS = ("webp", "jpeg")
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Stored images never change (their names are unique), so neither do their renditions
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_SOURCE_HASHES_MAX = 50000
+
+
+def normalize_width(width: int) -> int:
+    """Snap a requested width up to the nearest configured rendition width, so the cache stays bounded."""
+    widths = sorted(settings.RENDITION_WIDTHS)
+    return next((w for w in widths if w >= width), widths[-1])
+
+
+def rendition_etag(sha256: str, width: int, output_format: str) -> str:
+    """Strong ETag of a rendition (at a normalized width); known without rendering it."""
+    return f'"{sha256}-w{width}.{output_format}"'
+
+
+class RenditionCache:
+    """
+    On-disk cache of derived images (thumbnails and other display sizes), keyed by the
+    SHA-256 of the source file plus width and format, so identical uploads share their
+    renditions. The least recently used files are deleted once `max_bytes` is exceeded.
+    Concurrent requests for the same missing rendition render it once.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Path, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._source_hashes: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[Path, asyncio.Future] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Source hashes ---
+
+    def remember_source(self, stored_filename: str, sha256: str) -> None:
+        with self._lock:
+            self._source_hashes[stored_filename] = sha256
+            self._source_hashes.move_to_end(stored_filename)
+            while len(self._source_hashes) > _SOURCE_HASHES_MAX:
+                self._source_hashes.popitem(last=False)
+
+    async def source_sha256(self, stored_filename: str) -> str:
+        """SHA-256 of a stored image: its image store key, or for legacy flat files hashed once and remembered."""
+        with self._lock:
+            sha256 = self._source_hashes.get(stored_filename)
+        if sha256 is None:
+            sha256 = await asyncio.to_thread(image_store.sha256, stored_filename)
+            if sha256 is None:
+                sha256 = await asyncio.to_thread(file_sha256, await self._source_path(stored_filename))
+            self.remember_source(stored_filename, sha256)
+        return sha256
+
+    @staticmethod
+    async def _source_path(stored_filename: str) -> Path:
+        path = await asyncio.to_thread(image_store.local_path, stored_filename)
+        if path is None:
+            raise FileNotFoundError(stored_filename)
+        return path
+
+    # --- LRU bookkeeping ---
+
+    def _load(self) -> None:
+        """Index the renditions left by previous runs, oldest first."""
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.directory.glob("*/*"):
+            if path.suffix.lstrip(".") in RENDITION_FORMATS:
+                stat = path.stat()
+                found.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(found):
+            self._entries[path] = size
+            self._total_bytes += size
+        self._loaded = True
+
+    def _touch(self, path: Path) -> bool:
+        with self._lock:
+            self._load()
+            if path not in self._entries:
+                return False
+            self._entries.move_to_end(path)
+        try:
+            # Keep the recency order across restarts
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total_bytes -= self._entries.pop(path, 0)
+            return False
+        return True
+
+    def _add(self, path: Path, size: int) -> None:
+        with self._lock:
+            self._load()
+            self._total_bytes += size - self._entries.pop(path, 0)
+            self._entries[path] = size
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                victim, victim_size = self._entries.popitem(last=False)
+                self._total_bytes -= victim_size
+                self.evictions += 1
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+
+    # --- Renditions ---
+
+    def _path(self, sha256: str, width: int, output_format: str) -> Path:
+        return self.directory / sha256[:2] / f"{sha256}-w{width}.{output_format}"
+
+    async def get(self, stored_filename: str, width: int, output_format: str) -> Tuple[Path, str]:
+        """Return the path and strong ETag of a rendition, rendering it first if needed."""
+        width = normalize_width(width)
+        sha256 = await self.source_sha256(stored_filename)
+        path = self._path(sha256, width, output_format)
+        etag = rendition_etag(sha256, width, output_format)
+        if self._touch(path):
+            self.hits += 1
+            return path, etag
+        self.misses += 1
+
+        # Wait for a render of the same rendition already in progress; if it failed, render it here
+        while (pending := self._inflight.get(path)) is not None:
+            await asyncio.wait({pending})
+            if self._touch(path):
+                return path, etag
+
+        done = asyncio.get_running_loop().create_future()
+        self._inflight[path] = done
+        try:
+            data = await image_service.create_rendition_async(
+                await self._source_path(stored_filename), width, output_format, settings.RENDITION_QUALITY
+            )
+            await asyncio.to_thread(self._write, path, data)
+            self._add(path, len(data))
+        finally:
+            del self._inflight[path]
+            done.set_result(None)
+        return path, etag
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def pregenerate(self, stored_filename: str, sha256: str) -> None:
+        """Render the default thumbnail of a newly stored image in the background."""
+        self.remember_source(stored_filename, sha256)
+
+        async def render() -> None:
+            try:
+                await self.get(stored_filename, settings.THUMBNAIL_WIDTH, settings.THUMBNAIL_FORMAT)
+            except Exception as e:
+                print(f"Could not pre-generate thumbnail for {stored_filename}: {e}")
+
+        task = asyncio.get_running_loop().create_task(render())
+        # Hold a reference until the task is done so it is not garbage collected
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rendering": len(self._inflight),
+            }
+
+
+rendition_cache = RenditionCache(settings.RENDITION_DIR, settings.RENDITION_CACHE_MAX_BYTES)
@@ -0,0 +1,97 @@
+# app/services/result_cache.py
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from ..core.config import settings
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _model_fingerprint() -> tuple:
+    return (settings.GEMINI_MODEL_NAME, settings.MODEL_TEMPERATURE)
+
+
+def criterion_key(image_sha256: str, criterion_name: str, criterion_description: str, template: str) -> str:
+    """Key of a single criterion's score/rationale for an image, prompt template and model."""
+    return _digest(
+        "criterion", image_sha256, _digest(criterion_name, criterion_description), _digest(template), *_model_fingerprint()
+    )
+
+
+def reasoning_key(image_sha256: str, template: str, rules: str | None, overall_score: float, feedback_summary: str) -> str:
+    """Key of the head-judge reasoning step; it also depends on the rules and the panel's feedback."""
+    return _digest(
+        "reasoning", image_sha256, _digest(template), rules, overall_score, _digest(feedback_summary), *_model_fingerprint()
+    )
+
+
+def screening_key(image_sha256: str, template: str, criteria_list: str, rules: str | None, long_edge: int) -> str:
+    """Key of a cascade screening score; it depends on the rendition size the screening call sees."""
+    return _digest(
+        "screening", image_sha256, _digest(template), _digest(criteria_list), rules, long_edge, *_model_fingerprint()
+    )
+
+
+class JudgingResultCache:
+    """
+    In-process LRU cache of LLM judging results keyed by content hash.
+    Entries expire after `ttl_seconds` (0 = never); the least recently used
+    entry is evicted once `max_entries` is reached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.evictions = 0
+
+    def get(self, kind: str, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            return entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "evictions": self.evictions,
+            }
+
+
+result_cache = JudgingResultCache(settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_TTL_SECONDS)
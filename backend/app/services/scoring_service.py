@@ -0,0 +1,103 @@
+# app/services/scoring_service.py
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Dict, List
+
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..crud import crud
+from ..db import models, schemas
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def weighted_scores(scores: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Weighted mean per row of a (judgements x criteria) score matrix.
+    NaN marks a criterion a judgement was not scored on; it is left out of
+    both the weighted sum and the total weight, as at judge time.
+    """
+    import numpy as np
+
+    present = ~np.isnan(scores)
+    weighted_sum = np.where(present, scores, 0.0) @ weights
+    total_weight = present @ weights
+    result = np.divide(weighted_sum, total_weight, out=np.zeros_like(weighted_sum), where=total_weight > 0)
+    return np.round(result, 2)
+
+
+def rescore_competition(db: Session, competition_id: int, dry_run: bool = False, limit: int = 100) -> schemas.RescoreResult:
+    """Recompute `overall_score` for every judgement of a competition from the current criterion weights."""
+    # Imported on first use to keep it off the API's cold start
+    import numpy as np
+
+    if not crud.get_competition(db, competition_id):
+        raise HTTPException(status_code=404, detail="Competition not found")
+
+    weights_by_name: Dict[str, float] = {c.name: c.weight for c in crud.get_enabled_criteria(db)}
+    if not weights_by_name:
+        raise HTTPException(status_code=400, detail="No enabled judging criteria found")
+    criterion_names = list(weights_by_name)
+    column_of = {name: i for i, name in enumerate(criterion_names)}
+
+    rows = db.query(
+        models.Judgement.id, models.Judgement.original_filename,
+        models.Judgement.overall_score, models.Judgement.judgement_details
+    ).filter(models.Judgement.competition_id == competition_id).all()
+
+    ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+    old_scores = np.fromiter((row.overall_score or 0.0 for row in rows), dtype=np.float64, count=len(rows))
+    matrix = np.full((len(rows), len(criterion_names)), np.nan)
+    for i, row in enumerate(rows):
+        for name, score in ((row.judgement_details or {}).get("scores") or {}).items():
+            j = column_of.get(name)
+            if j is not None:
+                matrix[i, j] = score
+
+    start = time.perf_counter()
+    new_scores = weighted_scores(matrix, np.array([weights_by_name[n] for n in criterion_names]))
+    # Judgements scored on none of the enabled criteria (e.g. after renaming or disabling criteria,
+    # legacy rows, cascade screening-only judgements) would get 0.0; they keep their score instead
+    skipped = np.isnan(matrix).all(axis=1)
+    new_scores = np.where(skipped, old_scores, new_scores)
+    compute_ms = (time.perf_counter() - start) * 1000
+
+    changed = np.flatnonzero(new_scores != old_scores)
+    if not dry_run and changed.size:
+        # judgement_details carries its own copy of overall_score; keep it in sync with the column
+        updates = []
+        for i in changed.tolist():
+            details = dict(rows[i].judgement_details or {})
+            details["overall_score"] = float(new_scores[i])
+            updates.append({"id": int(ids[i]), "overall_score": float(new_scores[i]), "judgement_details": details})
+        db.execute(update(models.Judgement), updates)
+        db.commit()
+
+    # Rank by the new score, highest first; ties keep the older judgement first
+    order = np.lexsort((ids, -new_scores))[:limit]
+    ranking: List[schemas.RescoredJudgement] = [
+        schemas.RescoredJudgement(
+            id=int(ids[i]),
+            original_filename=rows[i].original_filename,
+            previous_score=float(old_scores[i]),
+            overall_score=float(new_scores[i]),
+            rank=rank,
+        )
+        for rank, i in enumerate(order.tolist(), start=1)
+    ]
+
+    return schemas.RescoreResult(
+        competition_id=competition_id,
+        dry_run=dry_run,
+        weights=weights_by_name,
+        judgements=len(rows),
+        changed=int(changed.size),
+        skipped=int(skipped.sum()),
+        compute_ms=round(compute_ms, 3),
+        ranking=ranking,
+    )
@@ -0,0 +1,131 @@
+# app/services/upload_service.py
+
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+import aiofiles
+from fastapi import HTTPException, UploadFile
+
+from ..core import metrics
+from ..core.config import settings
+from ..storage.image_store import image_store
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Spooled uploads live under a temporary name until their judgement is stored
+_PARTIAL_SUFFIX = ".part"
+
+
+def new_stored_filename(original_filename: str) -> str:
+    """Generate the unique name under which an upload is referenced in the image store."""
+    return f"{uuid.uuid4()}{Path(original_filename).suffix}"
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+@dataclass
+class SpooledUpload:
+    """An upload copied to disk in chunks, with its size and SHA-256 computed on the way."""
+    original_filename: str
+    stored_filename: str
+    size: int
+    sha256: str
+    committed: bool = False
+
+    @property
+    def path(self) -> Path:
+        """The temporary file, until `commit()` hands it to the image store."""
+        return settings.IMAGE_DIR / f".{self.stored_filename}{_PARTIAL_SUFFIX}"
+
+    async def commit(self) -> None:
+        """Move the spooled file into the image store under its stored name (deduplicated by content)."""
+        if not self.committed:
+            with metrics.timed("store_image"):
+                await asyncio.to_thread(
+                    image_store.store, self.stored_filename, self.path, self.sha256, self.original_filename
+                )
+            self.committed = True
+
+    def discard(self) -> None:
+        """Remove a spooled file that will not be stored."""
+        if not self.committed:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+async def spool_upload(file: UploadFile, batch_remaining: int | None = None) -> SpooledUpload:
+    """
+    Stream an upload into IMAGE_DIR in chunks, hashing it as it is written, so
+    the file is never held in memory. Raises 413 as soon as it exceeds
+    MAX_UPLOAD_BYTES or the `batch_remaining` bytes left of its batch's budget.
+    """
+    max_bytes = settings.MAX_UPLOAD_BYTES
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(f"{file.filename} exceeds the maximum upload size of {max_bytes} bytes")
+
+    upload = SpooledUpload(
+        original_filename=file.filename,
+        stored_filename=new_stored_filename(file.filename),
+        size=0,
+        sha256=""
+    )
+    hasher = hashlib.sha256()
+    try:
+        with metrics.timed("spool"):
+            async with aiofiles.open(upload.path, "wb") as out_file:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    upload.size += len(chunk)
+                    if upload.size > max_bytes:
+                        raise _too_large(f"{file.filename} exceeds the maximum upload size of {max_bytes} bytes")
+                    if batch_remaining is not None and upload.size > batch_remaining:
+                        raise _too_large(
+                            f"The batch exceeds the maximum total upload size of {settings.MAX_BATCH_UPLOAD_BYTES} bytes"
+                        )
+                    hasher.update(chunk)
+                    await out_file.write(chunk)
+    except BaseException:
+        upload.discard()
+        raise
+    upload.sha256 = hasher.hexdigest()
+    return upload
+
+
+async def spool_uploads(files: List[UploadFile]) -> List[SpooledUpload]:
+    """
+    Spool a batch of uploads, enforcing MAX_UPLOAD_BYTES per file and
+    MAX_BATCH_UPLOAD_BYTES for the batch. On error nothing is left on disk.
+    """
+    known_total = sum(f.size or 0 for f in files)
+    if known_total > settings.MAX_BATCH_UPLOAD_BYTES:
+        raise _too_large(f"The batch exceeds the maximum total upload size of {settings.MAX_BATCH_UPLOAD_BYTES} bytes")
+
+    uploads: List[SpooledUpload] = []
+    total = 0
+    try:
+        for f in files:
+            upload = await spool_upload(f, batch_remaining=settings.MAX_BATCH_UPLOAD_BYTES - total)
+            uploads.append(upload)
+            total += upload.size
+    except BaseException:
+        for upload in uploads:
+            upload.discard()
+        raise
+    return uploads
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a stored file, read in chunks. Blocking; call it from a worker thread in async code."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as in_file:
+        while chunk := in_file.read(UPLOAD_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
@@ -0,0 +1,213 @@
+# app/storage/backends.py
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+
+class StorageBackend(ABC):
+    """Where image blobs live. Keys are flat content-addressed names ("<sha256><suffix>")."""
+
+    @abstractmethod
+    def put(self, key: str, source: Path) -> None:
+        """Store a local file under `key`. The source file is consumed (moved or deleted)."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a blob; deleting a missing blob is not an error."""
+
+    @abstractmethod
+    def local_path(self, key: str) -> Path | None:
+        """A local file with the blob's contents for reading and serving, or None if it does not exist."""
+
+    @abstractmethod
+    def entries(self) -> Iterator[Tuple[str, float]]:
+        """Every stored key with the time it was last written (Unix seconds)."""
+
+
+def shard_path(root: Path, key: str) -> Path:
+    """Two-level fan-out (256 x 256 directories) so no directory grows too large."""
+    return root / key[:2] / key[2:4] / key
+
+
+class LocalFileSystemBackend(StorageBackend):
+    """Blobs in a sharded tree under `root`: root/ab/cd/abcd...<suffix>."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def put(self, key: str, source: Path) -> None:
+        path = shard_path(self.root, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic on the same filesystem; replacing an existing blob with identical bytes is harmless
+        os.replace(source, path)
+        # The rename keeps the spooled file's mtime; the garbage collector's grace period counts from now
+        os.utime(path)
+
+    def exists(self, key: str) -> bool:
+        return shard_path(self.root, key).is_file()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(shard_path(self.root, key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Path | None:
+        path = shard_path(self.root, key)
+        return path if path.is_file() else None
+
+    def entries(self) -> Iterator[Tuple[str, float]]:
+        for path in self.root.glob("??/??/*"):
+            if path.is_file() and not path.name.startswith("."):
+                try:
+                    yield path.name, path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+
+
+class ObjectStoreBackend(StorageBackend):
+    """
+    Blobs in an S3-compatible object store, through a client with the boto3 S3 method
+    names (`put_object`, `get_object`, `head_object`, `delete_object`, `list_objects_v2`).
+    Reads go through a local cache directory, since images are served and decoded from files.
+    """
+
+    def __init__(self, client: Any, bucket: str, cache_dir: Path, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = Path(cache_dir)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key[2:4]}/{key}"
+
+    def put(self, key: str, source: Path) -> None:
+        with open(source, "rb") as body:
+            self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=body)
+        # Keep the bytes as the local cached copy
+        cached = shard_path(self.cache_dir, key)
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, cached)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+        try:
+            os.remove(shard_path(self.cache_dir, key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Path | None:
+        cached = shard_path(self.cache_dir, key)
+        if cached.is_file():
+            return cached
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cached.with_name(f".{cached.name}.download")
+        body = response["Body"]
+        try:
+            with open(tmp_path, "wb") as out_file:
+                shutil.copyfileobj(body, out_file)
+        finally:
+            body.close()
+        os.replace(tmp_path, cached)
+        return cached
+
+    def entries(self) -> Iterator[Tuple[str, float]]:
+        token = None
+        while True:
+            kwargs: Dict[str, Any] = {"Bucket": self.bucket, "Prefix": self.prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            for entry in page.get("Contents", []):
+                yield entry["Key"].rsplit("/", 1)[-1], entry["LastModified"].timestamp()
+            if not page.get("IsTruncated"):
+                return
+            token = page.get("NextContinuationToken")
+
+
+def _is_not_found(error: Exception) -> bool:
+    if isinstance(error, (FileNotFoundError, KeyError)):
+        return True
+    # botocore ClientError
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class LocalObjectStoreClient:
+    """
+    Stand-in for an S3 client that keeps objects as files under `root/<bucket>/<key>`.
+    Implements the subset of the boto3 S3 API used by ObjectStoreBackend, for local
+    development and for exercising that backend without a real object store.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    def put_object(self, Bucket: str, Key: str, Body: Any) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as out_file:
+            if isinstance(Body, (bytes, bytearray)):
+                out_file.write(Body)
+            else:
+                shutil.copyfileobj(Body, out_file)
+        return {}
+
+    def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        if not path.is_file():
+            raise FileNotFoundError(Key)
+        return {"ContentLength": path.stat().st_size}
+
+    def get_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        path = self._path(Bucket, Key)
+        if not path.is_file():
+            raise FileNotFoundError(Key)
+        return {"Body": open(path, "rb"), "ContentLength": path.stat().st_size}
+
+    def delete_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        try:
+            os.remove(self._path(Bucket, Key))
+        except FileNotFoundError:
+            pass
+        return {}
+
+    def list_objects_v2(self, Bucket: str, Prefix: str = "", ContinuationToken: str | None = None) -> Dict[str, Any]:
+        bucket_root = self.root / Bucket
+        paths = sorted(
+            (path.relative_to(bucket_root).as_posix(), path)
+            for path in bucket_root.rglob("*") if path.is_file()
+        ) if bucket_root.is_dir() else []
+        return {
+            "Contents": [
+                {"Key": key, "LastModified": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)}
+                for key, path in paths if key.startswith(Prefix)
+            ],
+            "IsTruncated": False,
+        }
@@ -0,0 +1,293 @@
+# app/storage/gc.py
+"""
+Garbage-collect images that nothing refers to any more: files and rows left behind
+by crashes between writing an image and committing its judgement or job item, by
+crashes while releasing images, and abandoned spooled uploads. Works in batches of
+IMAGE_GC_BATCH_SIZE and deletes at most IMAGE_GC_MAX_DELETES_PER_SECOND items per
+second, so it can run next to the live server. Anything younger than
+IMAGE_GC_GRACE_SECONDS is left alone, as it may still be on its way to being committed.
+The image store's per-key locks only cover uploads of the same process; against a
+server running in another process (e.g. this CLI), the grace period is the guard.
+
+Usage (from the backend directory):
+    python -m app.storage.gc [--dry-run]
+or POST /maintenance/image-gc on a running server.
+"""
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+from ..core.config import settings
+from ..db import models
+from ..db.database import SessionLocal
+from .image_store import ImageStore, image_store
+
+_PARTIAL_SUFFIX = ".part"
+
+
+def _batches(items: Iterator[str], size: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _referenced(names: List[str]) -> set:
+    """The names in use by a judgement or a job item."""
+    db = SessionLocal()
+    try:
+        judged = db.query(models.Judgement.stored_filename).filter(models.Judgement.stored_filename.in_(names))
+        queued = db.query(models.JobItem.stored_filename).filter(models.JobItem.stored_filename.in_(names))
+        return {name for (name,) in judged.union(queued)}
+    finally:
+        db.close()
+
+
+class ImageGarbageCollector:
+    """Incremental, rate-limited reconciliation of the image store against the judgements and job items."""
+
+    def __init__(self, store: ImageStore, batch_size: int, max_deletes_per_second: float, grace_seconds: float):
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.max_deletes_per_second = max_deletes_per_second
+        self.grace_seconds = grace_seconds
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._next_delete_at = 0.0
+        self._status: Dict[str, Any] = {"running": False}
+
+    # --- Running ---
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, dry_run: bool = False) -> bool:
+        """Run a collection on a background thread; returns False if one is already running."""
+        with self._lock:
+            if self.running:
+                return False
+            self._status = {"running": True}
+            self._thread = threading.Thread(target=self._run_logged, args=(dry_run,), name="image-gc", daemon=True)
+            self._thread.start()
+        return True
+
+    def _run_logged(self, dry_run: bool) -> None:
+        try:
+            self.run(dry_run)
+        except Exception as e:
+            print(f"Image garbage collection failed: {e}")
+            self._update(error=str(e))
+        finally:
+            self._update(running=False)
+
+    def run(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Collect every kind of orphan and return the counts. Blocking."""
+        self._status = {
+            "running": True,
+            "dry_run": dry_run,
+            "phase": None,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "finished_at": None,
+            "scanned": 0,
+            "orphaned_references": 0,
+            "orphaned_blobs": 0,
+            "orphaned_files": 0,
+            "stale_uploads": 0,
+        }
+        cutoff = time.time() - self.grace_seconds
+        self._collect_references(dry_run, datetime.fromtimestamp(cutoff, timezone.utc))
+        self._collect_blob_rows(dry_run)
+        self._collect_backend_blobs(dry_run, cutoff)
+        self._collect_flat_files(dry_run, cutoff)
+        self._update(phase=None, finished_at=datetime.now(timezone.utc).isoformat())
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._status)
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            self._status.update(changes)
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._status[counter] = self._status.get(counter, 0) + amount
+
+    def _throttle(self, deletes: int) -> None:
+        """Sleep as needed to keep deletions under max_deletes_per_second."""
+        if self.max_deletes_per_second <= 0 or deletes <= 0:
+            return
+        now = time.monotonic()
+        self._next_delete_at = max(self._next_delete_at, now) + deletes / self.max_deletes_per_second
+        if self._next_delete_at > now:
+            time.sleep(self._next_delete_at - now)
+
+    # --- Phases ---
+
+    def _collect_references(self, dry_run: bool, cutoff: datetime) -> None:
+        """Image store references that no judgement or job item uses (e.g. a crash before the judgement was written)."""
+        self._update(phase="references")
+        after = ""
+        while True:
+            db = SessionLocal()
+            try:
+                names = [name for (name,) in db.query(models.ImageRef.name).filter(
+                    models.ImageRef.name > after, models.ImageRef.created_at < cutoff.replace(tzinfo=None)
+                ).order_by(models.ImageRef.name).limit(self.batch_size)]
+            finally:
+                db.close()
+            if not names:
+                return
+            after = names[-1]
+            self._count("scanned", len(names))
+            referenced = _referenced(names)
+            orphans = [name for name in names if name not in referenced]
+            if orphans:
+                self._count("orphaned_references", len(orphans))
+                if not dry_run:
+                    self._throttle(len(orphans))
+                    self.store.release_many(orphans)
+
+    def _collect_blob_rows(self, dry_run: bool) -> None:
+        """Blob rows without references (e.g. a crash while a competition's images were released)."""
+        self._update(phase="blob_rows")
+        after = ""
+        while True:
+            db = SessionLocal()
+            try:
+                keys = [key for (key,) in db.query(models.ImageBlob.key).outerjoin(
+                    models.ImageRef, models.ImageRef.blob_key == models.ImageBlob.key
+                ).filter(
+                    models.ImageBlob.key > after, models.ImageRef.name.is_(None)
+                ).order_by(models.ImageBlob.key).limit(self.batch_size)]
+            finally:
+                db.close()
+            if not keys:
+                return
+            after = keys[-1]
+            self._count("scanned", len(keys))
+            for key in keys:
+                if not dry_run:
+                    self._throttle(1)
+                    if not self._delete_unreferenced_blob(key):
+                        continue
+                self._count("orphaned_blobs")
+
+    def _delete_unreferenced_blob(self, key: str) -> bool:
+        # Checked again under the key's lock, since a new upload may have just referenced the blob;
+        # the reference check is part of the DELETE, so one committed by another process also counts
+        with self.store.lock(key):
+            db = SessionLocal()
+            try:
+                referenced = db.query(models.ImageRef.name).filter(models.ImageRef.blob_key == key).exists()
+                deleted = db.query(models.ImageBlob).filter(
+                    models.ImageBlob.key == key, ~referenced
+                ).delete(synchronize_session=False)
+                db.commit()
+            finally:
+                db.close()
+            if not deleted:
+                return False
+            self.store.backend.delete(key)
+        return True
+
+    def _collect_backend_blobs(self, dry_run: bool, cutoff: float) -> None:
+        """
+        Stored blobs without a row (e.g. a crash between writing a blob and committing it).
+        Blobs written within the grace period are skipped: store() writes the blob before
+        it commits the row, and may be doing so in another process right now.
+        """
+        self._update(phase="backend_blobs")
+        entries = self.store.backend.entries()
+        for keys in _batches((key for key, modified_at in entries if modified_at < cutoff), self.batch_size):
+            self._count("scanned", len(keys))
+            db = SessionLocal()
+            try:
+                known = {key for (key,) in db.query(models.ImageBlob.key).filter(models.ImageBlob.key.in_(keys))}
+            finally:
+                db.close()
+            for key in keys:
+                if key in known:
+                    continue
+                if not dry_run:
+                    self._throttle(1)
+                    # store() holds the key's lock from writing the blob until its row is committed
+                    with self.store.lock(key):
+                        db = SessionLocal()
+                        try:
+                            if db.get(models.ImageBlob, key) is not None:
+                                continue
+                        finally:
+                            db.close()
+                        self.store.backend.delete(key)
+                self._count("orphaned_blobs")
+
+    def _flat_files(self) -> Iterator[os.DirEntry]:
+        with os.scandir(self.store.legacy_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry
+
+    def _collect_flat_files(self, dry_run: bool, cutoff: float) -> None:
+        """Unreferenced files in the old flat layout, and spooled uploads abandoned by a crash."""
+        self._update(phase="flat_files")
+        batch: List[os.DirEntry] = []
+        for entry in self._flat_files():
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                self._collect_flat_batch(batch, dry_run, cutoff)
+                batch = []
+        if batch:
+            self._collect_flat_batch(batch, dry_run, cutoff)
+
+    def _collect_flat_batch(self, entries: List[os.DirEntry], dry_run: bool, cutoff: float) -> None:
+        self._count("scanned", len(entries))
+        spooled = [e for e in entries if e.name.startswith(".") and e.name.endswith(_PARTIAL_SUFFIX)]
+        legacy = [e for e in entries if not e.name.startswith(".")]
+        referenced = _referenced([e.name for e in legacy]) if legacy else set()
+        for entry, counter in [(e, "stale_uploads") for e in spooled] + [(e, "orphaned_files") for e in legacy]:
+            if counter == "orphaned_files" and entry.name in referenced:
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                if not dry_run:
+                    self._throttle(1)
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            self._count(counter)
+
+
+image_gc = ImageGarbageCollector(
+    image_store,
+    batch_size=settings.IMAGE_GC_BATCH_SIZE,
+    max_deletes_per_second=settings.IMAGE_GC_MAX_DELETES_PER_SECOND,
+    grace_seconds=settings.IMAGE_GC_GRACE_SECONDS
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report orphans without deleting anything")
+    args = parser.parse_args()
+
+    counts = image_gc.run(dry_run=args.dry_run)
+    prefix = "Found" if args.dry_run else "Removed"
+    print(f"{prefix} {counts['orphaned_references']} orphaned reference(s), {counts['orphaned_blobs']} orphaned "
+          f"blob(s), {counts['orphaned_files']} orphaned flat file(s) and {counts['stale_uploads']} stale "
+          f"upload(s) after scanning {counts['scanned']} item(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# app/storage/image_store.py
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import func
+
+from ..core.config import settings
+from ..db import models
+from ..db.database import SessionLocal
+from .backends import LocalFileSystemBackend, LocalObjectStoreClient, ObjectStoreBackend, StorageBackend
+
+_RESOLVED_MAX = 50000
+_LOCK_STRIPES = 64
+_RELEASE_CHUNK = 500
+
+
+def blob_key(sha256: str, original_filename: str) -> str:
+    """Content-addressed key of an upload; the suffix is kept so served files get the right media type."""
+    return f"{sha256}{Path(original_filename).suffix.lower()}"
+
+
+class ImageStore:
+    """
+    Stores uploads once per distinct content. Each stored filename is a reference
+    (an ImageRef row) to a content-addressed blob in the backend. Identical uploads
+    share a blob, and a blob is deleted with its last reference.
+
+    Files from before the store, still flat in IMAGE_DIR, are read and deleted
+    in place until `python -m app.storage.migrate` moves them.
+    """
+
+    def __init__(self, backend: StorageBackend, legacy_dir: Path):
+        self.backend = backend
+        self.legacy_dir = Path(legacy_dir)
+        # Reference changes and blob deletion for a key are serialized, so a blob
+        # cannot be deleted while a new reference to it is being added
+        self._locks = [threading.Lock() for _ in range(_LOCK_STRIPES)]
+        self._resolved: "OrderedDict[str, str]" = OrderedDict()
+        self._resolved_lock = threading.Lock()
+        self._release_queue: "queue.Queue[List[str]]" = queue.Queue()
+        self._releaser: threading.Thread | None = None
+        self._releaser_lock = threading.Lock()
+
+    def _stripe(self, key: str) -> int:
+        return hash(key) % _LOCK_STRIPES
+
+    def lock(self, key: str) -> threading.Lock:
+        """The lock serializing reference changes and blob writes/deletes for `key`."""
+        return self._locks[self._stripe(key)]
+
+    def _remember(self, name: str, key: str) -> None:
+        with self._resolved_lock:
+            self._resolved[name] = key
+            self._resolved.move_to_end(name)
+            while len(self._resolved) > _RESOLVED_MAX:
+                self._resolved.popitem(last=False)
+
+    def _forget(self, name: str) -> None:
+        with self._resolved_lock:
+            self._resolved.pop(name, None)
+
+    # --- Writing ---
+
+    def store(self, name: str, source: Path, sha256: str, original_filename: str) -> str:
+        """
+        Store a local file (consumed) under the stored filename `name` and return its blob key.
+        If a blob with the same content exists, the file is dropped and the blob shared.
+        Blocking; call it from a worker thread in async code.
+        """
+        key = blob_key(sha256, original_filename)
+        with self.lock(key):
+            db = SessionLocal()
+            try:
+                if db.get(models.ImageBlob, key) is None or not self.backend.exists(key):
+                    self.backend.put(key, source)
+                    if db.get(models.ImageBlob, key) is None:
+                        db.add(models.ImageBlob(key=key, size=os.path.getsize(self.backend.local_path(key))))
+                else:
+                    os.remove(source)
+                db.add(models.ImageRef(name=name, blob_key=key))
+                db.commit()
+            finally:
+                db.close()
+        self._remember(name, key)
+        return key
+
+    def release(self, name: str) -> None:
+        """Drop the reference `name`; its blob is deleted when no reference is left."""
+        self.release_many([name])
+
+    def release_many(self, names: List[str]) -> int:
+        """
+        Drop many references with a few bulk statements per chunk, deleting blobs left
+        without references. Returns the number of blobs deleted. Blocking.
+        """
+        deleted = 0
+        for start in range(0, len(names), _RELEASE_CHUNK):
+            chunk = [name for name in names[start:start + _RELEASE_CHUNK] if name]
+            if chunk:
+                deleted += self._release_chunk(chunk)
+        return deleted
+
+    def _release_chunk(self, names: List[str]) -> int:
+        db = SessionLocal()
+        try:
+            refs = dict(db.query(models.ImageRef.name, models.ImageRef.blob_key).filter(
+                models.ImageRef.name.in_(names)
+            ).all())
+            keys = set(refs.values())
+            with ExitStack() as stack:
+                # Stripes in a fixed order, so concurrent bulk releases cannot deadlock
+                for stripe in sorted({self._stripe(key) for key in keys}):
+                    stack.enter_context(self._locks[stripe])
+                orphaned = set()
+                if refs:
+                    db.query(models.ImageRef).filter(
+                        models.ImageRef.name.in_(list(refs))
+                    ).delete(synchronize_session=False)
+                    still_referenced = {
+                        key for (key,) in db.query(models.ImageRef.blob_key).filter(
+                            models.ImageRef.blob_key.in_(keys)
+                        ).distinct()
+                    }
+                    orphaned = keys - still_referenced
+                    if orphaned:
+                        db.query(models.ImageBlob).filter(
+                            models.ImageBlob.key.in_(orphaned)
+                        ).delete(synchronize_session=False)
+                    db.commit()
+                for name in refs:
+                    self._forget(name)
+                # A crash before these leaves blobs without a row, which the garbage collector removes
+                for key in orphaned:
+                    self.backend.delete(key)
+        finally:
+            db.close()
+        for name in names:
+            if name not in refs:
+                self._remove_legacy(name)
+        return len(orphaned)
+
+    def release_in_background(self, names: List[str]) -> None:
+        """Queue references for `release_many` on a background thread, so callers do not wait for file deletion."""
+        names = [name for name in names if name]
+        if not names:
+            return
+        with self._releaser_lock:
+            if self._releaser is None or not self._releaser.is_alive():
+                self._releaser = threading.Thread(target=self._release_worker, name="image-releaser", daemon=True)
+                self._releaser.start()
+        self._release_queue.put(names)
+
+    def wait_for_releases(self) -> None:
+        """Block until every queued release has been processed."""
+        self._release_queue.join()
+
+    def _release_worker(self) -> None:
+        while True:
+            names = self._release_queue.get()
+            try:
+                self.release_many(names)
+            except Exception as e:
+                # Whatever was not released is left to the garbage collector
+                print(f"Error releasing {len(names)} image(s): {e}")
+            finally:
+                self._release_queue.task_done()
+
+    def _remove_legacy(self, name: str) -> None:
+        path = self.legacy_dir / name
+        if name and not name.startswith(".") and path.is_file():
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"Error deleting file {path}: {e}")
+
+    # --- Reading ---
+
+    def resolve(self, name: str) -> str | None:
+        """The blob key behind a stored filename, or None if it has none (e.g. a legacy flat file)."""
+        with self._resolved_lock:
+            key = self._resolved.get(name)
+        if key is not None:
+            return key
+        db = SessionLocal()
+        try:
+            ref = db.get(models.ImageRef, name)
+        finally:
+            db.close()
+        if ref is None:
+            return None
+        self._remember(name, ref.blob_key)
+        return ref.blob_key
+
+    def sha256(self, name: str) -> str | None:
+        key = self.resolve(name)
+        return key[:64] if key else None
+
+    def local_path(self, name: str) -> Path | None:
+        """A local file with the image's contents, or None if there is no such image."""
+        if not name or name.startswith("."):
+            return None
+        key = self.resolve(name)
+        if key is not None:
+            return self.backend.local_path(key)
+        legacy = self.legacy_dir / name
+        return legacy if legacy.is_file() else None
+
+    def stats(self) -> Dict[str, Any]:
+        db = SessionLocal()
+        try:
+            blobs, blob_bytes = db.query(
+                func.count(models.ImageBlob.key), func.coalesce(func.sum(models.ImageBlob.size), 0)
+            ).one()
+            refs, referenced_bytes = db.query(
+                func.count(models.ImageRef.name), func.coalesce(func.sum(models.ImageBlob.size), 0)
+            ).join(models.ImageBlob, models.ImageBlob.key == models.ImageRef.blob_key).one()
+        finally:
+            db.close()
+        return {
+            "backend": type(self.backend).__name__,
+            "blobs": blobs,
+            "references": refs,
+            "stored_bytes": blob_bytes,
+            "deduplicated_bytes": referenced_bytes - blob_bytes,
+        }
+
+
+# --- Backends ---
+
+def _local_backend() -> StorageBackend:
+    return LocalFileSystemBackend(settings.IMAGE_DIR)
+
+
+def _local_object_store_backend() -> StorageBackend:
+    return ObjectStoreBackend(
+        LocalObjectStoreClient(settings.OBJECT_STORE_ROOT),
+        bucket=settings.OBJECT_STORE_BUCKET,
+        cache_dir=settings.IMAGE_DIR,
+        prefix=settings.OBJECT_STORE_PREFIX
+    )
+
+
+def _s3_backend() -> StorageBackend:
+    try:
+        import boto3
+    except ImportError:
+        raise RuntimeError("IMAGE_STORE_BACKEND=s3 requires boto3 (pip install boto3)")
+    client = boto3.client("s3", endpoint_url=settings.OBJECT_STORE_ENDPOINT_URL)
+    return ObjectStoreBackend(
+        client, bucket=settings.OBJECT_STORE_BUCKET, cache_dir=settings.IMAGE_DIR, prefix=settings.OBJECT_STORE_PREFIX
+    )
+
+
+# Selected with IMAGE_STORE_BACKEND; register further backends here
+BACKENDS: Dict[str, Callable[[], StorageBackend]] = {
+    "local": _local_backend,
+    "local-object-store": _local_object_store_backend,
+    "s3": _s3_backend,
+}
+
+
+def create_backend(name: str) -> StorageBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown IMAGE_STORE_BACKEND {name!r}; expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+image_store = ImageStore(create_backend(settings.IMAGE_STORE_BACKEND), settings.IMAGE_DIR)
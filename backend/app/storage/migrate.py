@@ -0,0 +1,67 @@
+# app/storage/migrate.py
+"""
+Move images from the old flat IMAGE_DIR layout (one file per upload, named by its
+stored filename) into the image store, deduplicating identical files. Judgements
+and job items keep their stored filenames, which become image store references.
+Safe to re-run: files that already have a reference are skipped.
+
+Usage (from the backend directory, with the server stopped):
+    python -m app.storage.migrate [--dry-run]
+"""
+
+import argparse
+import os
+
+from ..core.config import settings
+from ..core.startup import create_schema
+from ..db.database import engine
+from ..services.upload_service import file_sha256
+from .image_store import blob_key, image_store
+
+
+def legacy_files():
+    """Flat files at the top of IMAGE_DIR, skipping spooled uploads (dot-files) and the shard directories."""
+    for path in sorted(settings.IMAGE_DIR.iterdir()):
+        if path.is_file() and not path.name.startswith("."):
+            yield path
+
+
+def migrate(dry_run: bool = False) -> dict:
+    create_schema(engine)
+    counts = {"migrated": 0, "deduplicated": 0, "skipped": 0, "bytes_saved": 0}
+    seen_keys = set()
+    for path in legacy_files():
+        existing = image_store.resolve(path.name)
+        if existing is not None:
+            counts["skipped"] += 1
+            # A copy left by an interrupted run is redundant once its blob is stored
+            if not dry_run and image_store.backend.exists(existing):
+                os.remove(path)
+            continue
+        sha256 = file_sha256(path)
+        size = path.stat().st_size
+        key = blob_key(sha256, path.name)
+        if key in seen_keys or image_store.backend.exists(key):
+            counts["deduplicated"] += 1
+            counts["bytes_saved"] += size
+        seen_keys.add(key)
+        counts["migrated"] += 1
+        if not dry_run:
+            image_store.store(path.name, path, sha256, path.name)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be migrated without changing anything")
+    args = parser.parse_args()
+
+    counts = migrate(dry_run=args.dry_run)
+    prefix = "Would migrate" if args.dry_run else "Migrated"
+    print(f"{prefix} {counts['migrated']} file(s) from {settings.IMAGE_DIR} to the "
+          f"{type(image_store.backend).__name__} image store: {counts['deduplicated']} duplicate(s), "
+          f"{counts['bytes_saved']} bytes saved, {counts['skipped']} already migrated")
+
+
+if __name__ == "__main__":
+    main()
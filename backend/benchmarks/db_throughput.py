@@ -0,0 +1,133 @@
+# benchmarks/db_throughput.py
+"""
+Mixed read/write throughput of the judgements database under concurrent
+writers (storing judgements, as batch judging does) and readers (paging
+through a competition's judgements), with SQLite's default journal
+settings vs. the configured production pragmas (WAL, synchronous=NORMAL, ...).
+
+Each profile runs against a fresh temporary database file.
+
+Usage (from the backend directory):
+    python -m benchmarks.db_throughput [--seconds 5] [--writers 4] [--readers 8]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.core.startup import create_schema
+from app.crud import crud
+from app.db import models
+from app.db.database import build_engine, sqlite_pragmas_from_settings
+
+
+SCORES = {"Composition": 7.0, "Technical_Quality": 6.5, "Creativity": 8.0, "Nature_Relevance": 7.5}
+
+# SQLite's defaults, except busy_timeout so that contention shows up as waiting rather than instant errors
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000}
+
+
+def _judgement_data(i: int) -> Dict[str, Any]:
+    return {
+        "filename": f"photo_{i}.jpg",
+        "scores": SCORES,
+        "rationales": {name: "Benchmark rationale. " * 10 for name in SCORES},
+        "overall_score": 7.25,
+        "overall_reasoning": "Benchmark reasoning. " * 20,
+    }
+
+
+def _run_profile(pragmas: Dict[str, Any], seconds: float, writers: int, readers: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{tmp}/bench.db", sqlite_pragmas=pragmas)
+        create_schema(engine)
+        Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with Session() as db:
+            competition = models.Competition(name="Benchmark")
+            db.add(competition)
+            db.commit()
+            competition_id = competition.id
+            for i in range(200):
+                crud.create_judgement(db, _judgement_data(i), f"seed_{i}.jpg", competition_id)
+
+        latencies: Dict[str, List[float]] = {"write": [], "read": []}
+        errors = {"write": 0, "read": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def worker(kind: str, worker_id: int) -> None:
+            counter = 0
+            with Session() as db:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        if kind == "write":
+                            crud.create_judgement(
+                                db, _judgement_data(counter), f"w{worker_id}_{counter}.jpg", competition_id
+                            )
+                        else:
+                            crud.list_judgements(db, competition_id=competition_id, limit=50, summary=True)
+                            db.rollback()
+                    except OperationalError:
+                        db.rollback()
+                        with lock:
+                            errors[kind] += 1
+                        continue
+                    elapsed = time.perf_counter() - start
+                    counter += 1
+                    with lock:
+                        latencies[kind].append(elapsed)
+
+        threads = [threading.Thread(target=worker, args=("write", i)) for i in range(writers)]
+        threads += [threading.Thread(target=worker, args=("read", i)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    def summary(kind: str) -> Dict[str, float]:
+        samples = sorted(latencies[kind])
+        if not samples:
+            return {"ops_per_s": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "errors": errors[kind]}
+        return {
+            "ops_per_s": round(len(samples) / seconds, 1),
+            "p50_ms": round(statistics.median(samples) * 1000, 2),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 2),
+            "errors": errors[kind],
+        }
+
+    return {"write": summary("write"), "read": summary("read")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    profiles = {"default": DEFAULT_PRAGMAS, "configured": sqlite_pragmas_from_settings()}
+    print(f"{args.writers} writer(s), {args.readers} reader(s), {args.seconds:.0f}s per profile")
+    for name, pragmas in profiles.items():
+        result = _run_profile(pragmas, args.seconds, args.writers, args.readers)
+        print(f"\n{name}: {pragmas}")
+        for kind in ("write", "read"):
+            r = result[kind]
+            print(
+                f"  {kind:5s} {r['ops_per_s']:8.1f} ops/s   p50 {r['p50_ms']:7.2f} ms   "
+                f"p95 {r['p95_ms']:7.2f} ms   errors {r['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
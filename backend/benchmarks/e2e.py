@@ -0,0 +1,514 @@
+# benchmarks/e2e.py
+"""
+End-to-end benchmark of the judging API. Boots the FastAPI app in-process
+(startup and shutdown events included) against a temporary SQLite database,
+a temporary image store and the fake LLM backend, and drives it over HTTP
+through httpx's ASGI transport at a fixed concurrency:
+
+    single   POST /judge/ with one photo per request
+    batch    POST /judge-batch/ with 50 and 500 photos (--batch-sizes)
+    history  paging through a competition of 50k stored judgements
+             (cursor pages by date and by score, full pages with totals,
+             /judgements/ and the ranking)
+    images   GET /images/{filename}: originals, renditions and
+             conditional requests answered with 304
+    cascade  POST /judge/ with the same photos in a full-panel and in a
+             cascade competition, reporting the LLM calls, cost and
+             throughput gained by screening
+
+Each scenario reports p50/p95/p99 latency, throughput, peak RSS and the
+number of SQL statements executed. The results are written as JSON so runs
+of two commits can be compared with --baseline.
+
+Photos are generated from a seed and the fake LLM is seeded, so runs with the
+same arguments do the same work. LLM latency defaults to a fixed 50 ms to keep
+the measurement on the API; raise --llm-latency-ms for provider-like timings.
+
+Usage (from the backend directory; Linux, RSS is read from /proc):
+    python -m benchmarks.e2e [--concurrency 8] [--scenarios single,batch,history,images,cascade]
+                             [--output e2e.json] [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+SCENARIOS = ("single", "batch", "history", "images", "cascade")
+SCORES = {"Composition": 7.0, "Technical_Quality": 6.5, "Creativity": 8.0, "Nature_Relevance": 7.5}
+WEIGHTS = {"Composition": 1.0, "Technical_Quality": 1.2, "Creativity": 0.9, "Nature_Relevance": 1.1}
+_MB = 1024 * 1024
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once")
+    parser.add_argument("--single-requests", type=int, default=200)
+    parser.add_argument("--batch-sizes", default="50,500", help="Photos per /judge-batch/ request; one scenario per size")
+    parser.add_argument("--batch-requests", type=int, default=2, help="Requests per batch size")
+    parser.add_argument("--history-rows", type=int, default=50_000, help="Judgements stored in the browsed competition")
+    parser.add_argument("--history-requests", type=int, default=2000)
+    parser.add_argument("--image-requests", type=int, default=2000)
+    parser.add_argument("--cascade-photos", type=int, default=200, help="Photos judged with and without cascade screening")
+    parser.add_argument("--image-px", type=int, default=1600, help="Long edge of the generated photos")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="e2e-benchmark.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Results of an earlier run to compare against")
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def _configure_environment(args: argparse.Namespace, tmp: str) -> None:
+    """Settings are read when the app is imported, so this runs first."""
+    os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    os.environ["IMAGE_DIR"] = os.path.join(tmp, "images")
+    os.environ["RENDITION_DIR"] = os.path.join(tmp, "renditions")
+    os.environ["GUIDELINE_CACHE_DIR"] = os.path.join(tmp, "guidelines")
+    os.environ["IMAGE_STORE_BACKEND"] = "local"
+    os.environ["GUIDELINE_SEARCH_PROVIDER"] = "fake"
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_LATENCY_JITTER_MS"] = str(args.llm_latency_jitter_ms)
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+
+
+# --- Measurement ---
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+class QueryCounter:
+    """SQL statements executed on the given engines, from any thread."""
+
+    def __init__(self, *engines):
+        from sqlalchemy import event
+
+        self.count = 0
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+async def _drive(
+    requests: int,
+    concurrency: int,
+    send: Callable[[int], Awaitable[Any]],
+    queries: QueryCounter,
+    photos_per_request: int = 0
+) -> Dict[str, Any]:
+    """Send `requests` requests, `concurrency` at a time, and summarise them."""
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    next_index = iter(range(requests))
+
+    async def worker() -> None:
+        for index in next_index:
+            start = time.perf_counter()
+            response = await send(index)
+            latencies.append(time.perf_counter() - start)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    queries_before = queries.count
+    start = time.perf_counter()
+    with RssSampler() as sampler:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - start
+    query_count = queries.count - queries_before
+
+    ordered = sorted(latencies)
+    result = {
+        "requests": requests,
+        "concurrency": min(concurrency, requests),
+        "errors": sum(n for status, n in statuses.items() if int(status) >= 400),
+        "statuses": statuses,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else 0.0,
+            "p50": round(_percentile(ordered, 50) * 1000, 2),
+            "p95": round(_percentile(ordered, 95) * 1000, 2),
+            "p99": round(_percentile(ordered, 99) * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        },
+        "db_queries": query_count,
+        "db_queries_per_request": round(query_count / requests, 2) if requests else 0.0,
+        "peak_rss_mb": round(sampler.peak / _MB, 1),
+    }
+    if photos_per_request:
+        result["photos_per_second"] = round(requests * photos_per_request / elapsed, 2) if elapsed else None
+    return result
+
+
+# --- Fixtures ---
+
+def _make_jpeg(index: int, long_edge: int, seed: int) -> bytes:
+    """A unique, photo-like JPEG: smooth colour fields upscaled from a small random image."""
+    from PIL import Image
+
+    rng = random.Random(seed * 1_000_003 + index)
+    width, height = long_edge, long_edge * 3 // 4
+    small = Image.frombytes("RGB", (width // 32, height // 32), rng.randbytes((width // 32) * (height // 32) * 3))
+    buffer = io.BytesIO()
+    small.resize((width, height), Image.Resampling.BICUBIC).save(buffer, "JPEG", quality=88)
+    return buffer.getvalue()
+
+
+def _seed_history(competition_id: int, rows: int, chunk_size: int = 5000) -> None:
+    """Bulk-insert `rows` judgements with their score rows, as batch judging would have stored them."""
+    from sqlalchemy import func, insert, select
+
+    from app.db import models
+    from app.db.database import SessionLocal
+
+    rng = random.Random(rows)
+    with SessionLocal() as db:
+        next_id = (db.scalar(select(func.max(models.Judgement.id))) or 0) + 1
+        for start in range(0, rows, chunk_size):
+            judgements, scores = [], []
+            for judgement_id in range(next_id + start, next_id + min(rows, start + chunk_size)):
+                criterion_scores = {name: round(rng.uniform(3, 10), 1) for name in SCORES}
+                overall = round(sum(criterion_scores.values()) / len(criterion_scores), 2)
+                judgements.append({
+                    "id": judgement_id,
+                    "original_filename": f"history_{judgement_id}.jpg",
+                    "stored_filename": f"history_{judgement_id}.jpg",
+                    "overall_score": overall,
+                    "competition_id": competition_id,
+                    "judgement_details": {
+                        "filename": f"history_{judgement_id}.jpg",
+                        "scores": criterion_scores,
+                        "rationales": {name: "Benchmark rationale. " * 10 for name in SCORES},
+                        "overall_score": overall,
+                        "overall_reasoning": "Benchmark reasoning. " * 20,
+                    },
+                })
+                scores.extend({
+                    "judgement_id": judgement_id,
+                    "competition_id": competition_id,
+                    "criterion_name": name,
+                    "score": score,
+                    "weight": WEIGHTS[name],
+                } for name, score in criterion_scores.items())
+            db.execute(insert(models.Judgement), judgements)
+            db.execute(insert(models.JudgementScore), scores)
+            db.commit()
+
+
+async def _collect_cursors(client, path: str, params: Dict[str, Any]) -> List[str | None]:
+    """Every page cursor of a listing, starting with None for the first page."""
+    cursors: List[str | None] = [None]
+    while True:
+        page_params = dict(params, cursor=cursors[-1]) if cursors[-1] else params
+        response = await client.get(path, params=page_params)
+        response.raise_for_status()
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            return cursors
+        cursors.append(next_cursor)
+
+
+# --- Scenarios ---
+
+class Benchmark:
+    def __init__(self, args: argparse.Namespace, client, queries: QueryCounter):
+        self.args = args
+        self.client = client
+        self.queries = queries
+        self.photo_index = 0
+        self.stored_filenames: List[str] = []
+
+    def _photos(self, count: int) -> List[bytes]:
+        start, self.photo_index = self.photo_index, self.photo_index + count
+        return [_make_jpeg(i, self.args.image_px, self.args.seed) for i in range(start, start + count)]
+
+    async def _competition(self, name: str, **fields: Any) -> int:
+        response = await self.client.post("/competitions/", json={"name": name, **fields})
+        response.raise_for_status()
+        return response.json()["id"]
+
+    def _remember(self, response) -> None:
+        if response.status_code == 200:
+            body = response.json()
+            for judgement in body if isinstance(body, list) else [body]:
+                self.stored_filenames.append(judgement["stored_filename"])
+
+    async def single(self) -> Dict[str, Dict[str, Any]]:
+        competition_id = await self._competition("Benchmark single")
+        photos = self._photos(self.args.single_requests)
+
+        async def send(index: int):
+            response = await self.client.post(
+                "/judge/",
+                files={"file": (f"single_{index}.jpg", photos[index], "image/jpeg")},
+                data={"competition_id": str(competition_id), "bypass_cache": "true"}
+            )
+            self._remember(response)
+            return response
+
+        return {"single": await _drive(
+            self.args.single_requests, self.args.concurrency, send, self.queries, photos_per_request=1
+        )}
+
+    async def batch(self) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        for size in (int(s) for s in self.args.batch_sizes.split(",") if s):
+            competition_id = await self._competition(f"Benchmark batch {size}")
+            batches = [self._photos(size) for _ in range(self.args.batch_requests)]
+
+            async def send(index: int, size: int = size, batches: List[List[bytes]] = batches):
+                response = await self.client.post(
+                    "/judge-batch/",
+                    files=[("files", (f"batch_{index}_{i}.jpg", photo, "image/jpeg")) for i, photo in enumerate(batches[index])],
+                    data={"competition_id": str(competition_id), "bypass_cache": "true"},
+                    timeout=None
+                )
+                self._remember(response)
+                return response
+
+            results[f"batch_{size}"] = await _drive(
+                self.args.batch_requests, self.args.concurrency, send, self.queries, photos_per_request=size
+            )
+        return results
+
+    async def history(self) -> Dict[str, Dict[str, Any]]:
+        competition_id = await self._competition("Benchmark history")
+        await asyncio.to_thread(_seed_history, competition_id, self.args.history_rows)
+        listing = f"/competitions/{competition_id}/judgements"
+        # Cursors of every page are collected up front, so measured requests land on pages throughout the history
+        by_date = await _collect_cursors(self.client, listing, {"fields": "summary", "limit": 50})
+        by_score = await _collect_cursors(self.client, listing, {"fields": "summary", "limit": 50, "sort": "overall_score"})
+
+        def page(cursors: List[str | None], index: int, params: Dict[str, Any]):
+            cursor = cursors[(index * 7919) % len(cursors)]
+            return self.client.get(listing, params=dict(params, cursor=cursor) if cursor else params)
+
+        requests = [
+            lambda i: page(by_date, i, {"fields": "summary", "limit": 50}),
+            lambda i: page(by_score, i, {"fields": "summary", "limit": 50, "sort": "overall_score"}),
+            lambda i: self.client.get(listing, params={"limit": 20, "include_total": "true"}),
+            lambda i: self.client.get("/judgements/", params={"fields": "summary", "limit": 50}),
+            lambda i: self.client.get(f"/competitions/{competition_id}/ranking", params={"limit": 50}),
+        ]
+        return {"history": await _drive(
+            self.args.history_requests, self.args.concurrency, lambda i: requests[i % len(requests)](i), self.queries
+        )}
+
+    async def images(self) -> Dict[str, Dict[str, Any]]:
+        if not self.stored_filenames:
+            # Nothing judged by an earlier scenario, so store a few photos first (not measured)
+            competition_id = await self._competition("Benchmark images")
+            response = await self.client.post(
+                "/judge-batch/",
+                files=[("files", (f"image_{i}.jpg", photo, "image/jpeg")) for i, photo in enumerate(self._photos(20))],
+                data={"competition_id": str(competition_id), "bypass_cache": "true"},
+                timeout=None
+            )
+            response.raise_for_status()
+            self._remember(response)
+        filenames = self.stored_filenames
+        etags: Dict[str, str] = {}
+
+        async def send(index: int):
+            filename = filenames[(index // 4) % len(filenames)]
+            kind = index % 4
+            if kind == 0:
+                response = await self.client.get(f"/images/{filename}")
+                etags[filename] = response.headers.get("ETag", "")
+            elif kind == 1:
+                response = await self.client.get(f"/images/{filename}", params={"w": 480})
+            elif kind == 2:
+                response = await self.client.get(f"/images/{filename}", params={"w": 1280})
+            else:
+                headers = {"If-None-Match": etags[filename]} if etags.get(filename) else {}
+                response = await self.client.get(f"/images/{filename}", headers=headers)
+            return response
+
+        return {"images": await _drive(self.args.image_requests, self.args.concurrency, send, self.queries)}
+
+
+    async def cascade(self) -> Dict[str, Dict[str, Any]]:
+        photos = self._photos(self.args.cascade_photos)
+        results = {}
+        for name, enabled in (("full_panel", False), ("cascade", True)):
+            competition_id = await self._competition(f"Benchmark {name}", cascade_enabled=enabled)
+
+            async def send(index: int, competition_id: int = competition_id):
+                response = await self.client.post(
+                    "/judge/",
+                    files={"file": (f"cascade_{index}.jpg", photos[index], "image/jpeg")},
+                    data={"competition_id": str(competition_id), "bypass_cache": "true"}
+                )
+                self._remember(response)
+                return response
+
+            result = await _drive(len(photos), self.args.concurrency, send, self.queries, photos_per_request=1)
+            response = await self.client.get(f"/competitions/{competition_id}/usage")
+            response.raise_for_status()
+            usage = response.json()
+            result.update(
+                llm_calls=usage["llm_calls"], cost_usd=usage["cost_usd"],
+                screened=usage["screened"], screened_out=usage["screened_out"]
+            )
+            results[name] = result
+
+        full, cascade = results["full_panel"], results["cascade"]
+
+        def ratio(value: float, reference: float) -> float | None:
+            return round(value / reference, 3) if reference else None
+
+        cascade["vs_full_panel"] = {
+            "photos_per_second": ratio(cascade["photos_per_second"], full["photos_per_second"]),
+            "llm_calls": ratio(cascade["llm_calls"], full["llm_calls"]),
+            "cost_usd": ratio(cascade["cost_usd"], full["cost_usd"]),
+        }
+        print(f"cascade: {cascade['screened_out']}/{cascade['screened']} photos screened out, "
+              f"{cascade['vs_full_panel']['llm_calls']}x LLM calls, {cascade['vs_full_panel']['cost_usd']}x cost, "
+              f"{cascade['vs_full_panel']['photos_per_second']}x photos/s of the full panel")
+        return results
+
+
+# --- Reporting ---
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    def change(name: str, value: float, *keys: str) -> str:
+        previous = baseline.get(name)
+        for key in keys:
+            previous = previous.get(key) if isinstance(previous, dict) else None
+        if not previous:
+            return ""
+        return f" ({(value - previous) / previous:+.0%})"
+
+    print(f"{'scenario':<12} {'requests':>8} {'errors':>6} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} "
+          f"{'req/s':>14} {'queries/req':>11} {'peak RSS MB':>11}")
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        cells = [f"{latency[p]:.1f}{change(name, latency[p], 'latency_ms', p)}" for p in ("p50", "p95", "p99")]
+        throughput = f"{result['throughput_rps']:.1f}{change(name, result['throughput_rps'], 'throughput_rps')}"
+        print(f"{name:<12} {result['requests']:>8} {result['errors']:>6} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16} "
+              f"{throughput:>14} {result['db_queries_per_request']:>11} {result['peak_rss_mb']:>11}")
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    import httpx
+
+    # Imported after _configure_environment so the app picks up the benchmark settings
+    from app.db.database import async_engine, engine
+    from app.main import app
+
+    await app.router.startup()
+    queries = QueryCounter(engine, async_engine.sync_engine)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+            benchmark = Benchmark(args, client, queries)
+            for scenario in args.scenarios.split(","):
+                scenario_results = await getattr(benchmark, scenario)()
+                results.update(scenario_results)
+                for name, result in scenario_results.items():
+                    print(f"{name}: {result['requests']} requests in {result['elapsed_s']}s, "
+                          f"p95 {result['latency_ms']['p95']} ms, {result['errors']} error(s)")
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+def main() -> None:
+    args = _parse_args()
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as in_file:
+            baseline = json.load(in_file)["scenarios"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _configure_environment(args, tmp)
+        started_at = datetime.now(timezone.utc).isoformat()
+        results = asyncio.run(_run(args))
+
+    report = {
+        "commit": _git_commit(),
+        "started_at": started_at,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "arguments": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        # ru_maxrss is in kilobytes on Linux
+        "process_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "scenarios": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as out_file:
+        json.dump(report, out_file, indent=2)
+
+    print()
+    _print_results(results, baseline)
+    print(f"\nResults written to {args.output}")
+    if any(result["errors"] for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/import_time.py
+"""
+Cold start of the API process: time to import `app.main` (from
+`python -X importtime`) and to run its startup routine (schema creation and
+seeding) against a fresh database, each in a new interpreter. Lists the slowest
+top-level imports and fails if a dependency meant to load lazily on first use
+(LangChain, LLM and search SDKs, NumPy) is imported at startup.
+
+Usage (from the backend directory):
+    python -m benchmarks.import_time [--runs 5] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+# Only imported by the code paths that use them
+LAZY_MODULES = ("langchain_core", "langchain_google_genai", "langchain_community", "langgraph", "numpy")
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+app.main.startup_event()
+started = time.perf_counter()
+lazy = [name for name in {lazy!r} if name in sys.modules]
+print(json.dumps({{"import_s": imported - start, "startup_s": started - imported, "lazy_loaded": lazy}}))
+"""
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds per top-level import (lines without nesting indentation)."""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = (part for part in line[len("import time:"):].split("|"))
+        if name.startswith("  "):
+            continue
+        cumulative[name.strip()] = cumulative.get(name.strip(), 0) + int(cumulative_us)
+    return cumulative
+
+
+def _run_once(env: Dict[str, str]) -> Tuple[Dict, Dict[str, int]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        child_env = dict(env, DATABASE_URL=f"sqlite:///{tmp}/startup.db", IMAGE_DIR=os.path.join(tmp, "images"))
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _CHILD.format(lazy=LAZY_MODULES)],
+            capture_output=True, text=True, env=child_env, cwd=os.getcwd()
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Child process failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1]), _parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest top-level imports to list")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_API_KEY", "benchmark")
+
+    timings: List[Dict] = []
+    per_module: Dict[str, List[int]] = {}
+    for _ in range(args.runs):
+        timing, modules = _run_once(env)
+        timings.append(timing)
+        for name, us in modules.items():
+            per_module.setdefault(name, []).append(us)
+
+    import_ms = statistics.median(t["import_s"] for t in timings) * 1000
+    startup_ms = statistics.median(t["startup_s"] for t in timings) * 1000
+    print(f"{args.runs} cold starts: import app.main {import_ms:.0f} ms, startup {startup_ms:.0f} ms (medians)")
+
+    print("\nSlowest top-level imports (median cumulative ms):")
+    slowest = sorted(per_module.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:args.top]
+    for name, samples in slowest:
+        print(f"  {statistics.median(samples) / 1000:8.1f}  {name}")
+
+    lazy_loaded = sorted({name for t in timings for name in t["lazy_loaded"]})
+    if lazy_loaded:
+        print(f"\nImported at startup but meant to load lazily: {', '.join(lazy_loaded)}")
+        sys.exit(1)
+    print(f"\nNone of {', '.join(LAZY_MODULES)} imported at startup")
+
+
+if __name__ == "__main__":
+    main()
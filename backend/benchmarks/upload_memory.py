@@ -0,0 +1,132 @@
+# benchmarks/upload_memory.py
+"""
+Peak resident memory of batch judging with large uploads. Runs the
+`/judge-batch/` handler directly on N copies of a large, poorly compressible
+JPEG (random noise), with a fake LLM, a temporary database and a temporary
+IMAGE_DIR, sampling the process RSS throughout.
+
+Uploads are spooled to disk and only the downsized rendition is kept for the
+LLM, so the peak should stay far below the batch size and grow with
+IMAGE_PREPROCESSING_CONCURRENCY rather than with the number of photos.
+
+Usage (from the backend directory; Linux, RSS is read from /proc):
+    python -m benchmarks.upload_memory [--photos 100] [--size-mb 20]
+"""
+
+import argparse
+import asyncio
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ["IMAGE_DIR"] = os.path.join(_tmp.name, "images")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp.name}/bench.db"
+os.environ["LLM_REQUESTS_PER_MINUTE"] = "0"
+
+from fastapi import UploadFile
+from PIL import Image
+
+from app.api.routers.judging import judge_multiple_photos
+from app.core.config import settings
+from app.core.startup import create_schema, seed_initial_data
+from app.crud import crud
+from app.db import schemas
+from app.db.database import SessionLocal, engine
+from app.services.judging_service import photo_judge_app
+from app.services.llm_backends import FakeChatModel
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class RssSampler:
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def _make_jpeg(path: str, size_mb: float) -> int:
+    # Noise compresses to roughly one byte per pixel at quality 92
+    pixels = size_mb * 1e6
+    width = int(math.sqrt(pixels * 4 / 3))
+    height = int(pixels / width)
+    img = Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=92)
+    with open(path, "wb") as out_file:
+        out_file.write(buffer.getvalue())
+    return len(buffer.getvalue())
+
+
+async def _run(photos: int, source: str, competition_id: int) -> None:
+    handles = [open(source, "rb") for _ in range(photos)]
+    try:
+        files = [
+            UploadFile(file=handle, filename=f"photo_{i}.jpg", size=os.path.getsize(source))
+            for i, handle in enumerate(handles)
+        ]
+        results = await judge_multiple_photos(files=files, competition_id=competition_id, bypass_cache=True)
+        assert len(results) == photos
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--photos", type=int, default=100)
+    parser.add_argument("--size-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    settings.MAX_UPLOAD_BYTES = max(settings.MAX_UPLOAD_BYTES, int(args.size_mb * 2e6))
+    settings.MAX_BATCH_UPLOAD_BYTES = max(settings.MAX_BATCH_UPLOAD_BYTES, int(args.photos * args.size_mb * 2e6))
+    settings.IMAGE_DIR.mkdir(exist_ok=True)
+    create_schema(engine)
+    with SessionLocal() as db:
+        seed_initial_data(db)
+        competition_id = crud.create_competition(db, schemas.CompetitionCreate(name="Benchmark")).id
+    photo_judge_app.llm = FakeChatModel()
+
+    source = os.path.join(_tmp.name, "source.jpg")
+    file_size = _make_jpeg(source, args.size_mb)
+
+    baseline = _rss_bytes()
+    start = time.perf_counter()
+    with RssSampler() as sampler:
+        asyncio.run(_run(args.photos, source, competition_id))
+    elapsed = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    batch_bytes = file_size * args.photos
+    print(f"{args.photos} photos x {file_size / mb:.1f} MB = {batch_bytes / mb:.0f} MB batch, judged in {elapsed:.1f}s")
+    print(f"preprocessing concurrency: {settings.IMAGE_PREPROCESSING_CONCURRENCY or os.cpu_count()}")
+    print(f"RSS baseline {baseline / mb:.0f} MB, peak {sampler.peak / mb:.0f} MB, "
+          f"growth {(sampler.peak - baseline) / mb:.0f} MB ({(sampler.peak - baseline) / batch_bytes:.1%} of the batch)")
+    _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
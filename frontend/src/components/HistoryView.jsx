@@ -33,11 +33,24 @@ const InfoCard = ({ children }) => (
     </div>
 );
 
+const PAGE_SIZE = 24;
+
 const HistoryView = ({ selectedCompetition, API_BASE_URL }) => {
     const [judgements, setJudgements] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
 
+    // Pages arrive newest first; the cursor for the next page is in the X-Next-Cursor header
+    const fetchPage = async (cursor) => {
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (cursor) params.set('cursor', cursor);
+        const res = await fetch(`${API_BASE_URL}/competitions/${selectedCompetition.id}/judgements?${params}`);
+        if (!res.ok) throw new Error('Failed to fetch history for this competition.');
+        return { data: await res.json(), cursor: res.headers.get('X-Next-Cursor') };
+    };
+
     useEffect(() => {
         const fetchHistory = async () => {
             if (!selectedCompetition) {
@@ -47,10 +60,9 @@ const HistoryView = ({ selectedCompetition, API_BASE_URL }) => {
             setLoading(true);
             setError(null);
             try {
-                const res = await fetch(`${API_BASE_URL}/competitions/${selectedCompetition.id}/judgements`);
-                if (!res.ok) throw new Error('Failed to fetch history for this competition.');
-                const data = await res.json();
-                setJudgements(data.sort((a, b) => new Date(b.created_at) - new Date(a.created_at)));
+                const page = await fetchPage(null);
+                setJudgements(page.data);
+                setNextCursor(page.cursor);
             } catch (e) {
                 setError(e.message);
             } finally {
@@ -60,6 +72,19 @@ const HistoryView = ({ selectedCompetition, API_BASE_URL }) => {
         fetchHistory();
     }, [selectedCompetition, API_BASE_URL]);
 
+    const handleLoadMore = async () => {
+        setLoadingMore(true);
+        try {
+            const page = await fetchPage(nextCursor);
+            setJudgements(current => [...current, ...page.data]);
+            setNextCursor(page.cursor);
+        } catch (e) {
+            setError(e.message);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleDeletion = (deletedId) => {
         setJudgements(currentJudgements =>
             currentJudgements.filter(judgement => judgement.id !== deletedId)
@@ -106,23 +131,37 @@ const HistoryView = ({ selectedCompetition, API_BASE_URL }) => {
         }
 
         return (
-            <motion.div
-                className="grid md:grid-cols-2 xl:grid-cols-3 gap-8"
-                variants={gridContainerVariants}
-                initial="hidden"
-                animate="visible"
-            >
-                <AnimatePresence>
-                    {judgements.map((j) => (
-                        <ResultCard
-                            key={j.id}
-                            result={j}
-                            API_BASE_URL={API_BASE_URL}
-                            onDelete={handleDeletion}
-                        />
-                    ))}
-                </AnimatePresence>
-            </motion.div>
+            <>
+                <motion.div
+                    className="grid md:grid-cols-2 xl:grid-cols-3 gap-8"
+                    variants={gridContainerVariants}
+                    initial="hidden"
+                    animate="visible"
+                >
+                    <AnimatePresence>
+                        {judgements.map((j) => (
+                            <ResultCard
+                                key={j.id}
+                                result={j}
+                                API_BASE_URL={API_BASE_URL}
+                                onDelete={handleDeletion}
+                            />
+                        ))}
+                    </AnimatePresence>
+                </motion.div>
+                {nextCursor && (
+                    <div className="flex justify-center mt-8">
+                        <button
+                            onClick={handleLoadMore}
+                            disabled={loadingMore}
+                            className="flex items-center gap-2 px-6 py-3 bg-blue-600 text-white font-semibold rounded-lg shadow hover:bg-blue-700 disabled:opacity-50"
+                        >
+                            {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                    </div>
+                )}
+            </>
         );
     };
 
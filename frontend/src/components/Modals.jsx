@@ -156,11 +156,21 @@ const PROMPT_HINTS = {
     variables: ["{criterion_name}", "{criterion_description}"],
     outputFormat: ["SCORE: [number]", "RATIONALE: [explanation]"],
   },
+  COMBINED_EVALUATION_PROMPT: {
+    title: "Combined Evaluation Prompt Requirements",
+    variables: ["{criteria_list}"],
+    outputFormat: ['JSON: {"<criterion name>": {"score": [number], "rationale": [explanation]}}'],
+  },
   REASONING_PROMPT: {
     title: "Reasoning Prompt Requirements",
     variables: ["{overall_score}", "{rules}", "{feedback_summary}"],
     outputFormat: ["FINAL_SCORE: [score]", "RATIONALE: [summary]"],
   },
+  SCREENING_PROMPT: {
+    title: "Screening Prompt Requirements",
+    variables: ["{criteria_list}", "{rules}"],
+    outputFormat: ["SCORE: [number]", "RATIONALE: [explanation]"],
+  },
   RULES_SYNTHESIS_PROMPT: {
     title: "Rules Synthesis Prompt Requirements",
     variables: ["{competition_name}", "{aggregated_search_results}"],
@@ -205,7 +215,9 @@ const PromptForm = ({ initialPrompt, onSave, onCancel }) => {
                             className="w-full p-4 border border-gray-300 rounded-xl bg-white focus:ring-2 focus:ring-purple-500 focus:border-purple-500 shadow-sm transition-all"
                         >
                             <option value="EVALUATION_PROMPT">Evaluation Prompt</option>
+                            <option value="COMBINED_EVALUATION_PROMPT">Combined Evaluation Prompt</option>
                             <option value="REASONING_PROMPT">Reasoning Prompt</option>
+                            <option value="SCREENING_PROMPT">Screening Prompt</option>
                             <option value="RULES_SYNTHESIS_PROMPT">Rules Synthesis Prompt</option>
                         </select>
                     )}
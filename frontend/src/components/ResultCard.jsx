@@ -20,6 +20,8 @@ const ResultCard = React.forwardRef(({ result, API_BASE_URL, onDelete }, ref) =>
     const details = result.judgement_details || result;
     const filename = result.original_filename || details.filename;
     const imageUrl = result.stored_filename ? `${API_BASE_URL}/images/${result.stored_filename}` : null;
+    // Cards show a resized WebP rendition instead of the full original
+    const thumbnailUrl = (width) => `${imageUrl}?w=${width}&fmt=webp`;
     
     const finalScore = details.overall_reasoning_score ?? details.overall_score;
     const originalScore = details.overall_score;
@@ -52,7 +54,19 @@ const ResultCard = React.forwardRef(({ result, API_BASE_URL, onDelete }, ref) =>
             layout
             className="bg-white border border-gray-200 rounded-xl shadow-lg hover:shadow-xl transition-shadow duration-300 overflow-hidden flex flex-col"
         >
-            {imageUrl && <img src={imageUrl} alt={filename} className="w-full h-56 object-cover" onError={(e) => e.target.style.display = 'none'} />}
+            {imageUrl && (
+                <a href={imageUrl} target="_blank" rel="noopener noreferrer">
+                    <img
+                        src={thumbnailUrl(480)}
+                        srcSet={`${thumbnailUrl(480)} 480w, ${thumbnailUrl(960)} 960w`}
+                        sizes="(min-width: 1280px) 33vw, (min-width: 768px) 50vw, 100vw"
+                        loading="lazy"
+                        alt={filename}
+                        className="w-full h-56 object-cover"
+                        onError={(e) => e.target.style.display = 'none'}
+                    />
+                </a>
+            )}
             
             <div className="p-5 flex-grow flex flex-col">
                 {/* Overall Score Block */}
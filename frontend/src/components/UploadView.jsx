@@ -87,10 +87,32 @@ const UploadView = ({ selectedCompetition, criteria, API_BASE_URL }) => {
         formData.append('competition_id', selectedCompetition.id);
         setLoading(true);
         setError(null);
+        setResults([]);
         try {
-            const res = await fetch(`${API_BASE_URL}/judge-batch/`, { method: 'POST', body: formData });
+            // Results arrive as Server-Sent Events and are rendered as each photo is stored
+            const res = await fetch(`${API_BASE_URL}/judge-batch/stream`, { method: 'POST', body: formData });
             if (!res.ok) throw new Error((await res.json()).detail || 'Upload failed');
-            setResults(await res.json());
+            const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+            const failures = [];
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                const messages = buffer.split('\n\n');
+                buffer = messages.pop();
+                for (const message of messages) {
+                    const event = message.match(/^event: (.*)$/m)?.[1];
+                    const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] || '{}');
+                    if (event === 'judgement_stored') {
+                        setResults(prev => [...prev, data.judgement]);
+                        setJudgementPerformed(true);
+                    } else if (event === 'photo_error') {
+                        failures.push(`${data.filename}: ${data.detail}`);
+                    }
+                }
+            }
+            if (failures.length > 0) setError(failures.join('\n'));
             setJudgementPerformed(true);
         } catch (e) {
             setError(e.message);